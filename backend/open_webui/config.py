@@ -3,6 +3,8 @@ import logging
 import os
 import shutil
 import base64
+import threading
+import time
 import redis
 
 from datetime import datetime
@@ -24,12 +26,14 @@ from open_webui.env import (
     REDIS_KEY_PREFIX,
     REDIS_SENTINEL_HOSTS,
     REDIS_SENTINEL_PORT,
+    REDIS_CONFIG_SYNC_INTERVAL,
     FRONTEND_BUILD_DIR,
     OFFLINE_MODE,
     OPEN_WEBUI_DIR,
     WEBUI_AUTH,
     WEBUI_FAVICON_URL,
     WEBUI_NAME,
+    UVICORN_WORKERS,
     log,
 )
 from open_webui.internal.db import Base, get_db
@@ -222,17 +226,33 @@ class PersistentConfig(Generic[T]):
 
 
 class AppConfig:
+    """
+    Holds the PersistentConfig values of the app in process memory.
+
+    With Redis, every change is also written to Redis, bumps a version
+    counter and is published on a channel. A background thread applies the
+    changes published by other workers, and reloads all values when it
+    finds it missed one (a gap in the versions, or a different version in
+    Redis every REDIS_CONFIG_SYNC_INTERVAL seconds). Reads never wait on
+    Redis.
+    """
+
     _redis: Union[redis.Redis, redis.cluster.RedisCluster] = None
     _redis_key_prefix: str
 
     _state: dict[str, PersistentConfig]
 
+    # Last config version applied from Redis, None until the first sync
+    _version: Optional[int] = None
+    _listener: Optional[threading.Thread] = None
+
     def __init__(
         self,
         redis_url: Optional[str] = None,
         redis_sentinels: Optional[list] = [],
         redis_cluster: Optional[bool] = False,
         redis_key_prefix: str = "open-webui",
+        sync_interval: float = REDIS_CONFIG_SYNC_INTERVAL,
     ):
         if redis_url:
             super().__setattr__("_redis_key_prefix", redis_key_prefix)
@@ -245,42 +265,145 @@ class AppConfig:
                     decode_responses=True,
                 ),
             )
+            super().__setattr__("_sync_interval", sync_interval)
+            super().__setattr__("_sync_lock", threading.RLock())
 
         super().__setattr__("_state", {})
 
     def __setattr__(self, key, value):
         if isinstance(value, PersistentConfig):
             self._state[key] = value
+
+            # Registered after the first sync, load it on its own
+            if self._redis and self._version is not None:
+                self._load([key])
         else:
             self._state[key].value = value
             self._state[key].save()
 
             if self._redis:
-                redis_key = f"{self._redis_key_prefix}:config:{key}"
-                self._redis.set(redis_key, json.dumps(self._state[key].value))
+                redis_value = json.dumps(self._state[key].value)
+
+                pipe = self._redis.pipeline()
+                pipe.set(self._get_redis_key(key), redis_value)
+                pipe.incr(self._get_version_key())
+                _, version = pipe.execute()
+
+                self._redis.publish(
+                    self._get_channel(),
+                    json.dumps({"key": key, "value": redis_value, "version": version}),
+                )
 
     def __getattr__(self, key):
         if key not in self._state:
             raise AttributeError(f"Config key '{key}' not found")
 
-        # If Redis is available, check for an updated value
-        if self._redis:
-            redis_key = f"{self._redis_key_prefix}:config:{key}"
-            redis_value = self._redis.get(redis_key)
+        if self._redis and self._listener is None:
+            self._start_sync()
 
-            if redis_value is not None:
-                try:
-                    decoded_value = json.loads(redis_value)
+        return self._state[key].value
 
-                    # Update the in-memory value if different
-                    if self._state[key].value != decoded_value:
-                        self._state[key].value = decoded_value
-                        log.info(f"Updated {key} from Redis: {decoded_value}")
+    def _get_redis_key(self, key: str) -> str:
+        return f"{self._redis_key_prefix}:config:{key}"
 
-                except json.JSONDecodeError:
-                    log.error(f"Invalid JSON format in Redis for {key}: {redis_value}")
+    def _get_version_key(self) -> str:
+        return f"{self._redis_key_prefix}:config_version"
 
-        return self._state[key].value
+    def _get_channel(self) -> str:
+        return f"{self._redis_key_prefix}:config_updates"
+
+    def _apply(self, key: str, redis_value: Optional[str]):
+        if redis_value is None or key not in self._state:
+            return
+
+        try:
+            decoded_value = json.loads(redis_value)
+
+            # Update the in-memory value if different
+            if self._state[key].value != decoded_value:
+                self._state[key].value = decoded_value
+                log.info(f"Updated {key} from Redis: {decoded_value}")
+
+        except json.JSONDecodeError:
+            log.error(f"Invalid JSON format in Redis for {key}: {redis_value}")
+
+    def _load(self, keys: list[str]):
+        pipe = self._redis.pipeline()
+        for key in keys:
+            pipe.get(self._get_redis_key(key))
+
+        for key, redis_value in zip(keys, pipe.execute()):
+            self._apply(key, redis_value)
+
+    def _sync(self):
+        """
+        Reload every value from Redis.
+        """
+        with self._sync_lock:
+            # Read the version first, the values are then at least as recent
+            version = int(self._redis.get(self._get_version_key()) or 0)
+            self._load(list(self._state))
+            super().__setattr__("_version", version)
+
+    def _start_sync(self):
+        with self._sync_lock:
+            if self._listener is not None:
+                return
+
+            try:
+                self._sync()
+            except Exception as e:
+                log.warning(f"Unable to load the config from Redis: {e}")
+
+            listener = threading.Thread(
+                target=self._listen, name="config-sync", daemon=True
+            )
+            super().__setattr__("_listener", listener)
+            listener.start()
+
+    def _handle_message(self, data: str):
+        message = json.loads(data)
+        version = int(message["version"])
+
+        with self._sync_lock:
+            if self._version is not None and version <= self._version:
+                # Already included in a full sync
+                return
+
+            if self._version is None or version > self._version + 1:
+                log.info("Missed config updates from Redis, reloading the config")
+                self._sync()
+                return
+
+            self._apply(message["key"], message["value"])
+            super().__setattr__("_version", version)
+
+    def _listen(self):
+        while True:
+            try:
+                pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self._get_channel())
+
+                # Updates published before the subscription are only caught
+                # by a full sync
+                self._sync()
+
+                last_check = time.monotonic()
+                while True:
+                    message = pubsub.get_message(timeout=self._sync_interval)
+                    if message and message["type"] == "message":
+                        self._handle_message(message["data"])
+
+                    if time.monotonic() - last_check >= self._sync_interval:
+                        last_check = time.monotonic()
+
+                        version = int(self._redis.get(self._get_version_key()) or 0)
+                        if version != self._version:
+                            log.info("Config version changed in Redis, reloading")
+                            self._sync()
+            except Exception as e:
+                log.warning(f"Config sync with Redis failed, retrying: {e}")
+                time.sleep(self._sync_interval)
 
 
 ####################################
@@ -2057,6 +2180,20 @@ VECTOR_DB = os.environ.get("VECTOR_DB", "chroma")
 # Chroma
 CHROMA_DATA_PATH = f"{DATA_DIR}/vector_db"
 
+# Persistent BM25 index used by hybrid search, one SQLite file per collection
+BM25_INDEX_PATH = os.environ.get("BM25_INDEX_PATH", f"{DATA_DIR}/bm25_index")
+
+# The index files are local to the node, so they are only kept in sync when
+# every write goes through it. Off by default when Redis is configured, which
+# indicates several replicas that would each hold a diverging index, and with
+# several workers, which share the files but each track their own rebuilds.
+ENABLE_BM25_INDEX = (
+    os.environ.get(
+        "ENABLE_BM25_INDEX", "False" if REDIS_URL or UVICORN_WORKERS > 1 else "True"
+    ).lower()
+    == "true"
+)
+
 if VECTOR_DB == "chroma":
     import chromadb
 
@@ -2190,6 +2327,37 @@ else:
     except Exception:
         PGVECTOR_POOL_RECYCLE = 3600
 
+# Index of the vector column, "ivfflat" or "hnsw"
+PGVECTOR_INDEX_METHOD = os.environ.get("PGVECTOR_INDEX_METHOD", "ivfflat").lower()
+if PGVECTOR_INDEX_METHOD not in ["ivfflat", "hnsw"]:
+    PGVECTOR_INDEX_METHOD = "ivfflat"
+
+try:
+    PGVECTOR_IVFFLAT_LISTS = int(os.environ.get("PGVECTOR_IVFFLAT_LISTS", "100"))
+except Exception:
+    PGVECTOR_IVFFLAT_LISTS = 100
+
+try:
+    PGVECTOR_HNSW_M = int(os.environ.get("PGVECTOR_HNSW_M", "16"))
+except Exception:
+    PGVECTOR_HNSW_M = 16
+
+try:
+    PGVECTOR_HNSW_EF_CONSTRUCTION = int(
+        os.environ.get("PGVECTOR_HNSW_EF_CONSTRUCTION", "64")
+    )
+except Exception:
+    PGVECTOR_HNSW_EF_CONSTRUCTION = 64
+
+# Size of the HNSW candidate list at query time, the pgvector default if empty
+PGVECTOR_HNSW_EF_SEARCH = os.environ.get("PGVECTOR_HNSW_EF_SEARCH", "")
+try:
+    PGVECTOR_HNSW_EF_SEARCH = (
+        int(PGVECTOR_HNSW_EF_SEARCH) if PGVECTOR_HNSW_EF_SEARCH else None
+    )
+except Exception:
+    PGVECTOR_HNSW_EF_SEARCH = None
+
 # Pinecone
 PINECONE_API_KEY = os.environ.get("PINECONE_API_KEY", None)
 PINECONE_ENVIRONMENT = os.environ.get("PINECONE_ENVIRONMENT", None)
@@ -2634,6 +2802,53 @@ PDF_EXTRACT_IMAGES = PersistentConfig(
     os.environ.get("PDF_EXTRACT_IMAGES", "False").lower() == "true",
 )
 
+# Default extraction engine: PDFs and presentations with at least
+# PARALLEL_EXTRACTION_MIN_PAGES pages (or slides) are extracted in shards of
+# PARALLEL_EXTRACTION_PAGES_PER_SHARD pages across a pool of
+# PARALLEL_EXTRACTION_WORKERS processes, large workbooks one sheet per shard.
+# Sharded presentations and workbooks give one document per slide or sheet,
+# instead of the single document of the Unstructured loaders.
+ENABLE_PARALLEL_EXTRACTION = (
+    os.environ.get("ENABLE_PARALLEL_EXTRACTION", "True").lower() == "true"
+)
+
+PARALLEL_EXTRACTION_WORKERS = os.environ.get(
+    "PARALLEL_EXTRACTION_WORKERS", str(min(os.cpu_count() or 1, 8))
+)
+try:
+    PARALLEL_EXTRACTION_WORKERS = max(int(PARALLEL_EXTRACTION_WORKERS), 1)
+except Exception:
+    PARALLEL_EXTRACTION_WORKERS = min(os.cpu_count() or 1, 8)
+
+PARALLEL_EXTRACTION_PAGES_PER_SHARD = os.environ.get(
+    "PARALLEL_EXTRACTION_PAGES_PER_SHARD", "20"
+)
+try:
+    PARALLEL_EXTRACTION_PAGES_PER_SHARD = max(
+        int(PARALLEL_EXTRACTION_PAGES_PER_SHARD), 1
+    )
+except Exception:
+    PARALLEL_EXTRACTION_PAGES_PER_SHARD = 20
+
+PARALLEL_EXTRACTION_MIN_PAGES = os.environ.get("PARALLEL_EXTRACTION_MIN_PAGES", "50")
+try:
+    PARALLEL_EXTRACTION_MIN_PAGES = int(PARALLEL_EXTRACTION_MIN_PAGES)
+except Exception:
+    PARALLEL_EXTRACTION_MIN_PAGES = 50
+
+# Extracted documents are cached in the storage provider by file content,
+# engine and engine settings. The least recently used entries are evicted
+# once the cache is larger than EXTRACTION_CACHE_MAX_SIZE_MB.
+ENABLE_EXTRACTION_CACHE = (
+    os.environ.get("ENABLE_EXTRACTION_CACHE", "True").lower() == "true"
+)
+
+EXTRACTION_CACHE_MAX_SIZE_MB = os.environ.get("EXTRACTION_CACHE_MAX_SIZE_MB", "1024")
+try:
+    EXTRACTION_CACHE_MAX_SIZE_MB = int(EXTRACTION_CACHE_MAX_SIZE_MB)
+except Exception:
+    EXTRACTION_CACHE_MAX_SIZE_MB = 1024
+
 RAG_EMBEDDING_MODEL = PersistentConfig(
     "RAG_EMBEDDING_MODEL",
     "rag.embedding_model",
@@ -2667,6 +2882,99 @@ RAG_EMBEDDING_PREFIX_FIELD_NAME = os.environ.get(
     "RAG_EMBEDDING_PREFIX_FIELD_NAME", None
 )
 
+# Remote embedding engines: batches sent at once per endpoint, and retries of
+# rate limited (429) or unavailable (503) requests
+RAG_EMBEDDING_CONCURRENCY = os.environ.get("RAG_EMBEDDING_CONCURRENCY", "4")
+try:
+    RAG_EMBEDDING_CONCURRENCY = max(int(RAG_EMBEDDING_CONCURRENCY), 1)
+except Exception:
+    RAG_EMBEDDING_CONCURRENCY = 4
+
+RAG_EMBEDDING_MAX_RETRIES = os.environ.get("RAG_EMBEDDING_MAX_RETRIES", "5")
+try:
+    RAG_EMBEDDING_MAX_RETRIES = max(int(RAG_EMBEDDING_MAX_RETRIES), 0)
+except Exception:
+    RAG_EMBEDDING_MAX_RETRIES = 5
+
+# Local (SentenceTransformer / CrossEncoder) models: concurrent calls are
+# collected into batches of up to RAG_LOCAL_INFERENCE_MAX_BATCH_SIZE inputs,
+# waiting at most RAG_LOCAL_INFERENCE_MAX_WAIT_MS for the batch to fill
+ENABLE_RAG_LOCAL_INFERENCE_BATCHING = (
+    os.environ.get("ENABLE_RAG_LOCAL_INFERENCE_BATCHING", "True").lower() == "true"
+)
+
+RAG_LOCAL_INFERENCE_MAX_BATCH_SIZE = os.environ.get(
+    "RAG_LOCAL_INFERENCE_MAX_BATCH_SIZE", "64"
+)
+try:
+    RAG_LOCAL_INFERENCE_MAX_BATCH_SIZE = max(int(RAG_LOCAL_INFERENCE_MAX_BATCH_SIZE), 1)
+except Exception:
+    RAG_LOCAL_INFERENCE_MAX_BATCH_SIZE = 64
+
+RAG_LOCAL_INFERENCE_MAX_WAIT_MS = os.environ.get("RAG_LOCAL_INFERENCE_MAX_WAIT_MS", "5")
+try:
+    RAG_LOCAL_INFERENCE_MAX_WAIT_MS = max(float(RAG_LOCAL_INFERENCE_MAX_WAIT_MS), 0)
+except Exception:
+    RAG_LOCAL_INFERENCE_MAX_WAIT_MS = 5.0
+
+# Documents are split, embedded and inserted in batches of RAG_INGEST_BATCH_SIZE
+# chunks, with at most RAG_INGEST_QUEUE_SIZE batches waiting between the steps
+RAG_INGEST_BATCH_SIZE = os.environ.get("RAG_INGEST_BATCH_SIZE", "256")
+try:
+    RAG_INGEST_BATCH_SIZE = max(int(RAG_INGEST_BATCH_SIZE), 1)
+except Exception:
+    RAG_INGEST_BATCH_SIZE = 256
+
+RAG_INGEST_QUEUE_SIZE = os.environ.get("RAG_INGEST_QUEUE_SIZE", "2")
+try:
+    RAG_INGEST_QUEUE_SIZE = max(int(RAG_INGEST_QUEUE_SIZE), 1)
+except Exception:
+    RAG_INGEST_QUEUE_SIZE = 2
+
+# Cache of computed embeddings keyed by (engine, model, prefix, sha256(text))
+ENABLE_RAG_EMBEDDING_CACHE = (
+    os.environ.get("ENABLE_RAG_EMBEDDING_CACHE", "True").lower() == "true"
+)
+
+# "sqlite" (local, under CACHE_DIR) or "redis" (shared, uses REDIS_URL)
+RAG_EMBEDDING_CACHE_BACKEND = os.environ.get("RAG_EMBEDDING_CACHE_BACKEND", "sqlite")
+
+RAG_EMBEDDING_CACHE_PATH = os.environ.get(
+    "RAG_EMBEDDING_CACHE_PATH", f"{CACHE_DIR}/embeddings.sqlite3"
+)
+
+RAG_EMBEDDING_CACHE_MAX_ENTRIES = os.environ.get(
+    "RAG_EMBEDDING_CACHE_MAX_ENTRIES", "100000"
+)
+try:
+    RAG_EMBEDDING_CACHE_MAX_ENTRIES = int(RAG_EMBEDDING_CACHE_MAX_ENTRIES)
+except Exception:
+    RAG_EMBEDDING_CACHE_MAX_ENTRIES = 100000
+
+# Seconds, 0 keeps entries until they are evicted
+RAG_EMBEDDING_CACHE_TTL = os.environ.get("RAG_EMBEDDING_CACHE_TTL", "2592000")
+try:
+    RAG_EMBEDDING_CACHE_TTL = int(RAG_EMBEDDING_CACHE_TTL)
+except Exception:
+    RAG_EMBEDDING_CACHE_TTL = 2592000
+
+# Token embeddings of the documents reranked with ColBERT, stored as float16
+# in a local SQLite file keyed by (model, sha256(text)). Entries expire after
+# RAG_EMBEDDING_CACHE_TTL.
+ENABLE_RAG_COLBERT_CACHE = (
+    os.environ.get("ENABLE_RAG_COLBERT_CACHE", "True").lower() == "true"
+)
+
+RAG_COLBERT_CACHE_PATH = os.environ.get(
+    "RAG_COLBERT_CACHE_PATH", f"{CACHE_DIR}/colbert.sqlite3"
+)
+
+RAG_COLBERT_CACHE_MAX_ENTRIES = os.environ.get("RAG_COLBERT_CACHE_MAX_ENTRIES", "20000")
+try:
+    RAG_COLBERT_CACHE_MAX_ENTRIES = int(RAG_COLBERT_CACHE_MAX_ENTRIES)
+except Exception:
+    RAG_COLBERT_CACHE_MAX_ENTRIES = 20000
+
 RAG_RERANKING_ENGINE = PersistentConfig(
     "RAG_RERANKING_ENGINE",
     "rag.reranking_engine",
@@ -357,6 +357,14 @@ if DATABASE_USER_ACTIVE_STATUS_UPDATE_INTERVAL is not None:
     except Exception:
         DATABASE_USER_ACTIVE_STATUS_UPDATE_INTERVAL = 0.0
 
+# Seconds last_active_at updates are collected before they are written in one
+# batch
+USER_LAST_ACTIVE_FLUSH_INTERVAL = os.environ.get("USER_LAST_ACTIVE_FLUSH_INTERVAL", "5")
+try:
+    USER_LAST_ACTIVE_FLUSH_INTERVAL = float(USER_LAST_ACTIVE_FLUSH_INTERVAL)
+except Exception:
+    USER_LAST_ACTIVE_FLUSH_INTERVAL = 5.0
+
 RESET_CONFIG_ON_START = (
     os.environ.get("RESET_CONFIG_ON_START", "False").lower() == "true"
 )
@@ -365,6 +373,36 @@ ENABLE_REALTIME_CHAT_SAVE = (
     os.environ.get("ENABLE_REALTIME_CHAT_SAVE", "False").lower() == "true"
 )
 
+# Streamed messages are buffered and written to the database at most once per
+# interval (seconds) or once this many new characters have accumulated.
+CHAT_REALTIME_SAVE_INTERVAL = os.environ.get("CHAT_REALTIME_SAVE_INTERVAL", "1")
+try:
+    CHAT_REALTIME_SAVE_INTERVAL = float(CHAT_REALTIME_SAVE_INTERVAL)
+except Exception:
+    CHAT_REALTIME_SAVE_INTERVAL = 1.0
+
+CHAT_REALTIME_SAVE_BYTES = os.environ.get("CHAT_REALTIME_SAVE_BYTES", "4096")
+try:
+    CHAT_REALTIME_SAVE_BYTES = int(CHAT_REALTIME_SAVE_BYTES)
+except Exception:
+    CHAT_REALTIME_SAVE_BYTES = 4096
+
+# Journaled messages that have not been touched for this long (seconds) are
+# considered orphaned by a crashed worker and written to the database.
+CHAT_REALTIME_SAVE_RECOVERY_TIMEOUT = os.environ.get(
+    "CHAT_REALTIME_SAVE_RECOVERY_TIMEOUT", "60"
+)
+try:
+    CHAT_REALTIME_SAVE_RECOVERY_TIMEOUT = int(CHAT_REALTIME_SAVE_RECOVERY_TIMEOUT)
+except Exception:
+    CHAT_REALTIME_SAVE_RECOVERY_TIMEOUT = 60
+
+# Store chat messages as rows of the chat_message table instead of rewriting the
+# whole chat JSON document for every single message update.
+ENABLE_CHAT_MESSAGE_TABLE = (
+    os.environ.get("ENABLE_CHAT_MESSAGE_TABLE", "False").lower() == "true"
+)
+
 ENABLE_QUERIES_CACHE = os.environ.get("ENABLE_QUERIES_CACHE", "False").lower() == "true"
 
 ####################################
@@ -388,6 +426,14 @@ try:
 except ValueError:
     REDIS_SENTINEL_MAX_RETRY_COUNT = 2
 
+# Seconds between checks of the config version in Redis, catches config
+# updates whose pub/sub notification was missed
+REDIS_CONFIG_SYNC_INTERVAL = os.environ.get("REDIS_CONFIG_SYNC_INTERVAL", "30")
+try:
+    REDIS_CONFIG_SYNC_INTERVAL = max(float(REDIS_CONFIG_SYNC_INTERVAL), 1.0)
+except ValueError:
+    REDIS_CONFIG_SYNC_INTERVAL = 30.0
+
 ####################################
 # UVICORN WORKERS
 ####################################
@@ -534,6 +580,38 @@ else:
     except Exception:
         MODELS_CACHE_TTL = 1
 
+# Seconds a user's model access decisions are cached, 0 disables the cache.
+# Off by default with several workers or replicas, like GROUP_MEMBER_CACHE_TTL
+MODEL_ACCESS_CACHE_TTL = os.environ.get(
+    "MODEL_ACCESS_CACHE_TTL", "0" if REDIS_URL or UVICORN_WORKERS > 1 else "10"
+)
+try:
+    MODEL_ACCESS_CACHE_TTL = int(MODEL_ACCESS_CACHE_TTL)
+except Exception:
+    MODEL_ACCESS_CACHE_TTL = 0 if REDIS_URL or UVICORN_WORKERS > 1 else 10
+
+# Seconds a user's group ids are cached, 0 disables the cache. The cache is
+# per process and only invalidated by changes made in the same process, so
+# it is off by default with several workers or replicas (Redis configured).
+GROUP_MEMBER_CACHE_TTL = os.environ.get(
+    "GROUP_MEMBER_CACHE_TTL", "0" if REDIS_URL or UVICORN_WORKERS > 1 else "10"
+)
+try:
+    GROUP_MEMBER_CACHE_TTL = int(GROUP_MEMBER_CACHE_TTL)
+except Exception:
+    GROUP_MEMBER_CACHE_TTL = 0 if REDIS_URL or UVICORN_WORKERS > 1 else 10
+
+# Seconds the users of authenticated requests are cached, 0 disables the cache.
+# The cache is kept in Redis when REDIS_URL is set. Without Redis it is per
+# process, so it is off by default with several workers.
+USER_CACHE_TTL = os.environ.get(
+    "USER_CACHE_TTL", "0" if UVICORN_WORKERS > 1 and not REDIS_URL else "5"
+)
+try:
+    USER_CACHE_TTL = int(USER_CACHE_TTL)
+except Exception:
+    USER_CACHE_TTL = 0 if UVICORN_WORKERS > 1 and not REDIS_URL else 5
+
 
 ####################################
 # CHAT
@@ -593,6 +671,20 @@ except ValueError:
 WEBSOCKET_SENTINEL_HOSTS = os.environ.get("WEBSOCKET_SENTINEL_HOSTS", "")
 WEBSOCKET_SENTINEL_PORT = os.environ.get("WEBSOCKET_SENTINEL_PORT", "26379")
 
+# The update log of a collaborative document is merged into a single
+# snapshot once it holds this many updates or bytes
+YDOC_COMPACTION_MAX_UPDATES = os.environ.get("YDOC_COMPACTION_MAX_UPDATES", "200")
+try:
+    YDOC_COMPACTION_MAX_UPDATES = max(int(YDOC_COMPACTION_MAX_UPDATES), 2)
+except ValueError:
+    YDOC_COMPACTION_MAX_UPDATES = 200
+
+YDOC_COMPACTION_MAX_BYTES = os.environ.get("YDOC_COMPACTION_MAX_BYTES", "1048576")
+try:
+    YDOC_COMPACTION_MAX_BYTES = int(YDOC_COMPACTION_MAX_BYTES)
+except ValueError:
+    YDOC_COMPACTION_MAX_BYTES = 1048576
+
 
 AIOHTTP_CLIENT_TIMEOUT = os.environ.get("AIOHTTP_CLIENT_TIMEOUT", "")
 
@@ -642,6 +734,90 @@ AIOHTTP_CLIENT_SESSION_TOOL_SERVER_SSL = (
     os.environ.get("AIOHTTP_CLIENT_SESSION_TOOL_SERVER_SSL", "True").lower() == "true"
 )
 
+# Connection pool shared by the requests to the Ollama and OpenAI connections,
+# 0 means no limit
+AIOHTTP_CLIENT_POOL_LIMIT = os.environ.get("AIOHTTP_CLIENT_POOL_LIMIT", "500")
+try:
+    AIOHTTP_CLIENT_POOL_LIMIT = int(AIOHTTP_CLIENT_POOL_LIMIT)
+except ValueError:
+    AIOHTTP_CLIENT_POOL_LIMIT = 500
+
+AIOHTTP_CLIENT_POOL_LIMIT_PER_HOST = os.environ.get(
+    "AIOHTTP_CLIENT_POOL_LIMIT_PER_HOST", "100"
+)
+try:
+    AIOHTTP_CLIENT_POOL_LIMIT_PER_HOST = int(AIOHTTP_CLIENT_POOL_LIMIT_PER_HOST)
+except ValueError:
+    AIOHTTP_CLIENT_POOL_LIMIT_PER_HOST = 100
+
+AIOHTTP_CLIENT_DNS_CACHE_TTL = os.environ.get("AIOHTTP_CLIENT_DNS_CACHE_TTL", "300")
+try:
+    AIOHTTP_CLIENT_DNS_CACHE_TTL = int(AIOHTTP_CLIENT_DNS_CACHE_TTL)
+except ValueError:
+    AIOHTTP_CLIENT_DNS_CACHE_TTL = 300
+
+# Seconds an idle connection is kept open for reuse
+AIOHTTP_CLIENT_KEEPALIVE_TIMEOUT = os.environ.get(
+    "AIOHTTP_CLIENT_KEEPALIVE_TIMEOUT", "30"
+)
+try:
+    AIOHTTP_CLIENT_KEEPALIVE_TIMEOUT = float(AIOHTTP_CLIENT_KEEPALIVE_TIMEOUT)
+except ValueError:
+    AIOHTTP_CLIENT_KEEPALIVE_TIMEOUT = 30.0
+
+
+# Strategy used to pick one of the Ollama or OpenAI connections that serve a
+# model: least_outstanding, weighted or random
+BACKEND_LOAD_BALANCING_STRATEGY = os.environ.get(
+    "BACKEND_LOAD_BALANCING_STRATEGY", "least_outstanding"
+).lower()
+
+# Consecutive failures after which a connection is skipped for
+# BACKEND_CIRCUIT_BREAKER_COOLDOWN seconds, 0 disables the circuit breaker
+BACKEND_CIRCUIT_BREAKER_THRESHOLD = os.environ.get(
+    "BACKEND_CIRCUIT_BREAKER_THRESHOLD", "3"
+)
+try:
+    BACKEND_CIRCUIT_BREAKER_THRESHOLD = int(BACKEND_CIRCUIT_BREAKER_THRESHOLD)
+except Exception:
+    BACKEND_CIRCUIT_BREAKER_THRESHOLD = 3
+
+BACKEND_CIRCUIT_BREAKER_COOLDOWN = os.environ.get(
+    "BACKEND_CIRCUIT_BREAKER_COOLDOWN", "30"
+)
+try:
+    BACKEND_CIRCUIT_BREAKER_COOLDOWN = int(BACKEND_CIRCUIT_BREAKER_COOLDOWN)
+except Exception:
+    BACKEND_CIRCUIT_BREAKER_COOLDOWN = 30
+
+
+####################################
+# MCP
+####################################
+
+# Seconds an unused pooled MCP session is kept open
+MCP_SESSION_IDLE_TIMEOUT = os.environ.get("MCP_SESSION_IDLE_TIMEOUT", "300")
+try:
+    MCP_SESSION_IDLE_TIMEOUT = int(MCP_SESSION_IDLE_TIMEOUT)
+except Exception:
+    MCP_SESSION_IDLE_TIMEOUT = 300
+
+# Seconds after which a pooled MCP session is pinged before it is reused
+MCP_SESSION_HEALTH_CHECK_INTERVAL = os.environ.get(
+    "MCP_SESSION_HEALTH_CHECK_INTERVAL", "60"
+)
+try:
+    MCP_SESSION_HEALTH_CHECK_INTERVAL = int(MCP_SESSION_HEALTH_CHECK_INTERVAL)
+except Exception:
+    MCP_SESSION_HEALTH_CHECK_INTERVAL = 60
+
+# Seconds the tool specs of an MCP server are cached, 0 disables the cache
+MCP_TOOL_SPECS_CACHE_TTL = os.environ.get("MCP_TOOL_SPECS_CACHE_TTL", "300")
+try:
+    MCP_TOOL_SPECS_CACHE_TTL = int(MCP_TOOL_SPECS_CACHE_TTL)
+except Exception:
+    MCP_TOOL_SPECS_CACHE_TTL = 300
+
 
 ####################################
 # SENTENCE TRANSFORMERS
@@ -511,6 +511,11 @@ from open_webui.utils.oauth import (
 )
 from open_webui.utils.security_headers import SecurityHeadersMiddleware
 from open_webui.utils.redis import get_redis_connection
+from open_webui.utils.message_journal import MessageJournal
+from open_webui.utils.message_events import MESSAGE_EVENT_QUEUE
+from open_webui.retrieval.embedding_client import EMBEDDING_CLIENT
+from open_webui.utils.http_session import HTTP_SESSION_MANAGER
+from open_webui.utils.mcp.pool import MCP_SESSION_POOL
 
 from open_webui.tasks import (
     redis_task_command_listener,
@@ -583,6 +588,12 @@ async def lifespan(app: FastAPI):
             redis_task_command_listener(app)
         )
 
+    await HTTP_SESSION_MANAGER.start()
+
+    app.state.message_journal = MessageJournal(redis=app.state.redis)
+    if app.state.redis is not None:
+        asyncio.create_task(app.state.message_journal.periodic_recovery())
+
     if THREAD_POOL_SIZE and THREAD_POOL_SIZE > 0:
         limiter = anyio.to_thread.current_default_thread_limiter()
         limiter.total_tokens = THREAD_POOL_SIZE
@@ -624,6 +635,13 @@ async def lifespan(app: FastAPI):
 
     yield
 
+    await MESSAGE_EVENT_QUEUE.flush_all()
+    await app.state.message_journal.flush_all()
+    EMBEDDING_CLIENT.close()
+    await MCP_SESSION_POOL.close_all()
+    await HTTP_SESSION_MANAGER.close()
+    Users.flush_last_active()
+
     if hasattr(app.state, "redis_task_command_listener"):
         app.state.redis_task_command_listener.cancel()
 
@@ -652,6 +670,7 @@ app.state.config = AppConfig(
     redis_key_prefix=REDIS_KEY_PREFIX,
 )
 app.state.redis = None
+app.state.message_journal = MessageJournal()
 
 app.state.WEBUI_NAME = WEBUI_NAME
 app.state.LICENSE_METADATA = None
@@ -1634,14 +1653,6 @@ async def chat_completion(
 
                 except:
                     pass
-        finally:
-            try:
-                if mcp_clients := metadata.get("mcp_clients"):
-                    for client in reversed(mcp_clients.values()):
-                        await client.disconnect()
-            except Exception as e:
-                log.debug(f"Error cleaning up: {e}")
-                pass
 
     if (
         metadata.get("session_id")
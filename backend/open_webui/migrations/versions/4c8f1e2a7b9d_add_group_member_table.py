@@ -0,0 +1,73 @@
+"""Add group_member table
+
+Revision ID: 4c8f1e2a7b9d
+Revises: 5d7e1b3a9c24
+Create Date: 2026-10-18 16:05:37.274921
+
+"""
+
+import json
+import time
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.sql import table, column, select
+
+
+# revision identifiers, used by Alembic.
+revision: str = "4c8f1e2a7b9d"
+down_revision: Union[str, None] = "5d7e1b3a9c24"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def get_user_ids(user_ids):
+    if isinstance(user_ids, str):
+        try:
+            user_ids = json.loads(user_ids)
+        except json.JSONDecodeError:
+            return []
+
+    if not isinstance(user_ids, list):
+        return []
+
+    # Deduplicate, keeping the order
+    return list(
+        dict.fromkeys(user_id for user_id in user_ids if isinstance(user_id, str))
+    )
+
+
+def upgrade() -> None:
+    group_member_table = op.create_table(
+        "group_member",
+        sa.Column("group_id", sa.Text(), nullable=False),
+        sa.Column("user_id", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.BigInteger(), nullable=True),
+        sa.PrimaryKeyConstraint("group_id", "user_id"),
+    )
+    op.create_index("group_member_user_id_idx", "group_member", ["user_id"])
+
+    # Backfill the rows from the user_ids of the groups
+    group_table = table(
+        "group",
+        column("id", sa.String()),
+        column("user_ids", sa.JSON()),
+    )
+
+    conn = op.get_bind()
+    now = int(time.time())
+
+    rows = []
+    for group in conn.execute(select(group_table.c.id, group_table.c.user_ids)):
+        rows.extend(
+            {"group_id": group.id, "user_id": user_id, "created_at": now}
+            for user_id in get_user_ids(group.user_ids)
+        )
+    if rows:
+        op.bulk_insert(group_member_table, rows)
+
+
+def downgrade() -> None:
+    op.drop_index("group_member_user_id_idx", table_name="group_member")
+    op.drop_table("group_member")
@@ -0,0 +1,188 @@
+"""Add chat_search full-text index
+
+Revision ID: 5d7e1b3a9c24
+Revises: 8a4f2c9d1e3b
+Create Date: 2026-10-18 14:36:02.507113
+
+"""
+
+import json
+import logging
+import time
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.sql import table, column, select
+
+log = logging.getLogger(__name__)
+
+# revision identifiers, used by Alembic.
+revision: str = "5d7e1b3a9c24"
+down_revision: Union[str, None] = "8a4f2c9d1e3b"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 500
+
+
+def get_content(message):
+    content = message.get("content", "")
+    if isinstance(content, list):
+        content = " ".join(
+            part.get("text", "")
+            for part in content
+            if isinstance(part, dict) and part.get("type") == "text"
+        )
+    elif not isinstance(content, str):
+        content = ""
+    return content.replace("\x00", "")
+
+
+def get_search_rows(chat_id, user_id, title, chat, now):
+    if isinstance(chat, str):
+        try:
+            chat = json.loads(chat)
+        except json.JSONDecodeError:
+            chat = {}
+
+    rows = [
+        {
+            "chat_id": chat_id,
+            "message_id": "",
+            "user_id": user_id,
+            "content": (title or "").replace("\x00", ""),
+            "updated_at": now,
+        }
+    ]
+
+    messages = ((chat or {}).get("history", {}) or {}).get("messages", {}) or {}
+    for message_id, message in messages.items():
+        if not isinstance(message, dict):
+            continue
+
+        rows.append(
+            {
+                "chat_id": chat_id,
+                "message_id": message_id,
+                "user_id": user_id,
+                "content": get_content(message),
+                "updated_at": now,
+            }
+        )
+    return rows
+
+
+def upgrade() -> None:
+    chat_search_table = op.create_table(
+        "chat_search",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("chat_id", sa.Text(), nullable=False),
+        sa.Column("message_id", sa.Text(), nullable=False),
+        sa.Column("user_id", sa.Text(), nullable=True),
+        sa.Column("content", sa.Text(), nullable=True),
+        sa.Column("updated_at", sa.BigInteger(), nullable=True),
+    )
+    op.create_index(
+        "chat_search_chat_id_message_id_idx",
+        "chat_search",
+        ["chat_id", "message_id"],
+        unique=True,
+    )
+    op.create_index("chat_search_user_id_idx", "chat_search", ["user_id"])
+
+    conn = op.get_bind()
+    dialect_name = conn.dialect.name
+
+    if dialect_name == "sqlite":
+        try:
+            # External content table, the text itself is only stored once
+            op.execute(
+                "CREATE VIRTUAL TABLE chat_search_fts USING fts5("
+                "content, content='chat_search', content_rowid='id', "
+                "tokenize='unicode61 remove_diacritics 2')"
+            )
+        except Exception as e:
+            # Without FTS5 the chat search keeps using LIKE
+            log.warning(f"FTS5 is not available, skipping the chat search index: {e}")
+        else:
+            op.execute(
+                "CREATE TRIGGER chat_search_ai AFTER INSERT ON chat_search BEGIN "
+                "INSERT INTO chat_search_fts(rowid, content) "
+                "VALUES (new.id, new.content); "
+                "END"
+            )
+            op.execute(
+                "CREATE TRIGGER chat_search_ad AFTER DELETE ON chat_search BEGIN "
+                "INSERT INTO chat_search_fts(chat_search_fts, rowid, content) "
+                "VALUES ('delete', old.id, old.content); "
+                "END"
+            )
+            op.execute(
+                "CREATE TRIGGER chat_search_au AFTER UPDATE OF content ON chat_search BEGIN "
+                "INSERT INTO chat_search_fts(chat_search_fts, rowid, content) "
+                "VALUES ('delete', old.id, old.content); "
+                "INSERT INTO chat_search_fts(rowid, content) "
+                "VALUES (new.id, new.content); "
+                "END"
+            )
+    elif dialect_name == "postgresql":
+        op.execute(
+            "ALTER TABLE chat_search ADD COLUMN content_tsv tsvector "
+            "GENERATED ALWAYS AS (to_tsvector('simple', coalesce(content, ''))) STORED"
+        )
+        op.execute(
+            "CREATE INDEX chat_search_content_tsv_idx "
+            "ON chat_search USING GIN (content_tsv)"
+        )
+
+    # Backfill the index from the chat documents
+    chat_table = table(
+        "chat",
+        column("id", sa.String()),
+        column("user_id", sa.String()),
+        column("title", sa.Text()),
+        column("chat", sa.JSON()),
+    )
+
+    now = int(time.time())
+
+    # Page through the chats by id so large databases are not loaded at once
+    last_id = None
+    while True:
+        query = select(
+            chat_table.c.id,
+            chat_table.c.user_id,
+            chat_table.c.title,
+            chat_table.c.chat,
+        ).order_by(chat_table.c.id)
+        if last_id is not None:
+            query = query.where(chat_table.c.id > last_id)
+        chats = conn.execute(query.limit(BATCH_SIZE)).fetchall()
+        if not chats:
+            break
+
+        rows = []
+        for chat in chats:
+            rows.extend(
+                get_search_rows(chat.id, chat.user_id, chat.title, chat.chat, now)
+            )
+        if rows:
+            op.bulk_insert(chat_search_table, rows)
+
+        last_id = chats[-1].id
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    if conn.dialect.name == "sqlite":
+        op.execute("DROP TRIGGER IF EXISTS chat_search_ai")
+        op.execute("DROP TRIGGER IF EXISTS chat_search_ad")
+        op.execute("DROP TRIGGER IF EXISTS chat_search_au")
+        op.execute("DROP TABLE IF EXISTS chat_search_fts")
+    elif conn.dialect.name == "postgresql":
+        op.execute("DROP INDEX IF EXISTS chat_search_content_tsv_idx")
+
+    op.drop_index("chat_search_user_id_idx", table_name="chat_search")
+    op.drop_index("chat_search_chat_id_message_id_idx", table_name="chat_search")
+    op.drop_table("chat_search")
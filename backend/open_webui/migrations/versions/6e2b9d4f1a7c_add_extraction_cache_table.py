@@ -0,0 +1,39 @@
+"""Add extraction_cache table
+
+Revision ID: 6e2b9d4f1a7c
+Revises: 4c8f1e2a7b9d
+Create Date: 2026-10-18 18:42:11.506318
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "6e2b9d4f1a7c"
+down_revision: Union[str, None] = "4c8f1e2a7b9d"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "extraction_cache",
+        sa.Column("key", sa.Text(), nullable=False),
+        sa.Column("path", sa.Text(), nullable=False),
+        sa.Column("size", sa.BigInteger(), nullable=False),
+        sa.Column("created_at", sa.BigInteger(), nullable=False),
+        sa.Column("accessed_at", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("key"),
+    )
+    op.create_index(
+        "extraction_cache_accessed_at_idx", "extraction_cache", ["accessed_at"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("extraction_cache_accessed_at_idx", table_name="extraction_cache")
+    op.drop_table("extraction_cache")
@@ -0,0 +1,113 @@
+"""Add chat_message table
+
+Revision ID: 8a4f2c9d1e3b
+Revises: b2c3d4e5f6a7
+Create Date: 2026-10-18 10:12:41.118204
+
+"""
+
+import json
+import time
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.sql import table, column, select
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8a4f2c9d1e3b"
+down_revision: Union[str, None] = "b2c3d4e5f6a7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 500
+MESSAGE_COLUMN_FIELDS = {"id", "parentId", "role", "content"}
+
+
+def get_message_rows(chat_id, chat, now):
+    if isinstance(chat, str):
+        try:
+            chat = json.loads(chat)
+        except json.JSONDecodeError:
+            return []
+
+    messages = ((chat or {}).get("history", {}) or {}).get("messages", {}) or {}
+
+    rows = []
+    for message_id, message in messages.items():
+        if not isinstance(message, dict):
+            continue
+
+        content = message.get("content")
+        meta = {
+            key: value
+            for key, value in message.items()
+            if key not in MESSAGE_COLUMN_FIELDS
+        }
+        if content is not None and not isinstance(content, str):
+            meta["content"] = content
+            content = None
+
+        rows.append(
+            {
+                "chat_id": chat_id,
+                "message_id": message_id,
+                "parent_id": message.get("parentId"),
+                "role": message.get("role"),
+                "content": content.replace("\x00", "") if content else content,
+                "meta": meta,
+                "created_at": now,
+                "updated_at": now,
+            }
+        )
+    return rows
+
+
+def upgrade() -> None:
+    chat_message_table = op.create_table(
+        "chat_message",
+        sa.Column("chat_id", sa.Text(), nullable=False),
+        sa.Column("message_id", sa.Text(), nullable=False),
+        sa.Column("parent_id", sa.Text(), nullable=True),
+        sa.Column("role", sa.Text(), nullable=True),
+        sa.Column("content", sa.Text(), nullable=True),
+        sa.Column("meta", sa.JSON(), nullable=True),
+        sa.Column("created_at", sa.BigInteger(), nullable=True),
+        sa.Column("updated_at", sa.BigInteger(), nullable=True),
+        sa.PrimaryKeyConstraint("chat_id", "message_id"),
+    )
+    op.create_index("chat_message_chat_id_idx", "chat_message", ["chat_id"])
+
+    # Backfill the rows from the chat documents
+    chat_table = table(
+        "chat",
+        column("id", sa.String()),
+        column("chat", sa.JSON()),
+    )
+
+    conn = op.get_bind()
+    now = int(time.time())
+
+    # Page through the chats by id so large databases are not loaded at once
+    last_id = None
+    while True:
+        query = select(chat_table.c.id, chat_table.c.chat).order_by(chat_table.c.id)
+        if last_id is not None:
+            query = query.where(chat_table.c.id > last_id)
+        chats = conn.execute(query.limit(BATCH_SIZE)).fetchall()
+        if not chats:
+            break
+
+        rows = []
+        for chat in chats:
+            rows.extend(get_message_rows(chat.id, chat.chat, now))
+        if rows:
+            op.bulk_insert(chat_message_table, rows)
+
+        last_id = chats[-1].id
+
+
+def downgrade() -> None:
+    op.drop_index("chat_message_chat_id_idx", table_name="chat_message")
+    op.drop_table("chat_message")
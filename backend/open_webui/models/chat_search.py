@@ -0,0 +1,284 @@
+import html
+import logging
+import re
+
+from open_webui.internal.db import Base
+from open_webui.env import SRC_LOG_LEVELS
+
+from sqlalchemy import BigInteger, Column, Float, Index, Integer, Text
+from sqlalchemy import bindparam, inspect, text
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MODELS"])
+
+
+####################
+# Chat Search DB Schema
+####################
+
+# The message_id of the row that indexes the chat title
+TITLE_MESSAGE_ID = ""
+
+SNIPPET_START = "<mark>"
+SNIPPET_END = "</mark>"
+
+# Private use characters marking the matches in the snippets returned by the
+# database, replaced by SNIPPET_START/SNIPPET_END once the text is escaped
+MATCH_START = "\ue000"
+MATCH_END = "\ue001"
+
+
+def get_snippet_html(snippet: str) -> str:
+    return (
+        html.escape(snippet)
+        .replace(MATCH_START, SNIPPET_START)
+        .replace(MATCH_END, SNIPPET_END)
+    )
+
+
+class ChatSearch(Base):
+    """
+    One row per chat message (and one for the chat title) holding the text
+    that is full-text indexed. SQLite mirrors the content into the
+    chat_search_fts FTS5 table through triggers, PostgreSQL keeps a generated
+    content_tsv column with a GIN index. Both are created by the migration.
+    """
+
+    __tablename__ = "chat_search"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    chat_id = Column(Text, nullable=False)
+    message_id = Column(Text, nullable=False)
+    user_id = Column(Text, nullable=True)
+    content = Column(Text, nullable=True)
+
+    updated_at = Column(BigInteger)
+
+    __table_args__ = (
+        Index(
+            "chat_search_chat_id_message_id_idx", "chat_id", "message_id", unique=True
+        ),
+        Index("chat_search_user_id_idx", "user_id"),
+    )
+
+
+def get_message_search_content(message: dict) -> str:
+    content = message.get("content", "")
+
+    if isinstance(content, list):
+        # Multi-part content, index the text parts only
+        content = " ".join(
+            part.get("text", "")
+            for part in content
+            if isinstance(part, dict) and part.get("type") == "text"
+        )
+    elif not isinstance(content, str):
+        content = ""
+
+    return content.replace("\x00", "")
+
+
+def get_search_terms(search_text: str) -> list[str]:
+    return re.findall(r"\w+", search_text.lower())
+
+
+class ChatSearchTable:
+    def __init__(self):
+        self._available = {}
+
+    def is_available(self, db) -> bool:
+        dialect_name = db.bind.dialect.name
+        if dialect_name not in self._available:
+            try:
+                tables = inspect(db.bind).get_table_names()
+                if dialect_name == "sqlite":
+                    self._available[dialect_name] = "chat_search_fts" in tables
+                elif dialect_name == "postgresql":
+                    self._available[dialect_name] = "chat_search" in tables
+                else:
+                    self._available[dialect_name] = False
+            except Exception as e:
+                log.warning(f"Unable to inspect the chat search index: {e}")
+                self._available[dialect_name] = False
+
+        return self._available[dialect_name]
+
+    def sync_chat(self, db, chat_id: str, user_id: str, chat: dict, now: int):
+        """
+        Bring the index of a chat up to date with its document. Only rows whose
+        text changed are written, so saving a long chat after a single new
+        message costs one insert.
+        """
+        if not self.is_available(db):
+            return
+
+        contents = {TITLE_MESSAGE_ID: (chat.get("title") or "").replace("\x00", "")}
+        for message_id, message in (
+            (chat.get("history", {}) or {}).get("messages", {}) or {}
+        ).items():
+            if isinstance(message, dict):
+                contents[message_id] = get_message_search_content(message)
+
+        rows = {
+            row.message_id: row
+            for row in db.query(ChatSearch).filter_by(chat_id=chat_id).all()
+        }
+
+        for message_id, content in contents.items():
+            row = rows.pop(message_id, None)
+            if row is None:
+                db.add(
+                    ChatSearch(
+                        chat_id=chat_id,
+                        message_id=message_id,
+                        user_id=user_id,
+                        content=content,
+                        updated_at=now,
+                    )
+                )
+            elif row.content != content or row.user_id != user_id:
+                row.content = content
+                row.user_id = user_id
+                row.updated_at = now
+
+        for row in rows.values():
+            db.delete(row)
+
+    def upsert_message(
+        self, db, chat_id: str, user_id: str, message_id: str, message: dict, now: int
+    ):
+        if not self.is_available(db):
+            return
+
+        content = get_message_search_content(message)
+
+        row = (
+            db.query(ChatSearch)
+            .filter_by(chat_id=chat_id, message_id=message_id)
+            .first()
+        )
+        if row is None:
+            db.add(
+                ChatSearch(
+                    chat_id=chat_id,
+                    message_id=message_id,
+                    user_id=user_id,
+                    content=content,
+                    updated_at=now,
+                )
+            )
+        elif row.content != content:
+            row.content = content
+            row.updated_at = now
+
+    def delete_by_chat_ids(self, db, chat_ids):
+        """
+        `chat_ids` can be a list or a select of chat ids.
+        """
+        if not self.is_available(db):
+            return
+
+        db.query(ChatSearch).filter(ChatSearch.chat_id.in_(chat_ids)).delete(
+            synchronize_session=False
+        )
+
+    def get_ranked_chats(self, db, user_id: str, search_text: str):
+        """
+        Returns a (chat_id, message_id, score) subquery with the best matching
+        row of every chat of the user, or None if there is nothing to match.
+        A higher score is a better match.
+        """
+        terms = get_search_terms(search_text)
+        if not terms:
+            return None
+
+        dialect_name = db.bind.dialect.name
+        if dialect_name == "sqlite":
+            # Every term is matched as a prefix, like the former LIKE search
+            # matched partial words. FTS5 ranks lower (more negative) as better.
+            search_query = " AND ".join(f'"{term}"*' for term in terms)
+            ranked = text(
+                "SELECT chat_search.chat_id AS chat_id, "
+                "chat_search.message_id AS message_id, "
+                "-MIN(chat_search_fts.rank) AS score "
+                "FROM chat_search_fts "
+                "JOIN chat_search ON chat_search.id = chat_search_fts.rowid "
+                "WHERE chat_search_fts MATCH :search_query "
+                "AND chat_search.user_id = :search_user_id "
+                "GROUP BY chat_search.chat_id"
+            )
+        elif dialect_name == "postgresql":
+            search_query = " & ".join(f"{term}:*" for term in terms)
+            ranked = text(
+                "SELECT DISTINCT ON (chat_id) chat_id, message_id, "
+                "ts_rank(content_tsv, to_tsquery('simple', :search_query)) AS score "
+                "FROM chat_search "
+                "WHERE user_id = :search_user_id "
+                "AND content_tsv @@ to_tsquery('simple', :search_query) "
+                "ORDER BY chat_id, score DESC"
+            )
+        else:
+            return None
+
+        return (
+            ranked.bindparams(search_query=search_query, search_user_id=user_id)
+            .columns(
+                Column("chat_id", Text),
+                Column("message_id", Text),
+                Column("score", Float),
+            )
+            .subquery("ranked_chats")
+        )
+
+    def get_snippets(
+        self, db, search_text: str, matches: list[tuple[str, str]]
+    ) -> dict[tuple[str, str], str]:
+        """
+        Returns highlighted snippets for the given (chat_id, message_id) rows,
+        as escaped HTML with the matches wrapped in SNIPPET_START/SNIPPET_END.
+        """
+        terms = get_search_terms(search_text)
+        if not terms or not matches:
+            return {}
+
+        dialect_name = db.bind.dialect.name
+        if dialect_name == "sqlite":
+            search_query = " AND ".join(f'"{term}"*' for term in terms)
+            statement = text(
+                "SELECT chat_search.chat_id, chat_search.message_id, "
+                f"snippet(chat_search_fts, 0, '{MATCH_START}', '{MATCH_END}', '…', 24) "
+                "FROM chat_search_fts "
+                "JOIN chat_search ON chat_search.id = chat_search_fts.rowid "
+                "WHERE chat_search_fts MATCH :search_query "
+                "AND chat_search.chat_id IN :chat_ids"
+            )
+        elif dialect_name == "postgresql":
+            search_query = " & ".join(f"{term}:*" for term in terms)
+            statement = text(
+                "SELECT chat_id, message_id, "
+                "ts_headline('simple', content, to_tsquery('simple', :search_query), "
+                f"'StartSel={MATCH_START}, StopSel={MATCH_END}, MaxWords=24, MinWords=8') "
+                "FROM chat_search "
+                "WHERE chat_id IN :chat_ids "
+                "AND content_tsv @@ to_tsquery('simple', :search_query)"
+            )
+        else:
+            return {}
+
+        wanted = set(matches)
+        rows = db.execute(
+            statement.bindparams(bindparam("chat_ids", expanding=True)),
+            {
+                "search_query": search_query,
+                "chat_ids": list({chat_id for chat_id, _ in matches}),
+            },
+        )
+
+        return {
+            (row[0], row[1]): get_snippet_html(row[2])
+            for row in rows
+            if (row[0], row[1]) in wanted and row[2] is not None
+        }
+
+
+ChatSearches = ChatSearchTable()
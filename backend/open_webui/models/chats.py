@@ -7,10 +7,20 @@ from typing import Optional
 from open_webui.internal.db import Base, get_db
 from open_webui.models.tags import TagModel, Tag, Tags
 from open_webui.models.folders import Folders
-from open_webui.env import SRC_LOG_LEVELS
+from open_webui.models.chat_search import ChatSearches
+from open_webui.env import SRC_LOG_LEVELS, ENABLE_CHAT_MESSAGE_TABLE
 
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy import BigInteger, Boolean, Column, String, Text, JSON, Index
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    Column,
+    String,
+    Text,
+    JSON,
+    Index,
+    PrimaryKeyConstraint,
+)
 from sqlalchemy import or_, func, select, and_, text
 from sqlalchemy.sql import exists
 from sqlalchemy.sql.expression import bindparam
@@ -56,6 +66,66 @@ class Chat(Base):
     )
 
 
+class ChatMessage(Base):
+    __tablename__ = "chat_message"
+
+    chat_id = Column(Text, nullable=False)
+    message_id = Column(Text, nullable=False)
+
+    parent_id = Column(Text, nullable=True)
+    role = Column(Text, nullable=True)
+    content = Column(Text, nullable=True)
+
+    # Every other field of the message (childrenIds, model, files, ...)
+    meta = Column(JSON, nullable=True)
+
+    created_at = Column(BigInteger)
+    updated_at = Column(BigInteger)
+
+    __table_args__ = (
+        PrimaryKeyConstraint("chat_id", "message_id"),
+        Index("chat_message_chat_id_idx", "chat_id"),
+    )
+
+
+CHAT_MESSAGE_COLUMN_FIELDS = {"id", "parentId", "role", "content"}
+
+
+def chat_message_to_dict(message: ChatMessage) -> dict:
+    meta = message.meta or {}
+    return {
+        **meta,
+        "id": message.message_id,
+        "parentId": message.parent_id,
+        "role": message.role,
+        "content": (
+            message.content if message.content is not None else meta.get("content")
+        ),
+    }
+
+
+def get_chat_message_values(message_id: str, message: dict) -> dict:
+    content = message.get("content")
+
+    meta = {
+        key: value
+        for key, value in message.items()
+        if key not in CHAT_MESSAGE_COLUMN_FIELDS
+    }
+    if content is not None and not isinstance(content, str):
+        # Multi-part content is kept as is in meta
+        meta["content"] = content
+        content = None
+
+    return {
+        "message_id": message_id,
+        "parent_id": message.get("parentId"),
+        "role": message.get("role"),
+        "content": content,
+        "meta": meta,
+    }
+
+
 class ChatModel(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
@@ -115,6 +185,12 @@ class ChatResponse(BaseModel):
     folder_id: Optional[str] = None
 
 
+class ChatSearchResultModel(ChatModel):
+    # Highlighted excerpt of the best matching message (or title)
+    snippet: Optional[str] = None
+    score: Optional[float] = None
+
+
 class ChatTitleIdResponse(BaseModel):
     id: str
     title: str
@@ -122,7 +198,98 @@ class ChatTitleIdResponse(BaseModel):
     created_at: int
 
 
+class ChatSearchResultResponse(ChatTitleIdResponse):
+    snippet: Optional[str] = None
+
+
 class ChatTable:
+    def _sync_chat_messages(self, db, chat_id: str, chat: dict):
+        """
+        Mirror the messages of a full chat document into the chat_message table.
+        """
+        if not ENABLE_CHAT_MESSAGE_TABLE:
+            # Rows left from when the table was enabled would go stale while
+            # the JSON document is written directly. Reads overlay the rows
+            # whether the table is enabled or not, so the document written
+            # here already holds their messages. Checking first keeps the
+            # common case of no rows free of a write.
+            if self._has_chat_messages(db, chat_id):
+                db.query(ChatMessage).filter_by(chat_id=chat_id).delete()
+            return
+
+        messages = (chat.get("history", {}) or {}).get("messages", {}) or {}
+        rows = {
+            row.message_id: row
+            for row in db.query(ChatMessage).filter_by(chat_id=chat_id).all()
+        }
+
+        now = int(time.time())
+        for message_id, message in messages.items():
+            values = get_chat_message_values(message_id, message)
+
+            row = rows.pop(message_id, None)
+            if row is None:
+                db.add(
+                    ChatMessage(
+                        chat_id=chat_id, **values, created_at=now, updated_at=now
+                    )
+                )
+            elif any(getattr(row, key) != value for key, value in values.items()):
+                for key, value in values.items():
+                    setattr(row, key, value)
+                row.updated_at = now
+
+        for row in rows.values():
+            db.delete(row)
+
+    def _has_chat_messages(self, db, chat_id: str) -> bool:
+        return db.query(exists().where(ChatMessage.chat_id == chat_id)).scalar()
+
+    def _get_chat_models(
+        self, db, chats: list[Chat], model: type[ChatModel] = ChatModel
+    ) -> list[ChatModel]:
+        """
+        Assemble the legacy `history.messages` shape from the chat_message
+        rows, so callers keep seeing a complete chat document.
+
+        Rows are newer than the JSON document until a full chat write folds
+        them back into it, so they are applied even with the table disabled.
+        Every getter that returns chat documents goes through here.
+        """
+        chat_models = [model.model_validate(chat) for chat in chats]
+        if not chat_models:
+            return chat_models
+
+        rows_by_chat_id = {}
+        for row in (
+            db.query(ChatMessage)
+            .filter(ChatMessage.chat_id.in_([chat.id for chat in chat_models]))
+            .order_by(ChatMessage.created_at)
+        ):
+            rows_by_chat_id.setdefault(row.chat_id, []).append(row)
+
+        for chat_model in chat_models:
+            rows = rows_by_chat_id.get(chat_model.id)
+            if not rows:
+                continue
+
+            history = chat_model.chat.get("history", {}) or {}
+            chat_model.chat = {
+                **chat_model.chat,
+                "history": {
+                    **history,
+                    "messages": {
+                        **(history.get("messages", {}) or {}),
+                        **{row.message_id: chat_message_to_dict(row) for row in rows},
+                    },
+                },
+            }
+
+        return chat_models
+
+    def _get_chat_model(self, db, chat: Chat) -> ChatModel:
+        return self._get_chat_models(db, [chat])[0]
+
     def insert_new_chat(self, user_id: str, form_data: ChatForm) -> Optional[ChatModel]:
         with get_db() as db:
             id = str(uuid.uuid4())
@@ -144,6 +311,9 @@ class ChatTable:
 
             result = Chat(**chat.model_dump())
             db.add(result)
+            if ENABLE_CHAT_MESSAGE_TABLE:
+                self._sync_chat_messages(db, id, form_data.chat)
+            ChatSearches.sync_chat(db, id, user_id, form_data.chat, chat.updated_at)
             db.commit()
             db.refresh(result)
             return ChatModel.model_validate(result) if result else None
@@ -181,6 +351,9 @@ class ChatTable:
 
             result = Chat(**chat.model_dump())
             db.add(result)
+            if ENABLE_CHAT_MESSAGE_TABLE:
+                self._sync_chat_messages(db, id, form_data.chat)
+            ChatSearches.sync_chat(db, id, user_id, form_data.chat, chat.updated_at)
             db.commit()
             db.refresh(result)
             return ChatModel.model_validate(result) if result else None
@@ -192,10 +365,14 @@ class ChatTable:
                 chat_item.chat = chat
                 chat_item.title = chat["title"] if "title" in chat else "New Chat"
                 chat_item.updated_at = int(time.time())
+                self._sync_chat_messages(db, id, chat)
+                ChatSearches.sync_chat(
+                    db, id, chat_item.user_id, chat, chat_item.updated_at
+                )
                 db.commit()
                 db.refresh(chat_item)
 
-                return ChatModel.model_validate(chat_item)
+                return self._get_chat_model(db, chat_item)
         except Exception:
             return None
 
@@ -230,13 +407,26 @@ class ChatTable:
         return self.get_chat_by_id(id)
 
     def get_chat_title_by_id(self, id: str) -> Optional[str]:
-        chat = self.get_chat_by_id(id)
-        if chat is None:
-            return None
+        with get_db() as db:
+            # The title column is kept in sync with chat["title"]
+            chat = db.query(Chat.title).filter_by(id=id).first()
+            if chat is None:
+                return None
 
-        return chat.chat.get("title", "New Chat")
+            return chat.title or "New Chat"
 
     def get_messages_map_by_chat_id(self, id: str) -> Optional[dict]:
+        if ENABLE_CHAT_MESSAGE_TABLE:
+            with get_db() as db:
+                rows = (
+                    db.query(ChatMessage)
+                    .filter_by(chat_id=id)
+                    .order_by(ChatMessage.created_at)
+                    .all()
+                )
+                if rows:
+                    return {row.message_id: chat_message_to_dict(row) for row in rows}
+
         chat = self.get_chat_by_id(id)
         if chat is None:
             return None
@@ -246,23 +436,102 @@ class ChatTable:
     def get_message_by_id_and_message_id(
         self, id: str, message_id: str
     ) -> Optional[dict]:
+        if ENABLE_CHAT_MESSAGE_TABLE:
+            with get_db() as db:
+                row = db.get(ChatMessage, (id, message_id))
+                if row:
+                    return chat_message_to_dict(row)
+
         chat = self.get_chat_by_id(id)
         if chat is None:
             return None
 
         return chat.chat.get("history", {}).get("messages", {}).get(message_id, {})
 
-    def upsert_message_to_chat_by_id_and_message_id(
+    def _upsert_chat_message_row(
         self, id: str, message_id: str, message: dict
-    ) -> Optional[ChatModel]:
-        chat = self.get_chat_by_id(id)
-        if chat is None:
+    ) -> Optional[dict]:
+        """
+        Merge `message` into a single chat_message row without loading or
+        rewriting the chat document.
+        """
+        try:
+            with get_db() as db:
+                chat = (
+                    db.query(
+                        Chat.id,
+                        Chat.user_id,
+                        Chat.chat["history"]["currentId"]
+                        .as_string()
+                        .label("current_id"),
+                    )
+                    .filter_by(id=id)
+                    .first()
+                )
+                if chat is None:
+                    return None
+
+                if not self._has_chat_messages(db, id):
+                    # First row level write for a chat created before the table
+                    self._sync_chat_messages(db, id, db.get(Chat, id).chat)
+                    db.flush()
+
+                now = int(time.time())
+                row = db.get(ChatMessage, (id, message_id))
+                if row:
+                    message = {**chat_message_to_dict(row), **message}
+                    for key, value in get_chat_message_values(
+                        message_id, message
+                    ).items():
+                        setattr(row, key, value)
+                    row.updated_at = now
+                else:
+                    db.add(
+                        ChatMessage(
+                            chat_id=id,
+                            **get_chat_message_values(message_id, message),
+                            created_at=now,
+                            updated_at=now,
+                        )
+                    )
+
+                ChatSearches.upsert_message(
+                    db, id, chat.user_id, message_id, message, now
+                )
+
+                if chat.current_id != message_id:
+                    chat_item = db.get(Chat, id)
+                    history = chat_item.chat.get("history", {}) or {}
+                    chat_item.chat = {
+                        **chat_item.chat,
+                        "history": {**history, "currentId": message_id},
+                    }
+                    chat_item.updated_at = now
+                else:
+                    db.query(Chat).filter_by(id=id).update({"updated_at": now})
+
+                db.commit()
+                return message
+        except Exception as e:
+            log.exception(f"Error upserting chat message {message_id}: {e}")
             return None
 
+    def upsert_message_to_chat_by_id_and_message_id(
+        self, id: str, message_id: str, message: dict
+    ) -> Optional[ChatModel]:
         # Sanitize message content for null characters before upserting
         if isinstance(message.get("content"), str):
             message["content"] = message["content"].replace("\x00", "")
 
+        if ENABLE_CHAT_MESSAGE_TABLE:
+            if self._upsert_chat_message_row(id, message_id, message) is None:
+                return None
+            return self.get_chat_by_id(id)
+
+        chat = self.get_chat_by_id(id)
+        if chat is None:
+            return None
+
         chat = chat.chat
         history = chat.get("history", {})
 
@@ -279,9 +548,41 @@ class ChatTable:
         chat["history"] = history
         return self.update_chat_by_id(id, chat)
 
+    def upsert_chat_message(
+        self, id: str, message_id: str, message: dict
+    ) -> Optional[dict]:
+        """
+        Same as `upsert_message_to_chat_by_id_and_message_id`, but returns the
+        merged message instead of the whole chat. With the chat_message table
+        enabled only the message row is read and written.
+        """
+        if isinstance(message.get("content"), str):
+            message["content"] = message["content"].replace("\x00", "")
+
+        if ENABLE_CHAT_MESSAGE_TABLE:
+            return self._upsert_chat_message_row(id, message_id, message)
+
+        chat = self.upsert_message_to_chat_by_id_and_message_id(id, message_id, message)
+        if chat is None:
+            return None
+
+        return chat.chat.get("history", {}).get("messages", {}).get(message_id, {})
+
     def add_message_status_to_chat_by_id_and_message_id(
         self, id: str, message_id: str, status: dict
     ) -> Optional[ChatModel]:
+        if ENABLE_CHAT_MESSAGE_TABLE:
+            message = self.get_message_by_id_and_message_id(id, message_id)
+            if message is None:
+                return None
+            if message:
+                self._upsert_chat_message_row(
+                    id,
+                    message_id,
+                    {"statusHistory": [*message.get("statusHistory", []), status]},
+                )
+            return self.get_chat_by_id(id)
+
         chat = self.get_chat_by_id(id)
         if chat is None:
             return None
@@ -310,7 +611,7 @@ class ChatTable:
                     "id": str(uuid.uuid4()),
                     "user_id": f"shared-{chat_id}",
                     "title": chat.title,
-                    "chat": chat.chat,
+                    "chat": self._get_chat_model(db, chat).chat,
                     "meta": chat.meta,
                     "pinned": chat.pinned,
                     "folder_id": chat.folder_id,
@@ -344,7 +645,7 @@ class ChatTable:
                     return self.insert_shared_chat_by_chat_id(chat_id)
 
                 shared_chat.title = chat.title
-                shared_chat.chat = chat.chat
+                shared_chat.chat = self._get_chat_model(db, chat).chat
                 shared_chat.meta = chat.meta
                 shared_chat.pinned = chat.pinned
                 shared_chat.folder_id = chat.folder_id
@@ -384,7 +685,7 @@ class ChatTable:
                 chat.share_id = share_id
                 db.commit()
                 db.refresh(chat)
-                return ChatModel.model_validate(chat)
+                return self._get_chat_model(db, chat)
         except Exception:
             return None
 
@@ -396,7 +697,7 @@ class ChatTable:
                 chat.updated_at = int(time.time())
                 db.commit()
                 db.refresh(chat)
-                return ChatModel.model_validate(chat)
+                return self._get_chat_model(db, chat)
         except Exception:
             return None
 
@@ -408,7 +709,7 @@ class ChatTable:
                 chat.updated_at = int(time.time())
                 db.commit()
                 db.refresh(chat)
-                return ChatModel.model_validate(chat)
+                return self._get_chat_model(db, chat)
         except Exception:
             return None
 
@@ -459,7 +760,7 @@ class ChatTable:
                 query = query.limit(limit)
 
             all_chats = query.all()
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._get_chat_models(db, all_chats)
 
     def get_chat_list_by_user_id(
         self,
@@ -498,7 +799,7 @@ class ChatTable:
                 query = query.limit(limit)
 
             all_chats = query.all()
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._get_chat_models(db, all_chats)
 
     def get_chat_title_id_list_by_user_id(
         self,
@@ -556,13 +857,13 @@ class ChatTable:
                 .order_by(Chat.updated_at.desc())
                 .all()
             )
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._get_chat_models(db, all_chats)
 
     def get_chat_by_id(self, id: str) -> Optional[ChatModel]:
         try:
             with get_db() as db:
                 chat = db.get(Chat, id)
-                return ChatModel.model_validate(chat)
+                return self._get_chat_model(db, chat)
         except Exception:
             return None
 
@@ -584,7 +885,7 @@ class ChatTable:
         try:
             with get_db() as db:
                 chat = db.query(Chat).filter_by(id=id, user_id=user_id).first()
-                return ChatModel.model_validate(chat)
+                return self._get_chat_model(db, chat)
         except Exception:
             return None
 
@@ -595,7 +896,7 @@ class ChatTable:
                 # .limit(limit).offset(skip)
                 .order_by(Chat.updated_at.desc())
             )
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._get_chat_models(db, all_chats.all())
 
     def get_chats_by_user_id(self, user_id: str) -> list[ChatModel]:
         with get_db() as db:
@@ -604,7 +905,7 @@ class ChatTable:
                 .filter_by(user_id=user_id)
                 .order_by(Chat.updated_at.desc())
             )
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._get_chat_models(db, all_chats.all())
 
     def get_pinned_chats_by_user_id(self, user_id: str) -> list[ChatModel]:
         with get_db() as db:
@@ -613,7 +914,7 @@ class ChatTable:
                 .filter_by(user_id=user_id, pinned=True, archived=False)
                 .order_by(Chat.updated_at.desc())
             )
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._get_chat_models(db, all_chats)
 
     def get_archived_chats_by_user_id(self, user_id: str) -> list[ChatModel]:
         with get_db() as db:
@@ -622,7 +923,7 @@ class ChatTable:
                 .filter_by(user_id=user_id, archived=True)
                 .order_by(Chat.updated_at.desc())
             )
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._get_chat_models(db, all_chats)
 
     def get_chats_by_user_id_and_search_text(
         self,
@@ -631,9 +932,11 @@ class ChatTable:
         include_archived: bool = False,
         skip: int = 0,
         limit: int = 60,
-    ) -> list[ChatModel]:
+    ) -> list[ChatSearchResultModel]:
         """
-        Filters chats based on a search query using Python, allowing pagination using skip and limit.
+        Filters chats based on a search query, allowing pagination using skip and limit.
+        When the chat_search index exists, results are ranked by relevance and
+        carry a highlighted snippet of the best matching message.
         """
         search_text = search_text.replace("\u0000", "").lower().strip()
 
@@ -714,6 +1017,16 @@ class ChatTable:
             if folder_ids:
                 query = query.filter(Chat.folder_id.in_(folder_ids))
 
+            # Full-text index, None if not available or nothing to match. The
+            # LIKE filters below are used instead then.
+            ranked = None
+            if ChatSearches.is_available(db):
+                ranked = ChatSearches.get_ranked_chats(db, user_id, search_text)
+                if ranked is not None:
+                    query = query.join(ranked, ranked.c.chat_id == Chat.id)
+                    query = query.add_columns(ranked.c.message_id, ranked.c.score)
+                    query = query.order_by(ranked.c.score.desc())
+
             query = query.order_by(Chat.updated_at.desc())
 
             # Check if the database dialect is either 'sqlite' or 'postgresql'
@@ -728,11 +1041,13 @@ class ChatTable:
                     ")"
                 )
                 sqlite_content_clause = text(sqlite_content_sql)
-                query = query.filter(
-                    or_(
-                        Chat.title.ilike(bindparam("title_key")), sqlite_content_clause
-                    ).params(title_key=f"%{search_text}%", content_key=search_text)
-                )
+                if ranked is None:
+                    query = query.filter(
+                        or_(
+                            Chat.title.ilike(bindparam("title_key")),
+                            sqlite_content_clause,
+                        ).params(title_key=f"%{search_text}%", content_key=search_text)
+                    )
 
                 # Check if there are any tags to filter, it should have all the tags
                 if "none" in tag_ids:
@@ -777,14 +1092,15 @@ class ChatTable:
                     ")"
                 )
                 postgres_content_clause = text(postgres_content_sql)
-                # Also filter out chats with null bytes in title
-                query = query.filter(text("Chat.title::text NOT LIKE '%\\x00%'"))
-                query = query.filter(
-                    or_(
-                        Chat.title.ilike(bindparam("title_key")),
-                        postgres_content_clause,
-                    ).params(title_key=f"%{search_text}%", content_key=search_text)
-                )
+                if ranked is None:
+                    # Also filter out chats with null bytes in title
+                    query = query.filter(text("Chat.title::text NOT LIKE '%\\x00%'"))
+                    query = query.filter(
+                        or_(
+                            Chat.title.ilike(bindparam("title_key")),
+                            postgres_content_clause,
+                        ).params(title_key=f"%{search_text}%", content_key=search_text)
+                    )
 
                 # Check if there are any tags to filter, it should have all the tags
                 if "none" in tag_ids:
@@ -825,8 +1141,30 @@ class ChatTable:
 
             log.info(f"The number of chats: {len(all_chats)}")
 
-            # Validate and return chats
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            if ranked is None:
+                return self._get_chat_models(db, all_chats, ChatSearchResultModel)
+
+            # Only the rows of the returned page are highlighted
+            snippets = ChatSearches.get_snippets(
+                db,
+                search_text,
+                [(chat.id, message_id) for chat, message_id, _ in all_chats],
+            )
+
+            return [
+                chat_model.model_copy(
+                    update={
+                        "snippet": snippets.get((chat.id, message_id)),
+                        "score": score,
+                    }
+                )
+                for chat_model, (chat, message_id, score) in zip(
+                    self._get_chat_models(
+                        db, [chat for chat, _, _ in all_chats], ChatSearchResultModel
+                    ),
+                    all_chats,
+                )
+            ]
 
     def get_chats_by_folder_id_and_user_id(
         self, folder_id: str, user_id: str, skip: int = 0, limit: int = 60
@@ -844,7 +1182,7 @@ class ChatTable:
                 query = query.limit(limit)
 
             all_chats = query.all()
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._get_chat_models(db, all_chats)
 
     def get_chats_by_folder_ids_and_user_id(
         self, folder_ids: list[str], user_id: str
@@ -859,7 +1197,7 @@ class ChatTable:
             query = query.order_by(Chat.updated_at.desc())
 
             all_chats = query.all()
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._get_chat_models(db, all_chats)
 
     def update_chat_folder_id_by_id_and_user_id(
         self, id: str, user_id: str, folder_id: str
@@ -872,7 +1210,7 @@ class ChatTable:
                 chat.pinned = False
                 db.commit()
                 db.refresh(chat)
-                return ChatModel.model_validate(chat)
+                return self._get_chat_model(db, chat)
         except Exception:
             return None
 
@@ -911,7 +1249,7 @@ class ChatTable:
 
             all_chats = query.all()
             log.debug(f"all_chats: {all_chats}")
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._get_chat_models(db, all_chats)
 
     def add_chat_tag_by_id_and_user_id_and_tag_name(
         self, id: str, user_id: str, tag_name: str
@@ -932,7 +1270,7 @@ class ChatTable:
 
                 db.commit()
                 db.refresh(chat)
-                return ChatModel.model_validate(chat)
+                return self._get_chat_model(db, chat)
         except Exception:
             return None
 
@@ -1019,6 +1357,8 @@ class ChatTable:
         try:
             with get_db() as db:
                 db.query(Chat).filter_by(id=id).delete()
+                db.query(ChatMessage).filter_by(chat_id=id).delete()
+                ChatSearches.delete_by_chat_ids(db, [id])
                 db.commit()
 
                 return True and self.delete_shared_chat_by_chat_id(id)
@@ -1028,7 +1368,9 @@ class ChatTable:
     def delete_chat_by_id_and_user_id(self, id: str, user_id: str) -> bool:
         try:
             with get_db() as db:
-                db.query(Chat).filter_by(id=id, user_id=user_id).delete()
+                if db.query(Chat).filter_by(id=id, user_id=user_id).delete():
+                    db.query(ChatMessage).filter_by(chat_id=id).delete()
+                    ChatSearches.delete_by_chat_ids(db, [id])
                 db.commit()
 
                 return True and self.delete_shared_chat_by_chat_id(id)
@@ -1040,6 +1382,11 @@ class ChatTable:
             with get_db() as db:
                 self.delete_shared_chats_by_user_id(user_id)
 
+                chat_ids = select(Chat.id).where(Chat.user_id == user_id)
+                db.query(ChatMessage).filter(ChatMessage.chat_id.in_(chat_ids)).delete(
+                    synchronize_session=False
+                )
+                ChatSearches.delete_by_chat_ids(db, chat_ids)
                 db.query(Chat).filter_by(user_id=user_id).delete()
                 db.commit()
 
@@ -1052,6 +1399,13 @@ class ChatTable:
     ) -> bool:
         try:
             with get_db() as db:
+                chat_ids = select(Chat.id).where(
+                    Chat.user_id == user_id, Chat.folder_id == folder_id
+                )
+                db.query(ChatMessage).filter(ChatMessage.chat_id.in_(chat_ids)).delete(
+                    synchronize_session=False
+                )
+                ChatSearches.delete_by_chat_ids(db, chat_ids)
                 db.query(Chat).filter_by(user_id=user_id, folder_id=folder_id).delete()
                 db.commit()
 
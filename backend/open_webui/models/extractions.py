@@ -0,0 +1,115 @@
+import logging
+import time
+from typing import Optional
+
+from open_webui.internal.db import Base, get_db
+from open_webui.env import SRC_LOG_LEVELS
+from pydantic import BaseModel, ConfigDict
+from sqlalchemy import BigInteger, Column, Index, Text, func
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MODELS"])
+
+####################
+# Extraction Cache DB Schema
+####################
+
+
+class ExtractionCacheEntry(Base):
+    __tablename__ = "extraction_cache"
+
+    key = Column(Text, primary_key=True)
+    path = Column(Text, nullable=False)
+    size = Column(BigInteger, nullable=False)
+
+    created_at = Column(BigInteger, nullable=False)
+    accessed_at = Column(BigInteger, nullable=False)
+
+    __table_args__ = (Index("extraction_cache_accessed_at_idx", "accessed_at"),)
+
+
+class ExtractionCacheEntryModel(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    key: str
+    path: str
+    size: int
+
+    created_at: int  # timestamp in epoch
+    accessed_at: int  # timestamp in epoch
+
+
+class ExtractionCacheTable:
+    def get_entry_by_key(self, key: str) -> Optional[ExtractionCacheEntryModel]:
+        """Returns the entry and marks it as used."""
+        with get_db() as db:
+            entry = db.get(ExtractionCacheEntry, key)
+            if not entry:
+                return None
+
+            entry.accessed_at = int(time.time())
+            db.commit()
+            return ExtractionCacheEntryModel.model_validate(entry)
+
+    def upsert_entry(
+        self, key: str, path: str, size: int
+    ) -> Optional[ExtractionCacheEntryModel]:
+        with get_db() as db:
+            try:
+                now = int(time.time())
+                entry = db.get(ExtractionCacheEntry, key)
+                if entry:
+                    entry.path = path
+                    entry.size = size
+                    entry.accessed_at = now
+                else:
+                    entry = ExtractionCacheEntry(
+                        key=key, path=path, size=size, created_at=now, accessed_at=now
+                    )
+                    db.add(entry)
+                db.commit()
+                return ExtractionCacheEntryModel.model_validate(entry)
+            except Exception as e:
+                log.exception(f"Error saving extraction cache entry {key}: {e}")
+                return None
+
+    def get_total_size(self) -> int:
+        with get_db() as db:
+            return db.query(
+                func.coalesce(func.sum(ExtractionCacheEntry.size), 0)
+            ).scalar()
+
+    def get_count(self) -> int:
+        with get_db() as db:
+            return db.query(ExtractionCacheEntry).count()
+
+    def get_least_recently_used_entries(
+        self, limit: int
+    ) -> list[ExtractionCacheEntryModel]:
+        with get_db() as db:
+            return [
+                ExtractionCacheEntryModel.model_validate(entry)
+                for entry in db.query(ExtractionCacheEntry)
+                .order_by(ExtractionCacheEntry.accessed_at)
+                .limit(limit)
+                .all()
+            ]
+
+    def get_entries(self) -> list[ExtractionCacheEntryModel]:
+        with get_db() as db:
+            return [
+                ExtractionCacheEntryModel.model_validate(entry)
+                for entry in db.query(ExtractionCacheEntry).all()
+            ]
+
+    def delete_entry_by_key(self, key: str) -> bool:
+        with get_db() as db:
+            try:
+                db.query(ExtractionCacheEntry).filter_by(key=key).delete()
+                db.commit()
+                return True
+            except Exception:
+                return False
+
+
+ExtractionCaches = ExtractionCacheTable()
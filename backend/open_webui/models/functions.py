@@ -104,6 +104,11 @@ class FunctionValves(BaseModel):
 
 
 class FunctionsTable:
+    def __init__(self):
+        # Bumped whenever function or user valves change, lets callers that
+        # keep valves around (like the filter chains) know to reload them
+        self.valves_version = 0
+
     def insert_new_function(
         self, user_id: str, type: str, form_data: FunctionForm
     ) -> Optional[FunctionModel]:
@@ -283,6 +288,7 @@ class FunctionsTable:
                 function.updated_at = int(time.time())
                 db.commit()
                 db.refresh(function)
+                self.valves_version += 1
                 return self.get_function_by_id(id)
             except Exception:
                 return None
@@ -345,6 +351,7 @@ class FunctionsTable:
 
             # Update the user settings in the database
             Users.update_user_by_id(user_id, {"settings": user_settings})
+            self.valves_version += 1
 
             return user_settings["functions"]["valves"][id]
         except Exception as e:
@@ -363,6 +370,8 @@ class FunctionsTable:
                     }
                 )
                 db.commit()
+                if "valves" in updated:
+                    self.valves_version += 1
                 return self.get_function_by_id(id)
             except Exception:
                 return None
@@ -5,13 +5,13 @@ from typing import Optional
 import uuid
 
 from open_webui.internal.db import Base, get_db
-from open_webui.env import SRC_LOG_LEVELS
+from open_webui.env import SRC_LOG_LEVELS, GROUP_MEMBER_CACHE_TTL
 
 from open_webui.models.files import FileMetadataResponse
 
 
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy import BigInteger, Column, String, Text, JSON, func
+from sqlalchemy import BigInteger, Column, Index, PrimaryKeyConstraint, Text, JSON
 
 
 log = logging.getLogger(__name__)
@@ -41,6 +41,21 @@ class Group(Base):
     updated_at = Column(BigInteger)
 
 
+class GroupMember(Base):
+    # Indexed copy of Group.user_ids, kept in sync by GroupTable
+    __tablename__ = "group_member"
+
+    group_id = Column(Text, nullable=False)
+    user_id = Column(Text, nullable=False)
+
+    created_at = Column(BigInteger)
+
+    __table_args__ = (
+        PrimaryKeyConstraint("group_id", "user_id"),
+        Index("group_member_user_id_idx", "user_id"),
+    )
+
+
 class GroupModel(BaseModel):
     model_config = ConfigDict(from_attributes=True)
     id: str
@@ -92,6 +107,38 @@ class GroupUpdateForm(GroupForm, UserIdsForm):
 
 
 class GroupTable:
+    def __init__(self):
+        # Bumped on every change to the groups, invalidates the caches that
+        # depend on group membership
+        self.groups_version = 0
+        self._member_group_ids = {}
+
+    def _set_group_members(self, db, group_id: str, user_ids: Optional[list[str]]):
+        """
+        Updates the group_member rows of a group to `user_ids`, as part of
+        the caller's transaction.
+        """
+        user_ids = set(user_ids or [])
+        existing_user_ids = {
+            member.user_id
+            for member in db.query(GroupMember.user_id).filter_by(group_id=group_id)
+        }
+
+        removed_user_ids = existing_user_ids - user_ids
+        if removed_user_ids:
+            db.query(GroupMember).filter(
+                GroupMember.group_id == group_id,
+                GroupMember.user_id.in_(removed_user_ids),
+            ).delete(synchronize_session=False)
+
+        now = int(time.time())
+        db.add_all(
+            [
+                GroupMember(group_id=group_id, user_id=user_id, created_at=now)
+                for user_id in user_ids - existing_user_ids
+            ]
+        )
+
     def insert_new_group(
         self, user_id: str, form_data: GroupForm
     ) -> Optional[GroupModel]:
@@ -109,7 +156,10 @@ class GroupTable:
             try:
                 result = Group(**group.model_dump())
                 db.add(result)
+                if group.user_ids:
+                    self._set_group_members(db, group.id, group.user_ids)
                 db.commit()
+                self.groups_version += 1
                 db.refresh(result)
                 if result:
                     return GroupModel.model_validate(result)
@@ -131,16 +181,46 @@ class GroupTable:
             return [
                 GroupModel.model_validate(group)
                 for group in db.query(Group)
-                .filter(
-                    func.json_array_length(Group.user_ids) > 0
-                )  # Ensure array exists
-                .filter(
-                    Group.user_ids.cast(String).like(f'%"{user_id}"%')
-                )  # String-based check
+                .join(GroupMember, GroupMember.group_id == Group.id)
+                .filter(GroupMember.user_id == user_id)
                 .order_by(Group.updated_at.desc())
                 .all()
             ]
 
+    def get_group_ids_by_member_id(self, user_id: str) -> set[str]:
+        """
+        Returns the ids of the groups the user is a member of. Results are
+        cached for GROUP_MEMBER_CACHE_TTL seconds, or until a group changes,
+        so the access checks of a request share a single lookup.
+        """
+        now = time.time()
+        version = self.groups_version
+
+        cached = self._member_group_ids.get(user_id)
+        if cached and cached["version"] == version and cached["expires_at"] > now:
+            return set(cached["group_ids"])
+
+        with get_db() as db:
+            group_ids = {
+                member.group_id
+                for member in db.query(GroupMember.group_id).filter_by(user_id=user_id)
+            }
+
+        if GROUP_MEMBER_CACHE_TTL:
+            if len(self._member_group_ids) > 10000:
+                self._member_group_ids = {
+                    key: value
+                    for key, value in self._member_group_ids.items()
+                    if value["expires_at"] > now
+                }
+            self._member_group_ids[user_id] = {
+                "version": version,
+                "expires_at": now + GROUP_MEMBER_CACHE_TTL,
+                "group_ids": frozenset(group_ids),
+            }
+
+        return group_ids
+
     def get_group_by_id(self, id: str) -> Optional[GroupModel]:
         try:
             with get_db() as db:
@@ -167,7 +247,10 @@ class GroupTable:
                         "updated_at": int(time.time()),
                     }
                 )
+                if form_data.user_ids is not None:
+                    self._set_group_members(db, id, form_data.user_ids)
                 db.commit()
+                self.groups_version += 1
                 return self.get_group_by_id(id=id)
         except Exception as e:
             log.exception(e)
@@ -177,7 +260,9 @@ class GroupTable:
         try:
             with get_db() as db:
                 db.query(Group).filter_by(id=id).delete()
+                db.query(GroupMember).filter_by(group_id=id).delete()
                 db.commit()
+                self.groups_version += 1
                 return True
         except Exception:
             return False
@@ -186,7 +271,9 @@ class GroupTable:
         with get_db() as db:
             try:
                 db.query(Group).delete()
+                db.query(GroupMember).delete()
                 db.commit()
+                self.groups_version += 1
 
                 return True
             except Exception:
@@ -205,7 +292,10 @@ class GroupTable:
                             "updated_at": int(time.time()),
                         }
                     )
-                    db.commit()
+
+                db.query(GroupMember).filter_by(user_id=user_id).delete()
+                db.commit()
+                self.groups_version += 1
 
                 return True
             except Exception:
@@ -236,6 +326,7 @@ class GroupTable:
                         result = Group(**new_group.model_dump())
                         db.add(result)
                         db.commit()
+                        self.groups_version += 1
                         db.refresh(result)
                         new_groups.append(GroupModel.model_validate(result))
                     except Exception as e:
@@ -261,6 +352,7 @@ class GroupTable:
                                 "updated_at": int(time.time()),
                             }
                         )
+                        self._set_group_members(db, group.id, group.user_ids)
 
                 # Add user to new groups
                 for group in groups:
@@ -272,8 +364,11 @@ class GroupTable:
                                 "updated_at": int(time.time()),
                             }
                         )
+                        self._set_group_members(db, group.id, group.user_ids)
 
                 db.commit()
+
+                self.groups_version += 1
                 return True
             except Exception as e:
                 log.exception(e)
@@ -300,7 +395,9 @@ class GroupTable:
 
                 group.user_ids = group_user_ids
                 group.updated_at = int(time.time())
+                self._set_group_members(db, id, group_user_ids)
                 db.commit()
+                self.groups_version += 1
                 db.refresh(group)
                 return GroupModel.model_validate(group)
         except Exception as e:
@@ -329,8 +426,11 @@ class GroupTable:
 
                 group.user_ids = group_user_ids
                 group.updated_at = int(time.time())
+                self._set_group_members(db, id, group_user_ids)
 
                 db.commit()
+
+                self.groups_version += 1
                 db.refresh(group)
                 return GroupModel.model_validate(group)
         except Exception as e:
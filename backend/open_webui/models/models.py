@@ -3,7 +3,7 @@ import time
 from typing import Optional
 
 from open_webui.internal.db import Base, JSONField, get_db
-from open_webui.env import SRC_LOG_LEVELS
+from open_webui.env import SRC_LOG_LEVELS, MODEL_ACCESS_CACHE_TTL
 
 from open_webui.models.groups import Groups
 from open_webui.models.users import Users, UserResponse
@@ -144,6 +144,11 @@ class ModelForm(BaseModel):
 
 
 class ModelsTable:
+    def __init__(self):
+        # Bumped on every change to the models, invalidates the access cache
+        self.models_version = 0
+        self._access_cache = {}
+
     def insert_new_model(
         self, form_data: ModelForm, user_id: str
     ) -> Optional[ModelModel]:
@@ -160,6 +165,7 @@ class ModelsTable:
                 result = Model(**model.model_dump())
                 db.add(result)
                 db.commit()
+                self.models_version += 1
                 db.refresh(result)
 
                 if result:
@@ -207,7 +213,7 @@ class ModelsTable:
         self, user_id: str, permission: str = "write"
     ) -> list[ModelUserResponse]:
         models = self.get_models()
-        user_group_ids = {group.id for group in Groups.get_groups_by_member_id(user_id)}
+        user_group_ids = Groups.get_group_ids_by_member_id(user_id)
         return [
             model
             for model in models
@@ -223,6 +229,69 @@ class ModelsTable:
         except Exception:
             return None
 
+    def get_models_by_ids(self, ids: list[str]) -> list[ModelModel]:
+        with get_db() as db:
+            return [
+                ModelModel.model_validate(model)
+                for model in db.query(Model).filter(Model.id.in_(ids)).all()
+            ]
+
+    def get_accessible_model_ids(
+        self, user_id: str, model_ids: list[str], permission: str = "read"
+    ) -> set[str]:
+        """
+        Returns the ids in `model_ids` of the models the user owns or has
+        `permission` access to, with a single query for the models and one
+        for the user's groups. Results are cached per user for
+        MODEL_ACCESS_CACHE_TTL seconds, or until models or groups change.
+        """
+        now = time.time()
+        versions = (self.models_version, Groups.groups_version)
+        cache_key = (user_id, permission)
+
+        cached = self._access_cache.get(cache_key)
+        if (
+            cached is None
+            or cached["expires_at"] <= now
+            or cached["versions"] != versions
+        ):
+            cached = {
+                "expires_at": now + MODEL_ACCESS_CACHE_TTL,
+                "versions": versions,
+                "access": {},
+            }
+
+        missing_ids = [
+            model_id for model_id in set(model_ids) if model_id not in cached["access"]
+        ]
+        if missing_ids:
+            models = self.get_models_by_ids(missing_ids)
+
+            user_group_ids = None
+            if any(model.user_id != user_id for model in models):
+                user_group_ids = Groups.get_group_ids_by_member_id(user_id)
+
+            access = {model_id: False for model_id in missing_ids}
+            for model in models:
+                access[model.id] = model.user_id == user_id or has_access(
+                    user_id,
+                    type=permission,
+                    access_control=model.access_control,
+                    user_group_ids=user_group_ids,
+                )
+            cached["access"].update(access)
+
+        if MODEL_ACCESS_CACHE_TTL:
+            if len(self._access_cache) > 1000:
+                self._access_cache = {
+                    key: value
+                    for key, value in self._access_cache.items()
+                    if value["expires_at"] > now
+                }
+            self._access_cache[cache_key] = cached
+
+        return {model_id for model_id in model_ids if cached["access"][model_id]}
+
     def toggle_model_by_id(self, id: str) -> Optional[ModelModel]:
         with get_db() as db:
             try:
@@ -235,6 +304,7 @@ class ModelsTable:
                     }
                 )
                 db.commit()
+                self.models_version += 1
 
                 return self.get_model_by_id(id)
             except Exception:
@@ -250,6 +320,7 @@ class ModelsTable:
                     .update(model.model_dump(exclude={"id"}))
                 )
                 db.commit()
+                self.models_version += 1
 
                 model = db.get(Model, id)
                 db.refresh(model)
@@ -263,6 +334,7 @@ class ModelsTable:
             with get_db() as db:
                 db.query(Model).filter_by(id=id).delete()
                 db.commit()
+                self.models_version += 1
 
                 return True
         except Exception:
@@ -273,6 +345,7 @@ class ModelsTable:
             with get_db() as db:
                 db.query(Model).delete()
                 db.commit()
+                self.models_version += 1
 
                 return True
         except Exception:
@@ -315,6 +388,8 @@ class ModelsTable:
 
                 db.commit()
 
+                self.models_version += 1
+
                 return [
                     ModelModel.model_validate(model) for model in db.query(Model).all()
                 ]
@@ -1,21 +1,38 @@
+import hashlib
+import logging
+import threading
 import time
 from typing import Optional
 
 from open_webui.internal.db import Base, JSONField, get_db
 
 
-from open_webui.env import DATABASE_USER_ACTIVE_STATUS_UPDATE_INTERVAL
+from open_webui.env import (
+    DATABASE_USER_ACTIVE_STATUS_UPDATE_INTERVAL,
+    REDIS_URL,
+    REDIS_CLUSTER,
+    REDIS_KEY_PREFIX,
+    REDIS_SENTINEL_HOSTS,
+    REDIS_SENTINEL_PORT,
+    SRC_LOG_LEVELS,
+    USER_CACHE_TTL,
+    USER_LAST_ACTIVE_FLUSH_INTERVAL,
+)
 from open_webui.models.chats import Chats
 from open_webui.models.groups import Groups
 from open_webui.utils.misc import throttle
+from open_webui.utils.redis import get_redis_connection, get_sentinels_from_env
 
 
 from pydantic import BaseModel, ConfigDict
 from sqlalchemy import BigInteger, Column, String, Text, Date
-from sqlalchemy import or_
+from sqlalchemy import or_, update, bindparam
 
 import datetime
 
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MODELS"])
+
 ####################
 # User DB Schema
 ####################
@@ -175,7 +192,124 @@ class UserUpdateForm(BaseModel):
     password: Optional[str] = None
 
 
+####################
+# User Cache
+####################
+
+
+def get_api_key_hash(api_key: str) -> str:
+    return hashlib.sha256(api_key.encode()).hexdigest()
+
+
+class UserCache:
+    """
+    Short lived cache of the users of authenticated requests, by user id and
+    by API key hash. The cache is kept in Redis when REDIS_URL is set, so an
+    update on one instance is seen by all of them, and in memory otherwise.
+    UsersTable drops the entry of a user whenever it updates the user.
+    """
+
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+
+        # Bumped on every invalidation, so a user read from the database
+        # before an update is not cached after it
+        self.version = 0
+
+        self._users = {}
+        self._api_keys = {}
+        self._lock = threading.Lock()
+        self._redis = None
+
+    def get_redis(self):
+        if self._redis is None and REDIS_URL:
+            self._redis = get_redis_connection(
+                redis_url=REDIS_URL,
+                redis_sentinels=get_sentinels_from_env(
+                    REDIS_SENTINEL_HOSTS, REDIS_SENTINEL_PORT
+                ),
+                redis_cluster=REDIS_CLUSTER,
+                decode_responses=True,
+            )
+        return self._redis
+
+    def _get_key(self, kind: str, id: str) -> str:
+        return f"{REDIS_KEY_PREFIX}:user_cache:{kind}:{id}"
+
+    def _get(self, entries: dict, kind: str, id: str) -> Optional[str]:
+        if not self.ttl:
+            return None
+
+        try:
+            if redis := self.get_redis():
+                return redis.get(self._get_key(kind, id))
+        except Exception as e:
+            log.warning(f"Error reading the user cache: {e}")
+            return None
+
+        entry = entries.get(id)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+        return None
+
+    def _set(self, entries: dict, kind: str, id: str, value: str, version: int):
+        if not self.ttl:
+            return
+
+        try:
+            if redis := self.get_redis():
+                if version == self.version:
+                    redis.set(self._get_key(kind, id), value, ex=self.ttl)
+                return
+        except Exception as e:
+            log.warning(f"Error writing the user cache: {e}")
+            return
+
+        with self._lock:
+            if version != self.version:
+                return
+
+            now = time.monotonic()
+            if len(entries) > 10000:
+                for key in [key for key, entry in entries.items() if entry[0] <= now]:
+                    del entries[key]
+            entries[id] = (now + self.ttl, value)
+
+    def get_user(self, id: str) -> Optional[UserModel]:
+        data = self._get(self._users, "id", id)
+        return UserModel.model_validate_json(data) if data else None
+
+    def set_user(self, user: UserModel, version: int):
+        self._set(self._users, "id", user.id, user.model_dump_json(), version)
+
+    def get_user_id_by_api_key(self, api_key: str) -> Optional[str]:
+        return self._get(self._api_keys, "api_key", get_api_key_hash(api_key))
+
+    def set_api_key(self, api_key: str, user_id: str, version: int):
+        self._set(
+            self._api_keys, "api_key", get_api_key_hash(api_key), user_id, version
+        )
+
+    def invalidate(self, id: str):
+        with self._lock:
+            self.version += 1
+            self._users.pop(id, None)
+
+        try:
+            if redis := self.get_redis():
+                redis.delete(self._get_key("id", id))
+        except Exception as e:
+            log.warning(f"Error invalidating the user cache: {e}")
+
+
 class UsersTable:
+    def __init__(self):
+        self.cache = UserCache(USER_CACHE_TTL)
+
+        self._last_active = {}
+        self._last_active_lock = threading.Lock()
+        self._last_active_flusher = None
+
     def insert_new_user(
         self,
         id: str,
@@ -224,6 +358,32 @@ class UsersTable:
         except Exception:
             return None
 
+    def get_cached_user_by_id(self, id: str) -> Optional[UserModel]:
+        """get_user_by_id for authentication, served from the user cache."""
+        user = self.cache.get_user(id)
+        if user is None:
+            version = self.cache.version
+            user = self.get_user_by_id(id)
+            if user:
+                self.cache.set_user(user, version)
+        return user
+
+    def get_cached_user_by_api_key(self, api_key: str) -> Optional[UserModel]:
+        """get_user_by_api_key for authentication, served from the user cache."""
+        user_id = self.cache.get_user_id_by_api_key(api_key)
+        if user_id:
+            user = self.get_cached_user_by_id(user_id)
+            # The key is compared as it may have changed since it was cached
+            if user and user.api_key == api_key:
+                return user
+
+        version = self.cache.version
+        user = self.get_user_by_api_key(api_key)
+        if user:
+            self.cache.set_user(user, version)
+            self.cache.set_api_key(api_key, user.id, version)
+        return user
+
     def get_user_by_email(self, email: str) -> Optional[UserModel]:
         try:
             with get_db() as db:
@@ -263,6 +423,7 @@ class UsersTable:
                 if user:
                     user.secret_code = secret_code
                     db.commit()
+                    self.cache.invalidate(user.id)
                     db.refresh(user)
                     return UserModel.model_validate(user)
                 return None
@@ -381,6 +542,7 @@ class UsersTable:
             with get_db() as db:
                 db.query(User).filter_by(id=id).update({"role": role})
                 db.commit()
+                self.cache.invalidate(id)
                 user = db.query(User).filter_by(id=id).first()
                 return UserModel.model_validate(user)
         except Exception:
@@ -395,12 +557,58 @@ class UsersTable:
                     {"profile_image_url": profile_image_url}
                 )
                 db.commit()
+                self.cache.invalidate(id)
 
                 user = db.query(User).filter_by(id=id).first()
                 return UserModel.model_validate(user)
         except Exception:
             return None
 
+    def mark_user_active(self, id: str):
+        """
+        Records that the user is active without a database write. The
+        last_active_at of all the users marked since the last write are
+        written in one batch every USER_LAST_ACTIVE_FLUSH_INTERVAL seconds.
+        """
+        with self._last_active_lock:
+            self._last_active[id] = int(time.time())
+
+            if self._last_active_flusher is None:
+                self._last_active_flusher = threading.Thread(
+                    target=self._run_last_active_flusher,
+                    name="user-last-active",
+                    daemon=True,
+                )
+                self._last_active_flusher.start()
+
+    def _run_last_active_flusher(self):
+        while True:
+            time.sleep(USER_LAST_ACTIVE_FLUSH_INTERVAL)
+            self.flush_last_active()
+
+    def flush_last_active(self):
+        with self._last_active_lock:
+            last_active, self._last_active = self._last_active, {}
+
+        if not last_active:
+            return
+
+        try:
+            with get_db() as db:
+                # Core UPDATE, as users deleted in the meantime match no row
+                db.execute(
+                    update(User.__table__)
+                    .where(User.__table__.c.id == bindparam("user_id"))
+                    .values(last_active_at=bindparam("active_at")),
+                    [
+                        {"user_id": id, "active_at": last_active_at}
+                        for id, last_active_at in last_active.items()
+                    ],
+                )
+                db.commit()
+        except Exception as e:
+            log.warning(f"Error updating the last_active_at of users: {e}")
+
     @throttle(DATABASE_USER_ACTIVE_STATUS_UPDATE_INTERVAL)
     def update_user_last_active_by_id(self, id: str) -> Optional[UserModel]:
         try:
@@ -422,6 +630,7 @@ class UsersTable:
             with get_db() as db:
                 db.query(User).filter_by(id=id).update({"oauth_sub": oauth_sub})
                 db.commit()
+                self.cache.invalidate(id)
 
                 user = db.query(User).filter_by(id=id).first()
                 return UserModel.model_validate(user)
@@ -433,6 +642,7 @@ class UsersTable:
             with get_db() as db:
                 db.query(User).filter_by(id=id).update(updated)
                 db.commit()
+                self.cache.invalidate(id)
 
                 user = db.query(User).filter_by(id=id).first()
                 return UserModel.model_validate(user)
@@ -453,6 +663,7 @@ class UsersTable:
 
                 db.query(User).filter_by(id=id).update({"settings": user_settings})
                 db.commit()
+                self.cache.invalidate(id)
 
                 user = db.query(User).filter_by(id=id).first()
                 return UserModel.model_validate(user)
@@ -471,6 +682,7 @@ class UsersTable:
                     # Delete User
                     db.query(User).filter_by(id=id).delete()
                     db.commit()
+                    self.cache.invalidate(id)
 
                 return True
             else:
@@ -483,6 +695,7 @@ class UsersTable:
             with get_db() as db:
                 result = db.query(User).filter_by(id=id).update({"api_key": api_key})
                 db.commit()
+                self.cache.invalidate(id)
                 return True if result == 1 else False
         except Exception:
             return False
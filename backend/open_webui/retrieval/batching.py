@@ -0,0 +1,202 @@
+import logging
+import threading
+import time
+import weakref
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable, Sequence
+
+from open_webui.config import (
+    RAG_LOCAL_INFERENCE_MAX_BATCH_SIZE,
+    RAG_LOCAL_INFERENCE_MAX_WAIT_MS,
+)
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+
+# Seconds without calls after which the worker thread exits, it is started
+# again by the next call
+WORKER_IDLE_TIMEOUT = 60
+
+# Called with (name, batch_size, calls) for every batch run
+BATCH_LISTENERS: list[Callable[[str, int, int], None]] = []
+
+_batchers: "weakref.WeakSet[InferenceBatcher]" = weakref.WeakSet()
+
+
+class _Call:
+    def __init__(self, inputs: list, options: tuple):
+        self.inputs = inputs
+        self.options = options
+        self.future = Future()
+
+
+class InferenceBatcher:
+    """
+    Runs a local model on a dedicated worker thread, batching the inputs of
+    concurrent calls.
+
+    `submit` queues the inputs of a call and blocks until their outputs are
+    ready. The worker takes the oldest call and runs the inputs of the calls
+    with the same options through `fn` at once, up to `max_batch_size`
+    inputs, then hands each call its slice of the outputs. Calls queued while
+    a batch runs make up the next one. Under concurrent load (the last batch
+    had several calls), the worker also waits up to `max_wait_ms` for the
+    batch to fill, a lone caller does not pay for the wait. A call with more
+    inputs than `max_batch_size` runs alone, the model batches it internally.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fn: Callable[..., Sequence],
+        max_batch_size: int = RAG_LOCAL_INFERENCE_MAX_BATCH_SIZE,
+        max_wait_ms: float = RAG_LOCAL_INFERENCE_MAX_WAIT_MS,
+    ):
+        self.name = name
+        self.fn = fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+
+        self.batches = 0
+        self.calls = 0
+        self.inputs = 0
+
+        self._queue: deque[_Call] = deque()
+        self._queued_inputs = 0
+        self._concurrent = False
+        self._cond = threading.Condition()
+        self._thread = None
+
+        _batchers.add(self)
+
+    def submit(self, inputs: list, **options) -> Sequence:
+        if not inputs:
+            return []
+        if threading.current_thread() is self._thread:
+            # Called from the model itself, queuing would deadlock
+            return self.fn(inputs, **options)
+
+        call = _Call(list(inputs), tuple(sorted(options.items())))
+        with self._cond:
+            self._queue.append(call)
+            self._queued_inputs += len(call.inputs)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name=f"inference-{self.name}", daemon=True
+                )
+                self._thread.start()
+            self._cond.notify()
+
+        return call.future.result()
+
+    def get_queue_depth(self) -> int:
+        return self._queued_inputs
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._queue:
+                    self._cond.wait(WORKER_IDLE_TIMEOUT)
+                    if not self._queue:
+                        self._thread = None
+                        return
+
+                deadline = time.monotonic() + self.max_wait
+                while self._concurrent and self._queued_inputs < self.max_batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+
+                calls = self._take_batch()
+                self._concurrent = len(calls) > 1 or bool(self._queue)
+
+            self._run_batch(calls)
+
+    def _take_batch(self) -> list[_Call]:
+        first = self._queue.popleft()
+        calls = [first]
+        size = len(first.inputs)
+
+        remaining = deque()
+        while self._queue:
+            call = self._queue.popleft()
+            if (
+                call.options == first.options
+                and size + len(call.inputs) <= self.max_batch_size
+            ):
+                calls.append(call)
+                size += len(call.inputs)
+            else:
+                remaining.append(call)
+
+        self._queue = remaining
+        self._queued_inputs -= size
+        return calls
+
+    def _run_batch(self, calls: list[_Call]):
+        inputs = [value for call in calls for value in call.inputs]
+
+        try:
+            outputs = self.fn(inputs, **dict(calls[0].options))
+        except BaseException as e:
+            for call in calls:
+                call.future.set_exception(e)
+            return
+
+        start = 0
+        for call in calls:
+            end = start + len(call.inputs)
+            call.future.set_result(outputs[start:end])
+            start = end
+
+        self.batches += 1
+        self.calls += len(calls)
+        self.inputs += len(inputs)
+        for listener in BATCH_LISTENERS:
+            try:
+                listener(self.name, len(inputs), len(calls))
+            except Exception as e:
+                log.debug(f"Inference batch listener failed: {e}")
+
+
+_model_batchers: "weakref.WeakKeyDictionary[object, InferenceBatcher]" = (
+    weakref.WeakKeyDictionary()
+)
+_model_batchers_lock = threading.Lock()
+
+
+def get_model_batcher(
+    name: str, model, fn: Callable[..., Sequence]
+) -> InferenceBatcher:
+    """
+    Returns the batcher of a loaded model, creating it on first use, so the
+    functions built for the same model share one queue and worker thread.
+    `fn` is called with the model followed by the batch, the batcher only
+    holds a weak reference to the model so it is dropped with it. Callers
+    must keep a reference to the model while they submit batches.
+    """
+    with _model_batchers_lock:
+        batcher = _model_batchers.get(model)
+        if batcher is None:
+            model_ref = weakref.ref(model)
+
+            def run(*args, **kwargs):
+                model = model_ref()
+                if model is None:
+                    raise RuntimeError(f"The {name} model was unloaded")
+                return fn(model, *args, **kwargs)
+
+            batcher = InferenceBatcher(name, run)
+            _model_batchers[model] = batcher
+        return batcher
+
+
+def get_queue_depths() -> dict[str, int]:
+    depths = {}
+    for batcher in list(_batchers):
+        depths[batcher.name] = depths.get(batcher.name, 0) + batcher.get_queue_depth()
+    return depths
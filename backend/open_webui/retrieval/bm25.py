@@ -0,0 +1,267 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import sqlite3
+import threading
+import uuid
+from typing import Optional
+
+from langchain_core.documents import Document
+
+from open_webui.config import BM25_INDEX_PATH, ENABLE_BM25_INDEX
+from open_webui.env import SRC_LOG_LEVELS
+from open_webui.retrieval.vector.main import GetResult
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+
+def get_bm25_terms(text: str) -> list[str]:
+    return re.findall(r"\w+", text.lower())
+
+
+class BM25Index:
+    """
+    Persistent sparse index of the chunks of every vector DB collection, so
+    hybrid search does not have to load and tokenize whole collections on
+    every query.
+
+    Every collection is a SQLite file holding an FTS5 table, which ranks
+    matches with BM25. The index is kept in sync from the places that write
+    to or delete from the vector DB. Collections that were created before
+    the index existed are built in the background after their first hybrid
+    search, which uses in memory BM25 meanwhile.
+    """
+
+    def __init__(self, path: str = BM25_INDEX_PATH, enabled: bool = ENABLE_BM25_INDEX):
+        self.path = path
+        self._available = None if enabled else False
+
+        # Collections being built in the background, and whether they were
+        # written to meanwhile, which makes the built index stale. Writes of
+        # other workers are not seen, so the index is off by default with
+        # several workers.
+        self._building: dict[str, bool] = {}
+        self._building_lock = threading.Lock()
+
+    def is_available(self) -> bool:
+        if self._available is None:
+            try:
+                with sqlite3.connect(":memory:") as conn:
+                    conn.execute("CREATE VIRTUAL TABLE t USING fts5(text)")
+                os.makedirs(self.path, exist_ok=True)
+                self._available = True
+            except Exception as e:
+                log.warning(f"BM25 index is not available, using in memory BM25: {e}")
+                self._available = False
+        return self._available
+
+    def _get_path(self, collection_name: str) -> str:
+        name = collection_name
+        if not re.fullmatch(r"[\w\-]+", name):
+            name = hashlib.sha256(name.encode()).hexdigest()
+        return os.path.join(self.path, f"{name}.sqlite3")
+
+    def _connect(self, path: str) -> sqlite3.Connection:
+        conn = sqlite3.connect(path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _create(self, path: str) -> sqlite3.Connection:
+        conn = self._connect(path)
+        conn.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS chunks USING fts5("
+            "text, id UNINDEXED, metadata UNINDEXED, "
+            "tokenize='unicode61 remove_diacritics 2')"
+        )
+        return conn
+
+    def _insert(self, conn: sqlite3.Connection, ids, texts, metadatas):
+        conn.executemany(
+            "INSERT INTO chunks (text, id, metadata) VALUES (?, ?, ?)",
+            [
+                (text or "", id, json.dumps(metadata or {}, default=str))
+                for id, text, metadata in zip(ids, texts, metadatas)
+            ],
+        )
+
+    def has_index(self, collection_name: str) -> bool:
+        return self.is_available() and os.path.exists(self._get_path(collection_name))
+
+    def create(self, collection_name: str):
+        """
+        Start an empty index for a new collection.
+        """
+        if not self.is_available():
+            return
+
+        self.delete_collection(collection_name)
+        self._create(self._get_path(collection_name)).close()
+
+    def build(self, collection_name: str, result: Optional[GetResult]):
+        """
+        (Re)build the index of a collection from all of its chunks.
+        """
+        if not self.is_available():
+            return
+
+        path = self._get_path(collection_name)
+        # Build into a temporary file so concurrent readers never see a
+        # partial index
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            conn = self._create(tmp_path)
+            with conn:
+                if result and result.ids:
+                    self._insert(
+                        conn,
+                        result.ids[0],
+                        result.documents[0],
+                        result.metadatas[0],
+                    )
+            conn.execute("PRAGMA journal_mode=DELETE")
+            conn.close()
+            os.replace(tmp_path, path)
+        except Exception as e:
+            log.exception(f"Error building BM25 index of {collection_name}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def build_in_background(self, collection_name: str, result: Optional[GetResult]):
+        """
+        Same as `build`, on a background thread. Does nothing if the
+        collection is already being built.
+        """
+        if not self.is_available():
+            return
+
+        with self._building_lock:
+            if collection_name in self._building:
+                return
+            self._building[collection_name] = False
+
+        def run():
+            try:
+                self.build(collection_name, result)
+            finally:
+                with self._building_lock:
+                    stale = self._building.pop(collection_name)
+                if stale:
+                    # Built again on the next search
+                    self.delete_collection(collection_name)
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def _mark_stale(self, collection_name: str):
+        with self._building_lock:
+            if collection_name in self._building:
+                self._building[collection_name] = True
+
+    def insert(self, collection_name: str, items: list[dict]):
+        """
+        Add chunks to the index of a collection. Collections without an index
+        are skipped, they are indexed in full on their first search.
+        """
+        self._mark_stale(collection_name)
+        if not self.has_index(collection_name):
+            return
+
+        conn = self._connect(self._get_path(collection_name))
+        try:
+            with conn:
+                self._insert(
+                    conn,
+                    [item["id"] for item in items],
+                    [item["text"] for item in items],
+                    [item["metadata"] for item in items],
+                )
+        finally:
+            conn.close()
+
+    def delete(
+        self,
+        collection_name: str,
+        ids: Optional[list[str]] = None,
+        filter: Optional[dict] = None,
+    ):
+        self._mark_stale(collection_name)
+        if not self.has_index(collection_name):
+            return
+
+        if not ids and not filter:
+            return self.delete_collection(collection_name)
+
+        conn = self._connect(self._get_path(collection_name))
+        try:
+            with conn:
+                if ids:
+                    conn.execute(
+                        f"DELETE FROM chunks WHERE id IN ({','.join('?' * len(ids))})",
+                        ids,
+                    )
+                if filter:
+                    conn.execute(
+                        "DELETE FROM chunks WHERE "
+                        + " AND ".join("json_extract(metadata, ?) = ?" for _ in filter),
+                        [
+                            param
+                            for key, value in filter.items()
+                            for param in (f'$."{key}"', value)
+                        ],
+                    )
+        finally:
+            conn.close()
+
+    def delete_collection(self, collection_name: str):
+        if not self.is_available():
+            return
+
+        self._mark_stale(collection_name)
+        path = self._get_path(collection_name)
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(f"{path}{suffix}"):
+                os.remove(f"{path}{suffix}")
+
+    def reset(self):
+        if not self.is_available():
+            return
+
+        shutil.rmtree(self.path, ignore_errors=True)
+        os.makedirs(self.path, exist_ok=True)
+
+    def count(self, collection_name: str) -> int:
+        conn = self._connect(self._get_path(collection_name))
+        try:
+            return conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+        finally:
+            conn.close()
+
+    def search(self, collection_name: str, query: str, k: int) -> list[Document]:
+        """
+        Return the `k` best BM25 matches of `query`, best first. Only the
+        matched chunks are read from disk.
+        """
+        terms = get_bm25_terms(query)
+        if not terms:
+            return []
+
+        conn = self._connect(self._get_path(collection_name))
+        try:
+            rows = conn.execute(
+                "SELECT text, metadata FROM chunks WHERE chunks MATCH ? "
+                "ORDER BY rank LIMIT ?",
+                (" OR ".join(f'"{term}"' for term in dict.fromkeys(terms)), k),
+            ).fetchall()
+        finally:
+            conn.close()
+
+        return [
+            Document(page_content=text, metadata=json.loads(metadata))
+            for text, metadata in rows
+        ]
+
+
+BM25_INDEX = BM25Index()
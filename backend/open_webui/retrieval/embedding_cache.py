@@ -0,0 +1,281 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+import numpy as np
+
+from open_webui.config import (
+    ENABLE_RAG_EMBEDDING_CACHE,
+    RAG_EMBEDDING_CACHE_BACKEND,
+    RAG_EMBEDDING_CACHE_PATH,
+    RAG_EMBEDDING_CACHE_MAX_ENTRIES,
+    RAG_EMBEDDING_CACHE_TTL,
+)
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    REDIS_URL,
+    REDIS_CLUSTER,
+    REDIS_KEY_PREFIX,
+    REDIS_SENTINEL_HOSTS,
+    REDIS_SENTINEL_PORT,
+)
+from open_webui.utils.redis import get_redis_connection, get_sentinels_from_env
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+
+def get_embedding_cache_key(
+    engine: str, model: str, prefix: Optional[str], text: str
+) -> str:
+    text_hash = hashlib.sha256(text.encode("utf-8", "surrogatepass")).hexdigest()
+    return hashlib.sha256(
+        f"{engine}\x00{model}\x00{prefix or ''}\x00{text_hash}".encode()
+    ).hexdigest()
+
+
+def encode_embedding(embedding) -> bytes:
+    return np.asarray(embedding, dtype=np.float32).tobytes()
+
+
+def decode_embedding(data: bytes) -> list[float]:
+    return np.frombuffer(data, dtype=np.float32).tolist()
+
+
+class SQLiteEmbeddingCacheBackend:
+    """
+    Local cache in a SQLite file. Entries older than `ttl` seconds are
+    ignored and removed, and the least recently used entries are evicted
+    once there are more than `max_entries`.
+    """
+
+    # Evict after this share of max_entries has been written
+    EVICTION_INTERVAL = 0.05
+
+    def __init__(self, path: str, max_entries: int, ttl: int):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+        self._writes = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS embedding ("
+                "key TEXT PRIMARY KEY, vector BLOB NOT NULL, "
+                "created_at INTEGER NOT NULL, accessed_at INTEGER NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS embedding_accessed_at_idx "
+                "ON embedding (accessed_at)"
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def get_many(self, keys: list[str]) -> list[Optional[bytes]]:
+        now = int(time.time())
+        found = {}
+
+        conn = self._connect()
+        try:
+            # Stay well below SQLite's bound parameter limit
+            for i in range(0, len(keys), 500):
+                batch = keys[i : i + 500]
+                rows = conn.execute(
+                    f"SELECT key, vector FROM embedding WHERE key IN ({','.join('?' * len(batch))})"
+                    + (" AND created_at > ?" if self.ttl else ""),
+                    [*batch, now - self.ttl] if self.ttl else batch,
+                ).fetchall()
+                found.update(rows)
+
+            if found:
+                with conn:
+                    conn.executemany(
+                        "UPDATE embedding SET accessed_at = ? WHERE key = ?",
+                        [(now, key) for key in found],
+                    )
+        finally:
+            conn.close()
+
+        return [found.get(key) for key in keys]
+
+    def set_many(self, items: dict[str, bytes]):
+        now = int(time.time())
+
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO embedding (key, vector, created_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    [(key, value, now, now) for key, value in items.items()],
+                )
+
+            with self._lock:
+                self._writes += len(items)
+                evict = self._writes >= max(
+                    1, int(self.max_entries * self.EVICTION_INTERVAL)
+                )
+                if evict:
+                    self._writes = 0
+
+            if evict:
+                self._evict(conn, now)
+        finally:
+            conn.close()
+
+    def _evict(self, conn: sqlite3.Connection, now: int):
+        with conn:
+            if self.ttl:
+                conn.execute(
+                    "DELETE FROM embedding WHERE created_at <= ?", (now - self.ttl,)
+                )
+
+            count = conn.execute("SELECT COUNT(*) FROM embedding").fetchone()[0]
+            if count > self.max_entries:
+                conn.execute(
+                    "DELETE FROM embedding WHERE key IN ("
+                    "SELECT key FROM embedding ORDER BY accessed_at LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+
+    def clear(self):
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM embedding")
+        finally:
+            conn.close()
+
+
+class RedisEmbeddingCacheBackend:
+    """
+    Cache shared by every instance. Every hit renews the expiry of the
+    entry, so with a TTL the entries that are not used expire first. The
+    total size is bounded by the TTL and the maxmemory policy of Redis.
+    """
+
+    def __init__(self, redis, ttl: int):
+        self._redis = redis
+        self.ttl = ttl
+        self._prefix = f"{REDIS_KEY_PREFIX}:embedding:"
+
+    def get_many(self, keys: list[str]) -> list[Optional[bytes]]:
+        pipe = self._redis.pipeline()
+        for key in keys:
+            if self.ttl:
+                pipe.getex(f"{self._prefix}{key}", ex=self.ttl)
+            else:
+                pipe.get(f"{self._prefix}{key}")
+        return pipe.execute()
+
+    def set_many(self, items: dict[str, bytes]):
+        pipe = self._redis.pipeline()
+        for key, value in items.items():
+            pipe.set(f"{self._prefix}{key}", value, ex=self.ttl or None)
+        pipe.execute()
+
+    def clear(self):
+        for key in self._redis.scan_iter(match=f"{self._prefix}*"):
+            self._redis.delete(key)
+
+
+class EmbeddingCache:
+    def __init__(self, backend):
+        self.backend = backend
+
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def _count(self, hits: int = 0, misses: int = 0, errors: int = 0):
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+            self.errors += errors
+
+    def get_many(self, keys: list[str]) -> list[Optional[list[float]]]:
+        try:
+            values = self.backend.get_many(keys)
+        except Exception as e:
+            log.warning(f"Error reading the embedding cache: {e}")
+            self._count(misses=len(keys), errors=1)
+            return [None] * len(keys)
+
+        embeddings = [decode_embedding(value) if value else None for value in values]
+
+        hits = sum(1 for embedding in embeddings if embedding is not None)
+        self._count(hits=hits, misses=len(keys) - hits)
+        return embeddings
+
+    def set_many(self, items: dict[str, list[float]]):
+        try:
+            self.backend.set_many(
+                {key: encode_embedding(embedding) for key, embedding in items.items()}
+            )
+        except Exception as e:
+            log.warning(f"Error writing the embedding cache: {e}")
+            self._count(errors=1)
+
+    def clear(self):
+        self.backend.clear()
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": type(self.backend).__name__,
+                "hits": self.hits,
+                "misses": self.misses,
+                "errors": self.errors,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    if not ENABLE_RAG_EMBEDDING_CACHE:
+        return None
+
+    try:
+        if RAG_EMBEDDING_CACHE_BACKEND == "redis" and REDIS_URL:
+            return EmbeddingCache(
+                RedisEmbeddingCacheBackend(
+                    get_redis_connection(
+                        redis_url=REDIS_URL,
+                        redis_sentinels=get_sentinels_from_env(
+                            REDIS_SENTINEL_HOSTS, REDIS_SENTINEL_PORT
+                        ),
+                        redis_cluster=REDIS_CLUSTER,
+                        decode_responses=False,
+                    ),
+                    RAG_EMBEDDING_CACHE_TTL,
+                )
+            )
+
+        return EmbeddingCache(
+            SQLiteEmbeddingCacheBackend(
+                RAG_EMBEDDING_CACHE_PATH,
+                RAG_EMBEDDING_CACHE_MAX_ENTRIES,
+                RAG_EMBEDDING_CACHE_TTL,
+            )
+        )
+    except Exception as e:
+        log.warning(f"Embedding cache is disabled: {e}")
+        return None
+
+
+EMBEDDING_CACHE = get_embedding_cache()
@@ -0,0 +1,350 @@
+import asyncio
+import logging
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional
+from urllib.parse import quote
+
+import aiohttp
+
+from open_webui.config import (
+    RAG_EMBEDDING_CONCURRENCY,
+    RAG_EMBEDDING_MAX_RETRIES,
+    RAG_EMBEDDING_PREFIX_FIELD_NAME,
+)
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    AIOHTTP_CLIENT_TIMEOUT,
+    AIOHTTP_CLIENT_SESSION_SSL,
+    ENABLE_FORWARD_USER_INFO_HEADERS,
+)
+from open_webui.models.users import UserModel
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+
+# Statuses that are retried after the Retry-After delay (or a backoff)
+RETRY_STATUSES = {429, 502, 503, 504}
+
+# Error messages of requests that were rejected for being too large, these
+# batches are split instead of failed
+BATCH_TOO_LARGE_MARKERS = (
+    "too large",
+    "too many",
+    "maximum context",
+    "context length",
+    "max_tokens_per_request",
+    "maximum request size",
+    "batch size",
+)
+
+
+class EmbeddingRequestError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(f"{status}: {message}")
+        self.status = status
+        self.message = message
+
+    def is_batch_too_large(self) -> bool:
+        if self.status == 413:
+            return True
+        return self.status == 400 and any(
+            marker in self.message.lower() for marker in BATCH_TOO_LARGE_MARKERS
+        )
+
+
+def get_retry_after(headers) -> Optional[float]:
+    """
+    Delay in seconds requested by the server, from `retry-after-ms` (OpenAI
+    and Azure) or `Retry-After` (seconds or an HTTP date).
+    """
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+
+        retry_after = headers.get("Retry-After")
+        if not retry_after:
+            return None
+        try:
+            return float(retry_after)
+        except ValueError:
+            return max(parsedate_to_datetime(retry_after).timestamp() - time.time(), 0)
+    except Exception:
+        return None
+
+
+def get_user_info_headers(user: Optional[UserModel]) -> dict:
+    if not (ENABLE_FORWARD_USER_INFO_HEADERS and user):
+        return {}
+
+    return {
+        "X-OpenWebUI-User-Name": quote(user.name, safe=" "),
+        "X-OpenWebUI-User-Id": user.id,
+        "X-OpenWebUI-User-Email": user.email,
+        "X-OpenWebUI-User-Role": user.role,
+    }
+
+
+def get_embedding_request(
+    engine: str,
+    model: str,
+    texts: list[str],
+    url: str,
+    key: str,
+    prefix: Optional[str],
+    user: Optional[UserModel],
+    azure_api_version: Optional[str] = None,
+) -> tuple[str, dict, dict]:
+    json_data = {"input": texts}
+    if isinstance(RAG_EMBEDDING_PREFIX_FIELD_NAME, str) and isinstance(prefix, str):
+        json_data[RAG_EMBEDDING_PREFIX_FIELD_NAME] = prefix
+
+    if engine == "ollama":
+        return (
+            f"{url}/api/embed",
+            {
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {key}",
+                **get_user_info_headers(user),
+            },
+            {**json_data, "model": model},
+        )
+    elif engine == "openai":
+        return (
+            f"{url}/embeddings",
+            {
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {key}",
+                **get_user_info_headers(user),
+            },
+            {**json_data, "model": model},
+        )
+    elif engine == "azure_openai":
+        return (
+            f"{url}/openai/deployments/{model}/embeddings?api-version={azure_api_version}",
+            {
+                "Content-Type": "application/json",
+                "api-key": key,
+                **get_user_info_headers(user),
+            },
+            json_data,
+        )
+    else:
+        raise ValueError(f"Unknown embedding engine: {engine}")
+
+
+def get_embeddings_from_response(engine: str, data: dict) -> list[list[float]]:
+    if engine == "ollama":
+        if "embeddings" in data:
+            return data["embeddings"]
+    elif "data" in data:
+        return [elem["embedding"] for elem in data["data"]]
+
+    raise Exception("Something went wrong :/")
+
+
+class EmbeddingClient:
+    """
+    Client for the remote embedding engines (Ollama, OpenAI, Azure OpenAI).
+
+    Requests run on a background event loop with one shared aiohttp session,
+    so connections are kept alive across calls from the (synchronous) RAG
+    code. Batches are sent concurrently, at most `concurrency` at a time per
+    endpoint. Rate limited requests are retried after the delay the server
+    asks for. Batches rejected for being too large are split in half, and
+    the smaller size is remembered for the next requests to that endpoint.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = RAG_EMBEDDING_CONCURRENCY,
+        max_retries: int = RAG_EMBEDDING_MAX_RETRIES,
+        timeout: Optional[int] = AIOHTTP_CLIENT_TIMEOUT,
+    ):
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.timeout = timeout
+
+        self._loop = None
+        self._lock = threading.Lock()
+        self._session = None
+        self._semaphores = {}
+        self._batch_sizes = {}
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=self._loop.run_forever,
+                    name="embedding-client",
+                    daemon=True,
+                ).start()
+            return self._loop
+
+    def run(self, coro):
+        """
+        Run `coro` on the client loop and wait for its result. Must not be
+        called from the client loop itself.
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self._get_loop()).result()
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=0,
+                    ttl_dns_cache=300,
+                    keepalive_timeout=60,
+                ),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                trust_env=True,
+            )
+        return self._session
+
+    def _get_semaphore(self, url: str) -> asyncio.Semaphore:
+        endpoint = url.split("?")[0]
+        if endpoint not in self._semaphores:
+            self._semaphores[endpoint] = asyncio.Semaphore(self.concurrency)
+        return self._semaphores[endpoint]
+
+    async def post(self, url: str, headers: dict, json_data: dict) -> dict:
+        session = await self._get_session()
+
+        for attempt in range(self.max_retries + 1):
+            async with self._get_semaphore(url):
+                async with session.post(
+                    url,
+                    headers=headers,
+                    json=json_data,
+                    ssl=AIOHTTP_CLIENT_SESSION_SSL,
+                ) as r:
+                    if r.status in RETRY_STATUSES and attempt < self.max_retries:
+                        delay = get_retry_after(r.headers)
+                        if delay is None:
+                            delay = min(2**attempt, 30)
+                    elif r.status >= 400:
+                        raise EmbeddingRequestError(r.status, await r.text())
+                    else:
+                        return await r.json(content_type=None)
+
+            log.debug(f"Embedding request returned {r.status}, retrying in {delay}s")
+            # Wait outside of the semaphore so other endpoints' batches and
+            # retries are not held back
+            await asyncio.sleep(delay)
+
+    async def embed_batch(
+        self,
+        engine: str,
+        model: str,
+        texts: list[str],
+        url: str,
+        key: str = "",
+        prefix: Optional[str] = None,
+        user: Optional[UserModel] = None,
+        azure_api_version: Optional[str] = None,
+    ) -> list[list[float]]:
+        log.debug(f"embed_batch:{engine}:model {model} batch size: {len(texts)}")
+
+        request_url, headers, json_data = get_embedding_request(
+            engine, model, texts, url, key, prefix, user, azure_api_version
+        )
+        try:
+            data = await self.post(request_url, headers, json_data)
+        except EmbeddingRequestError as e:
+            if not (e.is_batch_too_large() and len(texts) > 1):
+                raise
+
+            half = len(texts) // 2
+            endpoint = (engine, url, model)
+            self._batch_sizes[endpoint] = min(
+                self._batch_sizes.get(endpoint, len(texts)), half
+            )
+            log.info(f"Embedding batch of {len(texts)} is too large, splitting it")
+
+            first, second = await asyncio.gather(
+                self.embed_batch(
+                    engine,
+                    model,
+                    texts[:half],
+                    url,
+                    key,
+                    prefix,
+                    user,
+                    azure_api_version,
+                ),
+                self.embed_batch(
+                    engine,
+                    model,
+                    texts[half:],
+                    url,
+                    key,
+                    prefix,
+                    user,
+                    azure_api_version,
+                ),
+            )
+            return first + second
+
+        return get_embeddings_from_response(engine, data)
+
+    async def embed(
+        self,
+        engine: str,
+        model: str,
+        texts: list[str],
+        url: str,
+        key: str = "",
+        prefix: Optional[str] = None,
+        user: Optional[UserModel] = None,
+        azure_api_version: Optional[str] = None,
+        batch_size: int = 1,
+    ) -> list[list[float]]:
+        """
+        Embed `texts` in concurrently sent batches of at most `batch_size`.
+        Batches that fail are logged and left out of the result, like the
+        sequential implementation did.
+        """
+        batch_size = max(
+            1, min(batch_size, self._batch_sizes.get((engine, url, model), batch_size))
+        )
+
+        results = await asyncio.gather(
+            *[
+                self.embed_batch(
+                    engine,
+                    model,
+                    texts[i : i + batch_size],
+                    url,
+                    key,
+                    prefix,
+                    user,
+                    azure_api_version,
+                )
+                for i in range(0, len(texts), batch_size)
+            ],
+            return_exceptions=True,
+        )
+
+        embeddings = []
+        for result in results:
+            if isinstance(result, BaseException):
+                log.error(f"Error generating {engine} embeddings: {result}")
+                continue
+            embeddings.extend(result)
+        return embeddings
+
+    async def _close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    def close(self):
+        with self._lock:
+            loop = self._loop
+        if loop is not None:
+            self.run(self._close())
+
+
+EMBEDDING_CLIENT = EmbeddingClient()
@@ -0,0 +1,197 @@
+import gzip
+import hashlib
+import io
+import json
+import logging
+import threading
+from typing import Optional
+
+from langchain_core.documents import Document
+
+from open_webui.config import (
+    ENABLE_EXTRACTION_CACHE,
+    EXTRACTION_CACHE_MAX_SIZE_MB,
+    ENABLE_PARALLEL_EXTRACTION,
+    PARALLEL_EXTRACTION_MIN_PAGES,
+    PARALLEL_EXTRACTION_PAGES_PER_SHARD,
+)
+from open_webui.env import SRC_LOG_LEVELS
+from open_webui.models.extractions import ExtractionCaches
+from open_webui.storage.provider import Storage
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+
+# Loader settings read by each extraction engine, the default engine only
+# reads PDF_EXTRACT_IMAGES
+ENGINE_SETTING_PREFIXES = {
+    "external": ("EXTERNAL_DOCUMENT_LOADER_",),
+    "tika": ("TIKA_", "PDF_EXTRACT_IMAGES"),
+    "datalab_marker": ("DATALAB_MARKER_",),
+    "docling": ("DOCLING_",),
+    "document_intelligence": ("DOCUMENT_INTELLIGENCE_",),
+    "mineru": ("MINERU_",),
+    "mistral_ocr": ("MISTRAL_OCR_", "PDF_EXTRACT_IMAGES"),
+}
+
+
+def get_extraction_cache_key(
+    file_hash: str,
+    filename: str,
+    content_type: Optional[str],
+    engine: str,
+    settings: dict,
+) -> str:
+    """
+    Key of the documents extracted from a file with the given sha256 by
+    `engine`. The loader is chosen by the extension and content type of the
+    file, so they are part of the key. Only the settings read by the engine
+    are, and credentials only by whether they are set, so rotating a key
+    does not invalidate the cache.
+    """
+    prefixes = ENGINE_SETTING_PREFIXES.get(engine, ()) + ("PDF_EXTRACT_IMAGES",)
+
+    params = {}
+    for name, value in settings.items():
+        if not name.startswith(prefixes):
+            continue
+        params[name] = bool(value) if name.endswith("_KEY") else value
+
+    # Engines fall back to the default loaders, which split large documents
+    # differently with parallel extraction
+    params["ENABLE_PARALLEL_EXTRACTION"] = ENABLE_PARALLEL_EXTRACTION
+    params["PARALLEL_EXTRACTION_MIN_PAGES"] = PARALLEL_EXTRACTION_MIN_PAGES
+    params["PARALLEL_EXTRACTION_PAGES_PER_SHARD"] = PARALLEL_EXTRACTION_PAGES_PER_SHARD
+
+    return hashlib.sha256(
+        json.dumps(
+            [
+                file_hash,
+                filename.split(".")[-1].lower(),
+                content_type or "",
+                engine,
+                params,
+            ],
+            sort_keys=True,
+            default=str,
+        ).encode()
+    ).hexdigest()
+
+
+def encode_documents(docs: list[Document]) -> bytes:
+    return gzip.compress(
+        json.dumps(
+            [
+                {"page_content": doc.page_content, "metadata": doc.metadata}
+                for doc in docs
+            ],
+            default=str,
+        ).encode("utf-8")
+    )
+
+
+def decode_documents(data: bytes) -> list[Document]:
+    return [
+        Document(page_content=doc["page_content"], metadata=doc["metadata"])
+        for doc in json.loads(gzip.decompress(data))
+    ]
+
+
+class ExtractionCache:
+    """
+    Documents extracted from files, stored through the storage provider and
+    indexed in the extraction_cache table. The least recently used entries
+    are evicted once the entries take more than `max_size` bytes.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def _count(self, hits: int = 0, misses: int = 0, errors: int = 0):
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+            self.errors += errors
+
+    def get(self, key: str) -> Optional[list[Document]]:
+        try:
+            entry = ExtractionCaches.get_entry_by_key(key)
+            if entry is None:
+                self._count(misses=1)
+                return None
+
+            with open(Storage.get_file(entry.path), "rb") as f:
+                docs = decode_documents(f.read())
+        except Exception as e:
+            # The file is gone (e.g. the uploads were reset), drop the entry
+            log.warning(f"Error reading the extraction cache entry {key}: {e}")
+            ExtractionCaches.delete_entry_by_key(key)
+            self._count(misses=1, errors=1)
+            return None
+
+        self._count(hits=1)
+        return docs
+
+    def set(self, key: str, docs: list[Document]):
+        try:
+            data = encode_documents(docs)
+            _, path = Storage.upload_file(
+                io.BytesIO(data), f"extraction-cache-{key}.json.gz", {}
+            )
+            ExtractionCaches.upsert_entry(key, path, len(data))
+            self.evict()
+        except Exception as e:
+            log.warning(f"Error writing the extraction cache entry {key}: {e}")
+            self._count(errors=1)
+
+    def evict(self):
+        excess = ExtractionCaches.get_total_size() - self.max_size
+        while excess > 0:
+            entries = ExtractionCaches.get_least_recently_used_entries(100)
+            if not entries:
+                break
+
+            for entry in entries:
+                self._delete(entry)
+                excess -= entry.size
+                if excess <= 0:
+                    break
+
+    def _delete(self, entry):
+        ExtractionCaches.delete_entry_by_key(entry.key)
+        try:
+            Storage.delete_file(entry.path)
+        except Exception as e:
+            log.warning(f"Error deleting the extraction cache file {entry.path}: {e}")
+
+    def clear(self):
+        for entry in ExtractionCaches.get_entries():
+            self._delete(entry)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            hits, misses, errors = self.hits, self.misses, self.errors
+
+        lookups = hits + misses
+        return {
+            "entries": ExtractionCaches.get_count(),
+            "size": ExtractionCaches.get_total_size(),
+            "max_size": self.max_size,
+            "hits": hits,
+            "misses": misses,
+            "errors": errors,
+            "hit_rate": hits / lookups if lookups else 0.0,
+        }
+
+
+EXTRACTION_CACHE = (
+    ExtractionCache(EXTRACTION_CACHE_MAX_SIZE_MB * 1024 * 1024)
+    if ENABLE_EXTRACTION_CACHE
+    else None
+)
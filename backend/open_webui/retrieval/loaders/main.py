@@ -3,6 +3,7 @@ import logging
 import ftfy
 import sys
 import json
+from typing import Callable, Iterator, Optional
 
 from azure.identity import DefaultAzureCredential
 from langchain_community.document_loaders import (
@@ -28,8 +29,10 @@ from open_webui.retrieval.loaders.external_document import ExternalDocumentLoade
 from open_webui.retrieval.loaders.mistral import MistralLoader
 from open_webui.retrieval.loaders.datalab_marker import DatalabMarkerLoader
 from open_webui.retrieval.loaders.mineru import MinerULoader
+from open_webui.retrieval.loaders.parallel import ParallelLoader, get_parallel_loader
 
 
+from open_webui.config import ENABLE_PARALLEL_EXTRACTION
 from open_webui.env import SRC_LOG_LEVELS, GLOBAL_LOG_LEVEL
 
 logging.basicConfig(stream=sys.stdout, level=GLOBAL_LOG_LEVEL)
@@ -234,15 +237,30 @@ class Loader:
     def load(
         self, filename: str, file_content_type: str, file_path: str
     ) -> list[Document]:
+        return list(self.lazy_load(filename, file_content_type, file_path))
+
+    def lazy_load(
+        self,
+        filename: str,
+        file_content_type: str,
+        file_path: str,
+        on_progress: Optional[Callable[[int, int], None]] = None,
+    ) -> Iterator[Document]:
+        """
+        Yields the documents as they are extracted. `on_progress(done, total)`
+        is called with the pages extracted so far by the parallel loader.
+        """
         loader = self._get_loader(filename, file_content_type, file_path)
-        docs = loader.load()
 
-        return [
-            Document(
+        if isinstance(loader, ParallelLoader):
+            # Text is fixed by the extraction processes
+            yield from loader.lazy_load(on_progress)
+            return
+
+        for doc in loader.load():
+            yield Document(
                 page_content=ftfy.fix_text(doc.page_content), metadata=doc.metadata
             )
-            for doc in docs
-        ]
 
     def _is_text_file(self, file_ext: str, file_content_type: str) -> bool:
         return file_ext in known_source_ext or (
@@ -391,7 +409,20 @@ class Loader:
                 file_path=file_path,
             )
         else:
-            if file_ext == "pdf":
+            parallel_loader = (
+                get_parallel_loader(
+                    file_ext,
+                    file_content_type,
+                    file_path,
+                    extract_images=self.kwargs.get("PDF_EXTRACT_IMAGES"),
+                )
+                if ENABLE_PARALLEL_EXTRACTION
+                else None
+            )
+
+            if parallel_loader:
+                loader = parallel_loader
+            elif file_ext == "pdf":
                 loader = PyPDFLoader(
                     file_path, extract_images=self.kwargs.get("PDF_EXTRACT_IMAGES")
                 )
@@ -0,0 +1,224 @@
+import logging
+import multiprocessing
+import threading
+from datetime import datetime
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Iterator, Optional
+
+from langchain_core.documents import Document
+
+from open_webui.config import (
+    PARALLEL_EXTRACTION_WORKERS,
+    PARALLEL_EXTRACTION_PAGES_PER_SHARD,
+    PARALLEL_EXTRACTION_MIN_PAGES,
+)
+from open_webui.env import SRC_LOG_LEVELS
+from open_webui.retrieval.loaders import shards
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+
+# Workbooks are split by sheet once they have this many rows in total
+MIN_SPREADSHEET_ROWS = 10000
+
+PPTX_CONTENT_TYPE = (
+    "application/vnd.openxmlformats-officedocument.presentationml.presentation"
+)
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # Spawned rather than forked, forking the threaded app process
+            # can deadlock the children
+            _executor = ProcessPoolExecutor(
+                max_workers=PARALLEL_EXTRACTION_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _executor
+
+
+def reset_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def get_pdf_metadata(reader) -> dict:
+    """
+    Document metadata of a PDF, normalized the way PyPDFLoader does it so
+    sharded PDFs get the same metadata.
+    """
+    metadata = {}
+    for key, value in {
+        "producer": "PyPDF",
+        "creator": "PyPDF",
+        "creationdate": "",
+        **(reader.metadata or {}),
+    }.items():
+        if type(value) not in [str, int]:
+            value = str(value)
+        key = key.lstrip("/").lower()
+
+        if key in ["creationdate", "moddate"]:
+            try:
+                value = datetime.strptime(
+                    value.replace("'", ""), "D:%Y%m%d%H%M%S%z"
+                ).isoformat("T")
+            except ValueError:
+                pass
+        elif isinstance(value, str):
+            value = value.strip()
+        metadata[key] = value
+    return metadata
+
+
+def get_page_ranges(total: int) -> list[tuple[int, int]]:
+    return [
+        (start, min(start + PARALLEL_EXTRACTION_PAGES_PER_SHARD, total))
+        for start in range(0, total, PARALLEL_EXTRACTION_PAGES_PER_SHARD)
+    ]
+
+
+class ParallelLoader:
+    """
+    Extracts a large local document in shards on the extraction process pool.
+
+    `lazy_load` yields the pages in document order as soon as the shards
+    before them are done, and reports the pages extracted so far through
+    `on_progress(done, total)`.
+    """
+
+    def __init__(
+        self,
+        file_path: str,
+        extract: Callable,
+        shard_args: list[tuple],
+        total: int,
+        metadata: Optional[dict] = None,
+    ):
+        self.file_path = file_path
+        self.extract = extract
+        self.shard_args = shard_args
+        self.total = total
+        self.metadata = {"source": file_path, **(metadata or {})}
+
+    def load(self) -> list[Document]:
+        return list(self.lazy_load())
+
+    def lazy_load(
+        self, on_progress: Optional[Callable[[int, int], None]] = None
+    ) -> Iterator[Document]:
+        try:
+            executor = get_executor()
+            futures: dict[Future, int] = {
+                executor.submit(self.extract, self.file_path, *args): idx
+                for idx, args in enumerate(self.shard_args)
+            }
+        except Exception:
+            reset_executor()
+            raise
+
+        results = {}
+        next_idx = 0
+        done = 0
+        try:
+            for future in as_completed(futures):
+                pages = future.result()
+                results[futures[future]] = pages
+
+                done += len(pages)
+                if on_progress:
+                    on_progress(done, self.total)
+
+                while next_idx in results:
+                    for page_content, metadata in results.pop(next_idx):
+                        yield Document(
+                            page_content=page_content,
+                            metadata={**self.metadata, **metadata},
+                        )
+                    next_idx += 1
+        except BrokenProcessPool:
+            reset_executor()
+            raise
+        finally:
+            for future in futures:
+                future.cancel()
+
+
+def get_parallel_loader(
+    file_ext: str,
+    file_content_type: Optional[str],
+    file_path: str,
+    extract_images: bool = False,
+) -> Optional[ParallelLoader]:
+    """
+    Returns a parallel loader for documents large enough to be worth
+    splitting, None for the others (and when they can not be inspected).
+
+    PDF pages come out as PyPDFLoader would return them. Presentations and
+    workbooks are read with python-pptx and openpyxl instead of Unstructured,
+    as one document per slide (with its `page_number`) and per sheet (with
+    its `page_name`) holding the plain text of the slide or the tab separated
+    rows of the sheet.
+    """
+    try:
+        if file_ext == "pdf" and not extract_images:
+            from pypdf import PdfReader
+
+            reader = PdfReader(file_path)
+            total = len(reader.pages)
+            if total < PARALLEL_EXTRACTION_MIN_PAGES:
+                return None
+
+            return ParallelLoader(
+                file_path,
+                shards.extract_pdf_pages,
+                get_page_ranges(total),
+                total,
+                {**get_pdf_metadata(reader), "total_pages": total},
+            )
+
+        if file_ext == "pptx" or file_content_type == PPTX_CONTENT_TYPE:
+            from pptx import Presentation
+
+            total = len(Presentation(file_path).slides)
+            if total < PARALLEL_EXTRACTION_MIN_PAGES:
+                return None
+
+            return ParallelLoader(
+                file_path, shards.extract_pptx_slides, get_page_ranges(total), total
+            )
+
+        if file_ext == "xlsx" or file_content_type == XLSX_CONTENT_TYPE:
+            from openpyxl import load_workbook
+
+            workbook = load_workbook(file_path, read_only=True)
+            try:
+                sheet_names = workbook.sheetnames
+                rows = sum(workbook[name].max_row or 0 for name in sheet_names)
+            finally:
+                workbook.close()
+
+            if len(sheet_names) < 2 or rows < MIN_SPREADSHEET_ROWS:
+                return None
+
+            return ParallelLoader(
+                file_path,
+                shards.extract_xlsx_sheets,
+                [([name],) for name in sheet_names],
+                len(sheet_names),
+            )
+    except Exception as e:
+        log.warning(f"Parallel extraction is not available for {file_path}: {e}")
+
+    return None
@@ -0,0 +1,74 @@
+"""
+Extraction of a shard of a document (a page range of a PDF, a slide range of
+a presentation, sheets of a spreadsheet), run in the processes of the
+parallel extraction pool.
+
+The pool uses the spawn start method, so this module only imports what the
+extraction needs. Shards are returned as (page_content, metadata) tuples.
+
+PDF pages match the documents of PyPDFLoader. Slides and sheets are read
+directly rather than through Unstructured, one document per slide or sheet
+(see `get_parallel_loader`).
+"""
+
+import ftfy
+
+
+def extract_pdf_pages(file_path: str, start: int, end: int) -> list[tuple]:
+    from pypdf import PdfReader
+
+    reader = PdfReader(file_path)
+    page_labels = reader.page_labels
+
+    pages = []
+    for idx in range(start, end):
+        text = (reader.pages[idx].extract_text() or "").strip()
+        pages.append(
+            (
+                ftfy.fix_text(text),
+                {
+                    "page": idx,
+                    "page_label": (
+                        page_labels[idx] if idx < len(page_labels) else str(idx + 1)
+                    ),
+                },
+            )
+        )
+    return pages
+
+
+def extract_pptx_slides(file_path: str, start: int, end: int) -> list[tuple]:
+    from pptx import Presentation
+
+    slides = list(Presentation(file_path).slides)
+
+    pages = []
+    for idx in range(start, end):
+        texts = []
+        for shape in slides[idx].shapes:
+            if shape.has_text_frame and shape.text_frame.text.strip():
+                texts.append(shape.text_frame.text)
+            elif getattr(shape, "has_table", False) and shape.has_table:
+                for row in shape.table.rows:
+                    texts.append("\t".join(cell.text for cell in row.cells))
+        pages.append((ftfy.fix_text("\n\n".join(texts)), {"page_number": idx + 1}))
+    return pages
+
+
+def extract_xlsx_sheets(file_path: str, sheet_names: list[str]) -> list[tuple]:
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        pages = []
+        for sheet_name in sheet_names:
+            lines = []
+            for row in workbook[sheet_name].iter_rows(values_only=True):
+                cells = ["" if value is None else str(value) for value in row]
+                line = "\t".join(cells).rstrip()
+                if line:
+                    lines.append(line)
+            pages.append((ftfy.fix_text("\n".join(lines)), {"page_name": sheet_name}))
+        return pages
+    finally:
+        workbook.close()
@@ -1,22 +1,51 @@
 import os
 import logging
+from typing import Optional
+
 import torch
 import numpy as np
 from colbert.infra import ColBERTConfig
 from colbert.modeling.checkpoint import Checkpoint
 
+from open_webui.config import (
+    ENABLE_RAG_COLBERT_CACHE,
+    RAG_COLBERT_CACHE_PATH,
+    RAG_COLBERT_CACHE_MAX_ENTRIES,
+    RAG_EMBEDDING_CACHE_TTL,
+)
 from open_webui.env import SRC_LOG_LEVELS
 
+from open_webui.retrieval.embedding_cache import (
+    SQLiteEmbeddingCacheBackend,
+    get_embedding_cache_key,
+)
 from open_webui.retrieval.models.base_reranker import BaseReranker
 
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["RAG"])
 
 
+def get_colbert_cache() -> Optional[SQLiteEmbeddingCacheBackend]:
+    if not ENABLE_RAG_COLBERT_CACHE:
+        return None
+
+    try:
+        return SQLiteEmbeddingCacheBackend(
+            RAG_COLBERT_CACHE_PATH,
+            RAG_COLBERT_CACHE_MAX_ENTRIES,
+            RAG_EMBEDDING_CACHE_TTL,
+        )
+    except Exception as e:
+        log.warning(f"ColBERT document cache is disabled: {e}")
+        return None
+
+
 class ColBERT(BaseReranker):
     def __init__(self, name, **kwargs) -> None:
         log.info("ColBERT: Loading model", name)
+        self.name = name
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        self.cache = get_colbert_cache()
 
         DOCKER = kwargs.get("env") == "docker"
         if DOCKER:
@@ -70,16 +99,78 @@ class ColBERT(BaseReranker):
 
         return normalized_scores.detach().cpu().numpy().astype(np.float32)
 
+    def get_document_embeddings(self, docs: list[str]) -> list[torch.Tensor]:
+        """
+        Token embeddings of each document, without padding. Documents do not
+        change once ingested, so they are computed once per text and kept as
+        float16 in the cache.
+        """
+        dim = self.ckpt.colbert_config.dim
+        keys = [
+            get_embedding_cache_key("colbert", self.name, None, doc) for doc in docs
+        ]
+
+        values = [None] * len(docs)
+        if self.cache:
+            try:
+                values = self.cache.get_many(keys)
+            except Exception as e:
+                log.warning(f"Error reading the ColBERT document cache: {e}")
+
+        embeddings = [
+            (
+                torch.from_numpy(
+                    np.frombuffer(value, dtype=np.float16)
+                    .reshape(-1, dim)
+                    .astype(np.float32)
+                )
+                if value
+                else None
+            )
+            for value in values
+        ]
+
+        missing = [idx for idx, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            computed = self.ckpt.docFromText(
+                [docs[idx] for idx in missing], bsize=32, keep_dims=False
+            )[0]
+
+            items = {}
+            for idx, embedding in zip(missing, computed):
+                embeddings[idx] = embedding.detach().float().cpu()
+                items[keys[idx]] = embeddings[idx].numpy().astype(np.float16).tobytes()
+
+            if self.cache:
+                try:
+                    self.cache.set_many(items)
+                except Exception as e:
+                    log.warning(f"Error writing the ColBERT document cache: {e}")
+
+        return embeddings
+
+    def cache_documents(self, docs: list[str]):
+        """
+        Computes the token embeddings of documents ahead of their first
+        reranking, e.g. at ingest.
+        """
+        if self.cache:
+            for i in range(0, len(docs), 32):
+                self.get_document_embeddings(docs[i : i + 32])
+
     def predict(self, sentences):
 
         query = sentences[0][0]
         docs = [i[1] for i in sentences]
 
-        # Embedding the documents
-        embedded_docs = self.ckpt.docFromText(docs, bsize=32)[0]
+        # Embedding the documents, padded with zeros to the longest one
+        embedded_docs = torch.nn.utils.rnn.pad_sequence(
+            self.get_document_embeddings(docs), batch_first=True
+        )
         # Embedding the queries
         embedded_queries = self.ckpt.queryFromText([query], bsize=32)
         embedded_query = embedded_queries[0]
+        embedded_docs = embedded_docs.to(embedded_query.dtype)
 
         # Calculate retrieval scores for the query against all documents
         scores = self.calculate_similarity_scores(
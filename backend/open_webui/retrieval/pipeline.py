@@ -0,0 +1,94 @@
+import queue
+import threading
+from typing import Any, Callable, Iterable, Iterator
+
+
+_DONE = object()
+
+
+class _Failed:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def run_pipeline(
+    source: Iterable,
+    stages: list[Callable[[Any], Any]],
+    queue_size: int = 2,
+) -> Iterator[Any]:
+    """
+    Runs the items of `source` through `stages`, each stage (and the
+    iteration of `source`) on its own thread, and yields the results of the
+    last stage in order.
+
+    The steps are connected by queues of at most `queue_size` items, so a
+    step that gets ahead blocks until the next one catches up. An error in
+    any step stops the others and is raised to the caller, as is closing the
+    generator early.
+    """
+    stop = threading.Event()
+    queues = [queue.Queue(maxsize=queue_size) for _ in range(len(stages) + 1)]
+
+    def put(q: queue.Queue, item) -> bool:
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def get(q: queue.Queue):
+        while not stop.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        return _DONE
+
+    def produce():
+        try:
+            for item in source:
+                if not put(queues[0], item):
+                    return
+            put(queues[0], _DONE)
+        except BaseException as e:
+            put(queues[0], _Failed(e))
+
+    def work(stage: Callable, input: queue.Queue, output: queue.Queue):
+        while True:
+            item = get(input)
+            if item is _DONE or isinstance(item, _Failed):
+                put(output, item)
+                return
+
+            try:
+                result = stage(item)
+            except BaseException as e:
+                put(output, _Failed(e))
+                return
+
+            if not put(output, result):
+                return
+
+    threads = [threading.Thread(target=produce, daemon=True)] + [
+        threading.Thread(
+            target=work, args=(stage, queues[idx], queues[idx + 1]), daemon=True
+        )
+        for idx, stage in enumerate(stages)
+    ]
+    for thread in threads:
+        thread.start()
+
+    try:
+        while True:
+            item = queues[-1].get()
+            if item is _DONE:
+                return
+            if isinstance(item, _Failed):
+                raise item.error
+            yield item
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
@@ -2,13 +2,12 @@ import logging
 import os
 from typing import Optional, Union
 
-import requests
 import hashlib
+import numpy as np
 from concurrent.futures import ThreadPoolExecutor
 import time
 import re
 
-from urllib.parse import quote
 from huggingface_hub import snapshot_download
 from langchain.retrievers import ContextualCompressionRetriever, EnsembleRetriever
 from langchain_community.retrievers import BM25Retriever
@@ -16,6 +15,14 @@ from langchain_core.documents import Document
 
 from open_webui.config import VECTOR_DB
 from open_webui.retrieval.vector.factory import VECTOR_DB_CLIENT
+from open_webui.retrieval.bm25 import BM25_INDEX
+from open_webui.retrieval.embedding_client import EMBEDDING_CLIENT
+from open_webui.retrieval.batching import get_model_batcher
+from open_webui.retrieval.models.base_reranker import BaseReranker
+from open_webui.retrieval.embedding_cache import (
+    EMBEDDING_CACHE,
+    get_embedding_cache_key,
+)
 
 
 from open_webui.models.users import UserModel
@@ -36,12 +43,12 @@ from open_webui.retrieval.loaders.youtube import YoutubeLoader
 from open_webui.env import (
     SRC_LOG_LEVELS,
     OFFLINE_MODE,
-    ENABLE_FORWARD_USER_INFO_HEADERS,
 )
 from open_webui.config import (
     RAG_EMBEDDING_QUERY_PREFIX,
     RAG_EMBEDDING_CONTENT_PREFIX,
     RAG_EMBEDDING_PREFIX_FIELD_NAME,
+    ENABLE_RAG_LOCAL_INFERENCE_BATCHING,
 )
 
 log = logging.getLogger(__name__)
@@ -82,10 +89,24 @@ def get_content_from_url(request, url: str) -> str:
     return content, docs
 
 
+class VectorSearchState:
+    """
+    Query embeddings and cosine similarities seen by `VectorSearchRetriever`
+    during one hybrid search, so `RerankCompressor` can score candidates
+    without embedding them again.
+    """
+
+    def __init__(self):
+        self.query_embeddings = {}
+        # page_content -> cosine similarity to the query
+        self.similarities = {}
+
+
 class VectorSearchRetriever(BaseRetriever):
     collection_name: Any
     embedding_function: Any
     top_k: int
+    state: Optional[Any] = None
 
     def _get_relevant_documents(
         self,
@@ -93,9 +114,10 @@ class VectorSearchRetriever(BaseRetriever):
         *,
         run_manager: CallbackManagerForRetrieverRun,
     ) -> list[Document]:
+        query_embedding = self.embedding_function(query, RAG_EMBEDDING_QUERY_PREFIX)
         result = VECTOR_DB_CLIENT.search(
             collection_name=self.collection_name,
-            vectors=[self.embedding_function(query, RAG_EMBEDDING_QUERY_PREFIX)],
+            vectors=[query_embedding],
             limit=self.top_k,
         )
 
@@ -103,6 +125,12 @@ class VectorSearchRetriever(BaseRetriever):
         metadatas = result.metadatas[0]
         documents = result.documents[0]
 
+        if self.state is not None:
+            self.state.query_embeddings[query] = query_embedding
+            if VECTOR_DB_CLIENT.normalized_cosine_scores and result.distances:
+                for document, distance in zip(documents, result.distances[0]):
+                    self.state.similarities[document] = 2.0 * distance - 1.0
+
         results = []
         for idx in range(len(ids)):
             results.append(
@@ -114,6 +142,19 @@ class VectorSearchRetriever(BaseRetriever):
         return results
 
 
+class BM25IndexRetriever(BaseRetriever):
+    collection_name: Any
+    top_k: int
+
+    def _get_relevant_documents(
+        self,
+        query: str,
+        *,
+        run_manager: CallbackManagerForRetrieverRun,
+    ) -> list[Document]:
+        return BM25_INDEX.search(self.collection_name, query, self.top_k)
+
+
 def query_doc(
     collection_name: str, query_embedding: list[float], k: int, user: UserModel = None
 ):
@@ -150,7 +191,7 @@ def get_doc(collection_name: str, user: UserModel = None):
 
 def query_doc_with_hybrid_search(
     collection_name: str,
-    collection_result: GetResult,
+    collection_result: Optional[GetResult],
     query: str,
     embedding_function,
     k: int,
@@ -159,29 +200,47 @@ def query_doc_with_hybrid_search(
     r: float,
     hybrid_bm25_weight: float,
 ) -> dict:
+    """
+    `collection_result` holds every chunk of the collection and is only
+    needed when the collection has no persistent BM25 index, pass None
+    otherwise.
+    """
     try:
-        if (
-            not collection_result
-            or not hasattr(collection_result, "documents")
-            or not collection_result.documents
-            or len(collection_result.documents) == 0
-            or not collection_result.documents[0]
-        ):
-            log.warning(f"query_doc_with_hybrid_search:no_docs {collection_name}")
-            return {"documents": [], "metadatas": [], "distances": []}
+        if collection_result is None and BM25_INDEX.has_index(collection_name):
+            if BM25_INDEX.count(collection_name) == 0:
+                log.warning(f"query_doc_with_hybrid_search:no_docs {collection_name}")
+                return {"documents": [], "metadatas": [], "distances": []}
 
-        log.debug(f"query_doc_with_hybrid_search:doc {collection_name}")
+            log.debug(f"query_doc_with_hybrid_search:index {collection_name}")
 
-        bm25_retriever = BM25Retriever.from_texts(
-            texts=collection_result.documents[0],
-            metadatas=collection_result.metadatas[0],
-        )
-        bm25_retriever.k = k
+            bm25_retriever = BM25IndexRetriever(
+                collection_name=collection_name, top_k=k
+            )
+        else:
+            if (
+                not collection_result
+                or not hasattr(collection_result, "documents")
+                or not collection_result.documents
+                or len(collection_result.documents) == 0
+                or not collection_result.documents[0]
+            ):
+                log.warning(f"query_doc_with_hybrid_search:no_docs {collection_name}")
+                return {"documents": [], "metadatas": [], "distances": []}
+
+            log.debug(f"query_doc_with_hybrid_search:doc {collection_name}")
 
+            bm25_retriever = BM25Retriever.from_texts(
+                texts=collection_result.documents[0],
+                metadatas=collection_result.metadatas[0],
+            )
+            bm25_retriever.k = k
+
+        vector_search_state = VectorSearchState()
         vector_search_retriever = VectorSearchRetriever(
             collection_name=collection_name,
             embedding_function=embedding_function,
             top_k=k,
+            state=vector_search_state,
         )
 
         if hybrid_bm25_weight <= 0:
@@ -203,6 +262,7 @@ def query_doc_with_hybrid_search(
             top_n=k_reranker,
             reranking_function=reranking_function,
             r_score=r,
+            vector_search_state=vector_search_state,
         )
 
         compression_retriever = ContextualCompressionRetriever(
@@ -328,74 +388,44 @@ def get_all_items_from_collections(collection_names: list[str]) -> dict:
     return merge_get_results(results)
 
 
-def query_collection(
-    collection_names: list[str],
-    queries: list[str],
-    embedding_function,
-    k: int,
-) -> dict:
-    results = []
-    error = False
-
-    def process_query_collection(collection_name, query_embedding):
-        try:
-            if collection_name:
-                result = query_doc(
-                    collection_name=collection_name,
-                    k=k,
-                    query_embedding=query_embedding,
-                )
-                if result is not None:
-                    return result.model_dump(), None
-            return None, None
-        except Exception as e:
-            log.exception(f"Error when querying the collection: {e}")
-            return None, e
-
-    # Generate all query embeddings (in one call)
-    query_embeddings = embedding_function(queries, prefix=RAG_EMBEDDING_QUERY_PREFIX)
-    log.debug(
-        f"query_collection: processing {len(queries)} queries across {len(collection_names)} collections"
-    )
-
-    with ThreadPoolExecutor() as executor:
-        future_results = []
-        for query_embedding in query_embeddings:
-            for collection_name in collection_names:
-                result = executor.submit(
-                    process_query_collection, collection_name, query_embedding
-                )
-                future_results.append(result)
-        task_results = [future.result() for future in future_results]
-
-    for result, err in task_results:
-        if err is not None:
-            error = True
-        elif result is not None:
-            results.append(result)
+def with_query_embeddings(embedding_function, queries: list[str], query_embeddings):
+    """
+    Wrap `embedding_function` so the already computed query embeddings are
+    returned instead of embedding the same queries again.
+    """
+    cached_embeddings = dict(zip(queries, query_embeddings))
 
-    if error and not results:
-        log.warning("All collection queries failed. No results returned.")
+    def embed(text, prefix=None, **kwargs):
+        if (
+            prefix == RAG_EMBEDDING_QUERY_PREFIX
+            and isinstance(text, str)
+            and text in cached_embeddings
+        ):
+            return cached_embeddings[text]
+        return embedding_function(text, prefix, **kwargs)
 
-    return merge_and_sort_query_results(results, k=k)
+    return embed
 
 
-def query_collection_with_hybrid_search(
+def get_hybrid_search_collection_results(
     collection_names: list[str],
-    queries: list[str],
-    embedding_function,
-    k: int,
-    reranking_function,
-    k_reranker: int,
-    r: float,
-    hybrid_bm25_weight: float,
-) -> dict:
-    results = []
-    error = False
-    # Fetch collection data once per collection sequentially
-    # Avoid fetching the same data multiple times later
+) -> tuple[dict, set]:
+    """
+    Collections with a persistent BM25 index are searched without loading
+    their chunks. The others are fetched once per collection sequentially,
+    and indexed in the background so later searches don't have to fetch
+    them again.
+
+    Returns the fetched chunks by collection (None if fetching failed) and
+    the names of the indexed collections.
+    """
     collection_results = {}
+    indexed_collection_names = set()
     for collection_name in collection_names:
+        if BM25_INDEX.has_index(collection_name):
+            indexed_collection_names.add(collection_name)
+            continue
+
         try:
             log.debug(
                 f"query_collection_with_hybrid_search:VECTOR_DB_CLIENT.get:collection {collection_name}"
@@ -407,16 +437,53 @@ def query_collection_with_hybrid_search(
             log.exception(f"Failed to fetch collection {collection_name}: {e}")
             collection_results[collection_name] = None
 
-    log.info(
-        f"Starting hybrid search for {len(queries)} queries in {len(collection_names)} collections..."
-    )
+        if collection_results[collection_name] is not None:
+            BM25_INDEX.build_in_background(
+                collection_name, collection_results[collection_name]
+            )
+
+    return collection_results, indexed_collection_names
+
+
+def search_collections(
+    collection_names: list[str],
+    queries: list[str],
+    query_embeddings: list,
+    embedding_function,
+    k: int,
+    hybrid_search: bool = False,
+    reranking_function=None,
+    k_reranker: int = 0,
+    r: float = 0.0,
+    hybrid_bm25_weight: float = 0.0,
+) -> dict:
+    """
+    Run every (collection, query) search in a single concurrent fan-out.
 
-    def process_query(collection_name, query):
+    Returns `{(collection_name, query_idx): (result, error)}`. Searches of
+    collections that could not be loaded for hybrid search are left out.
+    """
+
+    def process_query_collection(collection_name, query_idx):
+        try:
+            result = query_doc(
+                collection_name=collection_name,
+                k=k,
+                query_embedding=query_embeddings[query_idx],
+            )
+            if result is not None:
+                return result.model_dump(), None
+            return None, None
+        except Exception as e:
+            log.exception(f"Error when querying the collection: {e}")
+            return None, e
+
+    def process_query(collection_name, query_idx):
         try:
             result = query_doc_with_hybrid_search(
                 collection_name=collection_name,
-                collection_result=collection_results[collection_name],
-                query=query,
+                collection_result=collection_results.get(collection_name),
+                query=queries[query_idx],
                 embedding_function=embedding_function,
                 k=k,
                 reranking_function=reranking_function,
@@ -429,31 +496,208 @@ def query_collection_with_hybrid_search(
             log.exception(f"Error when querying the collection with hybrid_search: {e}")
             return None, e
 
-    # Prepare tasks for all collections and queries
-    # Avoid running any tasks for collections that failed to fetch data (have assigned None)
-    tasks = [
-        (cn, q)
-        for cn in collection_names
-        if collection_results[cn] is not None
-        for q in queries
-    ]
+    collection_names = [name for name in collection_names if name]
+
+    if hybrid_search:
+        collection_results, indexed_collection_names = (
+            get_hybrid_search_collection_results(collection_names)
+        )
+
+        log.info(
+            f"Starting hybrid search for {len(queries)} queries in {len(collection_names)} collections..."
+        )
+
+        # Avoid running any tasks for collections that failed to fetch data (have assigned None)
+        tasks = [
+            (cn, qi)
+            for cn in collection_names
+            if cn in indexed_collection_names or collection_results[cn] is not None
+            for qi in range(len(queries))
+        ]
+        process = process_query
+    else:
+        log.debug(
+            f"query_collection: processing {len(queries)} queries across {len(collection_names)} collections"
+        )
+
+        if VECTOR_DB_CLIENT.supports_multi_collection_search:
+            return search_collections_at_once(collection_names, query_embeddings, k)
+
+        tasks = [(cn, qi) for qi in range(len(queries)) for cn in collection_names]
+        process = process_query_collection
 
     with ThreadPoolExecutor() as executor:
-        future_results = [executor.submit(process_query, cn, q) for cn, q in tasks]
-        task_results = [future.result() for future in future_results]
+        future_results = [executor.submit(process, cn, qi) for cn, qi in tasks]
+        return {task: future.result() for task, future in zip(tasks, future_results)}
+
+
+def search_collections_at_once(
+    collection_names: list[str], query_embeddings: list, k: int
+) -> dict:
+    """
+    `search_collections` for vector DBs that search every collection and
+    query in a single request.
+    """
+    try:
+        results = VECTOR_DB_CLIENT.search_collections(
+            collection_names=collection_names,
+            vectors=query_embeddings,
+            limit=k,
+        )
+    except Exception as e:
+        log.exception(f"Error when querying the collections: {e}")
+        return {
+            (cn, qi): (None, e)
+            for qi in range(len(query_embeddings))
+            for cn in collection_names
+        }
+
+    search_results = {}
+    for qi in range(len(query_embeddings)):
+        for cn in collection_names:
+            result = results.get(cn)
+            if result is None:
+                search_results[(cn, qi)] = (None, None)
+                continue
+
+            search_results[(cn, qi)] = (
+                {
+                    "ids": [result.ids[qi]],
+                    "distances": [result.distances[qi]],
+                    "documents": [result.documents[qi]],
+                    "metadatas": [result.metadatas[qi]],
+                },
+                None,
+            )
+    return search_results
+
+
+def merge_collection_search_results(
+    search_results: dict, collection_names, k: int
+) -> tuple[dict, bool]:
+    """
+    Merge the `search_collections` results of `collection_names`. Also
+    returns whether all of their searches failed.
+    """
+    results = []
+    error = False
+
+    for (collection_name, _), (result, err) in search_results.items():
+        if collection_name not in collection_names:
+            continue
 
-    for result, err in task_results:
         if err is not None:
             error = True
         elif result is not None:
             results.append(result)
 
-    if error and not results:
+    return merge_and_sort_query_results(results, k=k), error and not results
+
+
+def query_collection(
+    collection_names: list[str],
+    queries: list[str],
+    embedding_function,
+    k: int,
+) -> dict:
+    # Generate all query embeddings (in one call)
+    query_embeddings = embedding_function(queries, prefix=RAG_EMBEDDING_QUERY_PREFIX)
+
+    search_results = search_collections(
+        collection_names=collection_names,
+        queries=queries,
+        query_embeddings=query_embeddings,
+        embedding_function=embedding_function,
+        k=k,
+    )
+
+    result, failed = merge_collection_search_results(
+        search_results, set(collection_names), k=k
+    )
+    if failed:
+        log.warning("All collection queries failed. No results returned.")
+
+    return result
+
+
+def query_collection_with_hybrid_search(
+    collection_names: list[str],
+    queries: list[str],
+    embedding_function,
+    k: int,
+    reranking_function,
+    k_reranker: int,
+    r: float,
+    hybrid_bm25_weight: float,
+) -> dict:
+    # Generate all query embeddings (in one call)
+    query_embeddings = embedding_function(queries, prefix=RAG_EMBEDDING_QUERY_PREFIX)
+
+    search_results = search_collections(
+        collection_names=collection_names,
+        queries=queries,
+        query_embeddings=query_embeddings,
+        embedding_function=with_query_embeddings(
+            embedding_function, queries, query_embeddings
+        ),
+        k=k,
+        hybrid_search=True,
+        reranking_function=reranking_function,
+        k_reranker=k_reranker,
+        r=r,
+        hybrid_bm25_weight=hybrid_bm25_weight,
+    )
+
+    result, failed = merge_collection_search_results(
+        search_results, set(collection_names), k=k
+    )
+    if failed:
         raise Exception(
             "Hybrid search failed for all collections. Using Non-hybrid search as fallback."
         )
 
-    return merge_and_sort_query_results(results, k=k)
+    return result
+
+
+def get_cached_embedding_function(embedding_engine, embedding_model, func):
+    """
+    Serve embeddings of texts that were embedded before from EMBEDDING_CACHE
+    and only pass the others on to `func`.
+    """
+
+    def embed(query, prefix=None, user=None):
+        texts = query if isinstance(query, list) else [query]
+        keys = [
+            get_embedding_cache_key(embedding_engine, embedding_model, prefix, text)
+            for text in texts
+        ]
+
+        embeddings = EMBEDDING_CACHE.get_many(keys)
+
+        # Texts that are repeated within the request are only embedded once
+        missing = {}
+        for idx, embedding in enumerate(embeddings):
+            if embedding is None:
+                missing.setdefault(keys[idx], idx)
+
+        if missing:
+            missing_embeddings = func(
+                [texts[idx] for idx in missing.values()], prefix=prefix, user=user
+            )
+            if len(missing_embeddings) != len(missing):
+                # Some batches failed, don't guess which texts they belong to
+                log.warning("Embedding count mismatch, skipping the embedding cache")
+                return func(query, prefix=prefix, user=user)
+
+            new_embeddings = dict(zip(missing.keys(), missing_embeddings))
+            for idx, embedding in enumerate(embeddings):
+                if embedding is None:
+                    embeddings[idx] = new_embeddings[keys[idx]]
+            EMBEDDING_CACHE.set_many(new_embeddings)
+
+        return embeddings if isinstance(query, list) else embeddings[0]
+
+    return embed
 
 
 def get_embedding_function(
@@ -464,42 +708,85 @@ def get_embedding_function(
     key,
     embedding_batch_size,
     azure_api_version=None,
+):
+    embedding_function = get_uncached_embedding_function(
+        embedding_engine,
+        embedding_model,
+        embedding_function,
+        url,
+        key,
+        embedding_batch_size,
+        azure_api_version=azure_api_version,
+    )
+
+    if EMBEDDING_CACHE is None:
+        return embedding_function
+
+    return get_cached_embedding_function(
+        embedding_engine, embedding_model, embedding_function
+    )
+
+
+def get_uncached_embedding_function(
+    embedding_engine,
+    embedding_model,
+    embedding_function,
+    url,
+    key,
+    embedding_batch_size,
+    azure_api_version=None,
 ):
     if embedding_engine == "":
-        return lambda query, prefix=None, user=None: embedding_function.encode(
-            query, **({"prompt": prefix} if prefix else {})
-        ).tolist()
-    elif embedding_engine in ["ollama", "openai", "azure_openai"]:
-        func = lambda query, prefix=None, user=None: generate_embeddings(
-            engine=embedding_engine,
-            model=embedding_model,
-            text=query,
-            prefix=prefix,
-            url=url,
-            key=key,
-            user=user,
-            azure_api_version=azure_api_version,
+        if not ENABLE_RAG_LOCAL_INFERENCE_BATCHING:
+            return lambda query, prefix=None, user=None: embedding_function.encode(
+                query, **({"prompt": prefix} if prefix else {})
+            ).tolist()
+
+        # Concurrent calls are encoded together on the batcher's worker thread
+        batcher = get_model_batcher(
+            "embedding",
+            embedding_function,
+            lambda model, texts, prompt=None: model.encode(
+                texts, **({"prompt": prompt} if prompt else {})
+            ).tolist(),
         )
 
-        def generate_multiple(query, prefix, user, func):
+        def encode(query, prefix=None, user=None):
             if isinstance(query, list):
-                embeddings = []
-                for i in range(0, len(query), embedding_batch_size):
-                    batch_embeddings = func(
-                        query[i : i + embedding_batch_size],
-                        prefix=prefix,
-                        user=user,
-                    )
+                return batcher.submit(query, prompt=prefix)
+            return batcher.submit([query], prompt=prefix)[0]
+
+        # The batcher only holds a weak reference, the model stays loaded
+        # while the function is in use even if it is replaced meanwhile
+        encode.model = embedding_function
+        return encode
+    elif embedding_engine in ["ollama", "openai", "azure_openai"]:
 
-                    if isinstance(batch_embeddings, list):
-                        embeddings.extend(batch_embeddings)
+        def generate_multiple(query, prefix=None, user=None):
+            texts = apply_embedding_prefix(
+                query if isinstance(query, list) else [query], prefix
+            )
+
+            # The batches are sent concurrently over the shared connection pool
+            embeddings = EMBEDDING_CLIENT.run(
+                EMBEDDING_CLIENT.embed(
+                    embedding_engine,
+                    embedding_model,
+                    texts,
+                    url,
+                    key,
+                    prefix=prefix,
+                    user=user,
+                    azure_api_version=azure_api_version,
+                    batch_size=embedding_batch_size,
+                )
+            )
+
+            if isinstance(query, list):
                 return embeddings
-            else:
-                return func(query, prefix, user)
+            return embeddings[0] if embeddings else None
 
-        return lambda query, prefix=None, user=None: generate_multiple(
-            query, prefix, user, func
-        )
+        return generate_multiple
     else:
         raise ValueError(f"Unknown embedding engine: {embedding_engine}")
 
@@ -511,6 +798,22 @@ def get_reranking_function(reranking_engine, reranking_model, reranking_function
         return lambda sentences, user=None: reranking_function.predict(
             sentences, user=user
         )
+    elif ENABLE_RAG_LOCAL_INFERENCE_BATCHING and not isinstance(
+        reranking_function, BaseReranker
+    ):
+        # CrossEncoder, the pairs of concurrent calls are scored together.
+        # ColBERT scores a single query per call and is not batched.
+        batcher = get_model_batcher(
+            "reranking",
+            reranking_function,
+            lambda model, sentences: model.predict(sentences),
+        )
+
+        def predict(sentences, user=None):
+            return batcher.submit(sentences)
+
+        predict.model = reranking_function
+        return predict
     else:
         return lambda sentences, user=None: reranking_function.predict(sentences)
 
@@ -534,7 +837,9 @@ def get_sources_from_items(
     )
 
     extracted_collections = []
-    query_results = []
+    # (item, query_result, collection_names) in item order, the collections
+    # of all items are searched together once every item has been resolved
+    planned_items = []
 
     for item in items:
         query_result = None
@@ -666,7 +971,13 @@ def get_sources_from_items(
                 if item.get("legacy"):
                     collection_names.append(f"{item['id']}")
                 else:
-                    collection_names.append(f"file-{item['id']}")
+                    # A failed ingest keeps the chunks inserted so far until
+                    # it is retried, they are not searched
+                    file_object = Files.get_file_by_id(item["id"])
+                    if file_object and (file_object.data or {}).get("ingest"):
+                        log.debug(f"skipping the incomplete ingest of {item['id']}")
+                    else:
+                        collection_names.append(f"file-{item['id']}")
 
         elif item.get("type") == "collection":
             # Manual Full Mode Toggle for Collection
@@ -736,41 +1047,59 @@ def get_sources_from_items(
                 log.debug(f"skipping {item} as it has already been extracted")
                 continue
 
+            extracted_collections.extend(collection_names)
+
+        planned_items.append((item, query_result, collection_names))
+
+    search_results = None
+    searched_collections = [
+        collection_name
+        for _, query_result, collection_names in planned_items
+        if query_result is None
+        for collection_name in collection_names
+    ]
+    if searched_collections and not full_context:
+        try:
+            # Embed the queries once for every item, then search all of the
+            # collections in a single fan-out
+            query_embeddings = embedding_function(
+                queries, prefix=RAG_EMBEDDING_QUERY_PREFIX
+            )
+            search_results = search_collections(
+                collection_names=searched_collections,
+                queries=queries,
+                query_embeddings=query_embeddings,
+                embedding_function=with_query_embeddings(
+                    embedding_function, queries, query_embeddings
+                ),
+                k=k,
+                hybrid_search=hybrid_search,
+                reranking_function=reranking_function,
+                k_reranker=k_reranker,
+                r=r,
+                hybrid_bm25_weight=hybrid_bm25_weight,
+            )
+        except Exception as e:
+            log.exception(e)
+
+    query_results = []
+    for item, query_result, collection_names in planned_items:
+        if query_result is None and collection_names:
             try:
                 if full_context:
                     query_result = get_all_items_from_collections(collection_names)
-                else:
-                    query_result = None  # Initialize to None
-                    if hybrid_search:
-                        try:
-                            query_result = query_collection_with_hybrid_search(
-                                collection_names=collection_names,
-                                queries=queries,
-                                embedding_function=embedding_function,
-                                k=k,
-                                reranking_function=reranking_function,
-                                k_reranker=k_reranker,
-                                r=r,
-                                hybrid_bm25_weight=hybrid_bm25_weight,
-                            )
-                        except Exception as e:
-                            log.debug(
-                                "Error when using hybrid search, using non hybrid search as fallback."
-                            )
-
-                    # fallback to non-hybrid search
-                    if not hybrid_search and query_result is None:
-                        query_result = query_collection(
-                            collection_names=collection_names,
-                            queries=queries,
-                            embedding_function=embedding_function,
-                            k=k,
+                elif search_results is not None:
+                    query_result, failed = merge_collection_search_results(
+                        search_results, collection_names, k=k
+                    )
+                    if failed and hybrid_search:
+                        log.debug(
+                            "Error when using hybrid search, using non hybrid search as fallback."
                         )
+                        query_result = None
             except Exception as e:
                 log.exception(e)
 
-            extracted_collections.extend(collection_names)
-
         if query_result:
             if "data" in item:
                 del item["data"]
@@ -848,34 +1177,9 @@ def generate_openai_batch_embeddings(
         log.debug(
             f"generate_openai_batch_embeddings:model {model} batch size: {len(texts)}"
         )
-        json_data = {"input": texts, "model": model}
-        if isinstance(RAG_EMBEDDING_PREFIX_FIELD_NAME, str) and isinstance(prefix, str):
-            json_data[RAG_EMBEDDING_PREFIX_FIELD_NAME] = prefix
-
-        r = requests.post(
-            f"{url}/embeddings",
-            headers={
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {key}",
-                **(
-                    {
-                        "X-OpenWebUI-User-Name": quote(user.name, safe=" "),
-                        "X-OpenWebUI-User-Id": user.id,
-                        "X-OpenWebUI-User-Email": user.email,
-                        "X-OpenWebUI-User-Role": user.role,
-                    }
-                    if ENABLE_FORWARD_USER_INFO_HEADERS and user
-                    else {}
-                ),
-            },
-            json=json_data,
+        return EMBEDDING_CLIENT.run(
+            EMBEDDING_CLIENT.embed_batch("openai", model, texts, url, key, prefix, user)
         )
-        r.raise_for_status()
-        data = r.json()
-        if "data" in data:
-            return [elem["embedding"] for elem in data["data"]]
-        else:
-            raise "Something went wrong :/"
     except Exception as e:
         log.exception(f"Error generating openai batch embeddings: {e}")
         return None
@@ -894,42 +1198,11 @@ def generate_azure_openai_batch_embeddings(
         log.debug(
             f"generate_azure_openai_batch_embeddings:deployment {model} batch size: {len(texts)}"
         )
-        json_data = {"input": texts}
-        if isinstance(RAG_EMBEDDING_PREFIX_FIELD_NAME, str) and isinstance(prefix, str):
-            json_data[RAG_EMBEDDING_PREFIX_FIELD_NAME] = prefix
-
-        url = f"{url}/openai/deployments/{model}/embeddings?api-version={version}"
-
-        for _ in range(5):
-            r = requests.post(
-                url,
-                headers={
-                    "Content-Type": "application/json",
-                    "api-key": key,
-                    **(
-                        {
-                            "X-OpenWebUI-User-Name": quote(user.name, safe=" "),
-                            "X-OpenWebUI-User-Id": user.id,
-                            "X-OpenWebUI-User-Email": user.email,
-                            "X-OpenWebUI-User-Role": user.role,
-                        }
-                        if ENABLE_FORWARD_USER_INFO_HEADERS and user
-                        else {}
-                    ),
-                },
-                json=json_data,
+        return EMBEDDING_CLIENT.run(
+            EMBEDDING_CLIENT.embed_batch(
+                "azure_openai", model, texts, url, key, prefix, user, version
             )
-            if r.status_code == 429:
-                retry = float(r.headers.get("Retry-After", "1"))
-                time.sleep(retry)
-                continue
-            r.raise_for_status()
-            data = r.json()
-            if "data" in data:
-                return [elem["embedding"] for elem in data["data"]]
-            else:
-                raise Exception("Something went wrong :/")
-        return None
+        )
     except Exception as e:
         log.exception(f"Error generating azure openai batch embeddings: {e}")
         return None
@@ -947,40 +1220,21 @@ def generate_ollama_batch_embeddings(
         log.debug(
             f"generate_ollama_batch_embeddings:model {model} batch size: {len(texts)}"
         )
-        json_data = {"input": texts, "model": model}
-        if isinstance(RAG_EMBEDDING_PREFIX_FIELD_NAME, str) and isinstance(prefix, str):
-            json_data[RAG_EMBEDDING_PREFIX_FIELD_NAME] = prefix
-
-        r = requests.post(
-            f"{url}/api/embed",
-            headers={
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {key}",
-                **(
-                    {
-                        "X-OpenWebUI-User-Name": quote(user.name, safe=" "),
-                        "X-OpenWebUI-User-Id": user.id,
-                        "X-OpenWebUI-User-Email": user.email,
-                        "X-OpenWebUI-User-Role": user.role,
-                    }
-                    if ENABLE_FORWARD_USER_INFO_HEADERS
-                    else {}
-                ),
-            },
-            json=json_data,
+        return EMBEDDING_CLIENT.run(
+            EMBEDDING_CLIENT.embed_batch("ollama", model, texts, url, key, prefix, user)
         )
-        r.raise_for_status()
-        data = r.json()
-
-        if "embeddings" in data:
-            return data["embeddings"]
-        else:
-            raise "Something went wrong :/"
     except Exception as e:
         log.exception(f"Error generating ollama batch embeddings: {e}")
         return None
 
 
+def apply_embedding_prefix(texts: list[str], prefix: Optional[str]) -> list[str]:
+    # Without a prefix field the prefix is sent as part of the text
+    if prefix is not None and RAG_EMBEDDING_PREFIX_FIELD_NAME is None:
+        return [f"{prefix}{text}" for text in texts]
+    return texts
+
+
 def generate_embeddings(
     engine: str,
     model: str,
@@ -992,11 +1246,10 @@ def generate_embeddings(
     key = kwargs.get("key", "")
     user = kwargs.get("user")
 
-    if prefix is not None and RAG_EMBEDDING_PREFIX_FIELD_NAME is None:
-        if isinstance(text, list):
-            text = [f"{prefix}{text_element}" for text_element in text]
-        else:
-            text = f"{prefix}{text}"
+    if isinstance(text, list):
+        text = apply_embedding_prefix(text, prefix)
+    else:
+        text = apply_embedding_prefix([text], prefix)[0]
 
     if engine == "ollama":
         embeddings = generate_ollama_batch_embeddings(
@@ -1029,23 +1282,81 @@ def generate_embeddings(
         return embeddings[0] if isinstance(text, str) else embeddings
 
 
-import operator
 from typing import Optional, Sequence
 
 from langchain_core.callbacks import Callbacks
 from langchain_core.documents import BaseDocumentCompressor, Document
 
 
+def get_top_n_indices(scores: np.ndarray, top_n: int, min_score: float = 0.0):
+    """
+    Indices of the `top_n` highest scores that are at least `min_score`,
+    best first. Ties keep their original order.
+    """
+    indices = np.arange(len(scores))
+    if min_score:
+        indices = indices[scores >= min_score]
+
+    if 0 < top_n < len(indices):
+        # Partial selection first, only the kept scores are sorted
+        indices = np.sort(indices[np.argpartition(-scores[indices], top_n - 1)[:top_n]])
+
+    indices = indices[np.argsort(-scores[indices], kind="stable")]
+    return indices[:top_n]
+
+
 class RerankCompressor(BaseDocumentCompressor):
     embedding_function: Any
     top_n: int
     reranking_function: Any
     r_score: float
+    vector_search_state: Optional[Any] = None
 
     class Config:
         extra = "forbid"
         arbitrary_types_allowed = True
 
+    def _get_similarity_scores(
+        self, documents: Sequence[Document], query: str
+    ) -> np.ndarray:
+        """
+        Cosine similarity of every document to the query. Similarities already
+        returned by the vector DB are reused, only the remaining documents
+        (e.g. BM25 only matches) are embedded.
+        """
+        state = self.vector_search_state
+
+        query_embedding = state.query_embeddings.get(query) if state else None
+        if query_embedding is None:
+            query_embedding = self.embedding_function(query, RAG_EMBEDDING_QUERY_PREFIX)
+
+        scores = np.zeros(len(documents), dtype=np.float64)
+        missing = []
+        for idx, doc in enumerate(documents):
+            similarity = state.similarities.get(doc.page_content) if state else None
+            if similarity is None:
+                missing.append(idx)
+            else:
+                scores[idx] = similarity
+
+        if missing:
+            query_vector = np.asarray(query_embedding, dtype=np.float64)
+            document_vectors = np.asarray(
+                self.embedding_function(
+                    [documents[idx].page_content for idx in missing],
+                    RAG_EMBEDDING_CONTENT_PREFIX,
+                ),
+                dtype=np.float64,
+            )
+            norms = np.linalg.norm(document_vectors, axis=1) * np.linalg.norm(
+                query_vector
+            )
+            scores[missing] = (document_vectors @ query_vector) / np.maximum(
+                norms, 1e-8
+            )
+
+        return scores
+
     def compress_documents(
         self,
         documents: Sequence[Document],
@@ -1059,30 +1370,20 @@ class RerankCompressor(BaseDocumentCompressor):
             scores = self.reranking_function(
                 [(query, doc.page_content) for doc in documents]
             )
+        elif documents:
+            scores = self._get_similarity_scores(documents, query)
         else:
-            from sentence_transformers import util
-
-            query_embedding = self.embedding_function(query, RAG_EMBEDDING_QUERY_PREFIX)
-            document_embedding = self.embedding_function(
-                [doc.page_content for doc in documents], RAG_EMBEDDING_CONTENT_PREFIX
-            )
-            scores = util.cos_sim(query_embedding, document_embedding)[0]
+            scores = []
 
         if scores is not None:
-            docs_with_scores = list(
-                zip(
-                    documents,
-                    scores.tolist() if not isinstance(scores, list) else scores,
-                )
-            )
-            if self.r_score:
-                docs_with_scores = [
-                    (d, s) for d, s in docs_with_scores if s >= self.r_score
-                ]
+            scores = np.asarray(
+                scores if isinstance(scores, (list, np.ndarray)) else scores.tolist(),
+                dtype=np.float64,
+            ).reshape(-1)
 
-            result = sorted(docs_with_scores, key=operator.itemgetter(1), reverse=True)
             final_results = []
-            for doc, doc_score in result[: self.top_n]:
+            for idx in get_top_n_indices(scores, self.top_n, self.r_score):
+                doc, doc_score = documents[idx], float(scores[idx])
                 metadata = doc.metadata
                 metadata["score"] = doc_score
                 doc = Document(
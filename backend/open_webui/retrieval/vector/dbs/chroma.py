@@ -31,6 +31,8 @@ log.setLevel(SRC_LOG_LEVELS["RAG"])
 
 
 class ChromaClient(VectorDBBase):
+    normalized_cosine_scores = True
+
     def __init__(self):
         settings_dict = {
             "allow_reset": True,
@@ -1,3 +1,4 @@
+from contextlib import contextmanager
 from typing import Optional, List, Dict, Any
 import logging
 import json
@@ -20,7 +21,7 @@ from sqlalchemy import (
 from sqlalchemy.sql import true
 from sqlalchemy.pool import NullPool, QueuePool
 
-from sqlalchemy.orm import declarative_base, scoped_session, sessionmaker
+from sqlalchemy.orm import declarative_base, sessionmaker
 from sqlalchemy.dialects.postgresql import JSONB, array
 from pgvector.sqlalchemy import Vector
 from sqlalchemy.ext.mutable import MutableDict
@@ -44,6 +45,11 @@ from open_webui.config import (
     PGVECTOR_POOL_MAX_OVERFLOW,
     PGVECTOR_POOL_TIMEOUT,
     PGVECTOR_POOL_RECYCLE,
+    PGVECTOR_INDEX_METHOD,
+    PGVECTOR_IVFFLAT_LISTS,
+    PGVECTOR_HNSW_M,
+    PGVECTOR_HNSW_EF_CONSTRUCTION,
+    PGVECTOR_HNSW_EF_SEARCH,
 )
 
 from open_webui.env import SRC_LOG_LEVELS
@@ -79,13 +85,16 @@ class DocumentChunk(Base):
 
 
 class PgvectorClient(VectorDBBase):
+    normalized_cosine_scores = True
+    supports_multi_collection_search = True
+
     def __init__(self) -> None:
 
         # if no pgvector uri, use the existing database connection
         if not PGVECTOR_DB_URL:
-            from open_webui.internal.db import Session
+            from open_webui.internal.db import SessionLocal
 
-            self.session = Session
+            self.SessionLocal = SessionLocal
         else:
             if isinstance(PGVECTOR_POOL_SIZE, int):
                 if PGVECTOR_POOL_SIZE > 0:
@@ -105,16 +114,29 @@ class PgvectorClient(VectorDBBase):
             else:
                 engine = create_engine(PGVECTOR_DB_URL, pool_pre_ping=True)
 
-            SessionLocal = sessionmaker(
+            self.SessionLocal = sessionmaker(
                 autocommit=False, autoflush=False, bind=engine, expire_on_commit=False
             )
-            self.session = scoped_session(SessionLocal)
 
+        with self.get_session() as session:
+            self.initialize(session)
+
+    @contextmanager
+    def get_session(self):
+        # Every call gets its own session (and pooled connection), searches
+        # run concurrently from several threads
+        session = self.SessionLocal()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    def initialize(self, session) -> None:
         try:
             # Ensure the pgvector extension is available
             # Use a conditional check to avoid permission issues on Azure PostgreSQL
             if PGVECTOR_CREATE_EXTENSION:
-                self.session.execute(
+                session.execute(
                     text(
                         """
                     DO $$
@@ -130,7 +152,7 @@ class PgvectorClient(VectorDBBase):
             if PGVECTOR_PGCRYPTO:
                 # Ensure the pgcrypto extension is available for encryption
                 # Use a conditional check to avoid permission issues on Azure PostgreSQL
-                self.session.execute(
+                session.execute(
                     text(
                         """
                     DO $$
@@ -149,35 +171,30 @@ class PgvectorClient(VectorDBBase):
                     )
 
             # Check vector length consistency
-            self.check_vector_length()
+            self.check_vector_length(session)
 
             # Create the tables if they do not exist
             # Base.metadata.create_all requires a bind (engine or connection)
             # Get the connection from the session
-            connection = self.session.connection()
+            connection = session.connection()
             Base.metadata.create_all(bind=connection)
 
             # Create an index on the vector column if it doesn't exist
-            self.session.execute(
-                text(
-                    "CREATE INDEX IF NOT EXISTS idx_document_chunk_vector "
-                    "ON document_chunk USING ivfflat (vector vector_cosine_ops) WITH (lists = 100);"
-                )
-            )
-            self.session.execute(
+            self.create_vector_index(session)
+            session.execute(
                 text(
                     "CREATE INDEX IF NOT EXISTS idx_document_chunk_collection_name "
                     "ON document_chunk (collection_name);"
                 )
             )
-            self.session.commit()
+            session.commit()
             log.info("Initialization complete.")
         except Exception as e:
-            self.session.rollback()
+            session.rollback()
             log.exception(f"Error during initialization: {e}")
             raise
 
-    def check_vector_length(self) -> None:
+    def check_vector_length(self, session) -> None:
         """
         Check if the VECTOR_LENGTH matches the existing vector column dimension in the database.
         Raises an exception if there is a mismatch.
@@ -186,7 +203,7 @@ class PgvectorClient(VectorDBBase):
         try:
             # Attempt to reflect the 'document_chunk' table
             document_chunk_table = Table(
-                "document_chunk", metadata, autoload_with=self.session.bind
+                "document_chunk", metadata, autoload_with=session.bind
             )
         except NoSuchTableError:
             # Table does not exist; no action needed
@@ -212,6 +229,45 @@ class PgvectorClient(VectorDBBase):
                 "The 'vector' column does not exist in the 'document_chunk' table."
             )
 
+    def create_vector_index(self, session) -> None:
+        """
+        Create the index of the vector column with PGVECTOR_INDEX_METHOD. An
+        existing index built with the other method is replaced.
+        """
+        if PGVECTOR_INDEX_METHOD == "hnsw":
+            index_options = (
+                f"USING hnsw (vector vector_cosine_ops) "
+                f"WITH (m = {PGVECTOR_HNSW_M}, ef_construction = {PGVECTOR_HNSW_EF_CONSTRUCTION})"
+            )
+        else:
+            index_options = (
+                f"USING ivfflat (vector vector_cosine_ops) "
+                f"WITH (lists = {PGVECTOR_IVFFLAT_LISTS})"
+            )
+
+        index_definition = session.execute(
+            text(
+                "SELECT indexdef FROM pg_indexes "
+                "WHERE tablename = 'document_chunk' "
+                "AND indexname = 'idx_document_chunk_vector'"
+            )
+        ).scalar()
+        if (
+            index_definition
+            and f"USING {PGVECTOR_INDEX_METHOD} " not in index_definition
+        ):
+            log.info(
+                f"Rebuilding the document_chunk vector index with {PGVECTOR_INDEX_METHOD}"
+            )
+            session.execute(text("DROP INDEX IF EXISTS idx_document_chunk_vector"))
+
+        session.execute(
+            text(
+                "CREATE INDEX IF NOT EXISTS idx_document_chunk_vector "
+                f"ON document_chunk {index_options};"
+            )
+        )
+
     def adjust_vector_length(self, vector: List[float]) -> List[float]:
         # Adjust vector to have length VECTOR_LENGTH
         current_length = len(vector)
@@ -224,110 +280,45 @@ class PgvectorClient(VectorDBBase):
         return vector
 
     def insert(self, collection_name: str, items: List[VectorItem]) -> None:
-        try:
-            if PGVECTOR_PGCRYPTO:
-                for item in items:
-                    vector = self.adjust_vector_length(item["vector"])
-                    # Use raw SQL for BYTEA/pgcrypto
-                    # Ensure metadata is converted to its JSON text representation
-                    json_metadata = json.dumps(item["metadata"])
-                    self.session.execute(
-                        text(
+        with self.get_session() as session:
+            try:
+                if PGVECTOR_PGCRYPTO:
+                    for item in items:
+                        vector = self.adjust_vector_length(item["vector"])
+                        # Use raw SQL for BYTEA/pgcrypto
+                        # Ensure metadata is converted to its JSON text representation
+                        json_metadata = json.dumps(item["metadata"])
+                        session.execute(
+                            text(
+                                """
+                                INSERT INTO document_chunk
+                                (id, vector, collection_name, text, vmetadata)
+                                VALUES (
+                                    :id, :vector, :collection_name,
+                                    pgp_sym_encrypt(:text, :key),
+                                    pgp_sym_encrypt(:metadata_text, :key)
+                                )
+                                ON CONFLICT (id) DO NOTHING
                             """
-                            INSERT INTO document_chunk
-                            (id, vector, collection_name, text, vmetadata)
-                            VALUES (
-                                :id, :vector, :collection_name,
-                                pgp_sym_encrypt(:text, :key),
-                                pgp_sym_encrypt(:metadata_text, :key)
-                            )
-                            ON CONFLICT (id) DO NOTHING
-                        """
-                        ),
-                        {
-                            "id": item["id"],
-                            "vector": vector,
-                            "collection_name": collection_name,
-                            "text": item["text"],
-                            "metadata_text": json_metadata,
-                            "key": PGVECTOR_PGCRYPTO_KEY,
-                        },
+                            ),
+                            {
+                                "id": item["id"],
+                                "vector": vector,
+                                "collection_name": collection_name,
+                                "text": item["text"],
+                                "metadata_text": json_metadata,
+                                "key": PGVECTOR_PGCRYPTO_KEY,
+                            },
+                        )
+                    session.commit()
+                    log.info(
+                        f"Encrypted & inserted {len(items)} into '{collection_name}'"
                     )
-                self.session.commit()
-                log.info(f"Encrypted & inserted {len(items)} into '{collection_name}'")
 
-            else:
-                new_items = []
-                for item in items:
-                    vector = self.adjust_vector_length(item["vector"])
-                    new_chunk = DocumentChunk(
-                        id=item["id"],
-                        vector=vector,
-                        collection_name=collection_name,
-                        text=item["text"],
-                        vmetadata=process_metadata(item["metadata"]),
-                    )
-                    new_items.append(new_chunk)
-                self.session.bulk_save_objects(new_items)
-                self.session.commit()
-                log.info(
-                    f"Inserted {len(new_items)} items into collection '{collection_name}'."
-                )
-        except Exception as e:
-            self.session.rollback()
-            log.exception(f"Error during insert: {e}")
-            raise
-
-    def upsert(self, collection_name: str, items: List[VectorItem]) -> None:
-        try:
-            if PGVECTOR_PGCRYPTO:
-                for item in items:
-                    vector = self.adjust_vector_length(item["vector"])
-                    json_metadata = json.dumps(item["metadata"])
-                    self.session.execute(
-                        text(
-                            """
-                            INSERT INTO document_chunk
-                            (id, vector, collection_name, text, vmetadata)
-                            VALUES (
-                                :id, :vector, :collection_name,
-                                pgp_sym_encrypt(:text, :key),
-                                pgp_sym_encrypt(:metadata_text, :key)
-                            )
-                            ON CONFLICT (id) DO UPDATE SET
-                              vector = EXCLUDED.vector,
-                              collection_name = EXCLUDED.collection_name,
-                              text = EXCLUDED.text,
-                              vmetadata = EXCLUDED.vmetadata
-                        """
-                        ),
-                        {
-                            "id": item["id"],
-                            "vector": vector,
-                            "collection_name": collection_name,
-                            "text": item["text"],
-                            "metadata_text": json_metadata,
-                            "key": PGVECTOR_PGCRYPTO_KEY,
-                        },
-                    )
-                self.session.commit()
-                log.info(f"Encrypted & upserted {len(items)} into '{collection_name}'")
-            else:
-                for item in items:
-                    vector = self.adjust_vector_length(item["vector"])
-                    existing = (
-                        self.session.query(DocumentChunk)
-                        .filter(DocumentChunk.id == item["id"])
-                        .first()
-                    )
-                    if existing:
-                        existing.vector = vector
-                        existing.text = item["text"]
-                        existing.vmetadata = process_metadata(item["metadata"])
-                        existing.collection_name = (
-                            collection_name  # Update collection_name if necessary
-                        )
-                    else:
+                else:
+                    new_items = []
+                    for item in items:
+                        vector = self.adjust_vector_length(item["vector"])
                         new_chunk = DocumentChunk(
                             id=item["id"],
                             vector=vector,
@@ -335,15 +326,86 @@ class PgvectorClient(VectorDBBase):
                             text=item["text"],
                             vmetadata=process_metadata(item["metadata"]),
                         )
-                        self.session.add(new_chunk)
-                self.session.commit()
-                log.info(
-                    f"Upserted {len(items)} items into collection '{collection_name}'."
-                )
-        except Exception as e:
-            self.session.rollback()
-            log.exception(f"Error during upsert: {e}")
-            raise
+                        new_items.append(new_chunk)
+                    session.bulk_save_objects(new_items)
+                    session.commit()
+                    log.info(
+                        f"Inserted {len(new_items)} items into collection '{collection_name}'."
+                    )
+            except Exception as e:
+                session.rollback()
+                log.exception(f"Error during insert: {e}")
+                raise
+
+    def upsert(self, collection_name: str, items: List[VectorItem]) -> None:
+        with self.get_session() as session:
+            try:
+                if PGVECTOR_PGCRYPTO:
+                    for item in items:
+                        vector = self.adjust_vector_length(item["vector"])
+                        json_metadata = json.dumps(item["metadata"])
+                        session.execute(
+                            text(
+                                """
+                                INSERT INTO document_chunk
+                                (id, vector, collection_name, text, vmetadata)
+                                VALUES (
+                                    :id, :vector, :collection_name,
+                                    pgp_sym_encrypt(:text, :key),
+                                    pgp_sym_encrypt(:metadata_text, :key)
+                                )
+                                ON CONFLICT (id) DO UPDATE SET
+                                  vector = EXCLUDED.vector,
+                                  collection_name = EXCLUDED.collection_name,
+                                  text = EXCLUDED.text,
+                                  vmetadata = EXCLUDED.vmetadata
+                            """
+                            ),
+                            {
+                                "id": item["id"],
+                                "vector": vector,
+                                "collection_name": collection_name,
+                                "text": item["text"],
+                                "metadata_text": json_metadata,
+                                "key": PGVECTOR_PGCRYPTO_KEY,
+                            },
+                        )
+                    session.commit()
+                    log.info(
+                        f"Encrypted & upserted {len(items)} into '{collection_name}'"
+                    )
+                else:
+                    for item in items:
+                        vector = self.adjust_vector_length(item["vector"])
+                        existing = (
+                            session.query(DocumentChunk)
+                            .filter(DocumentChunk.id == item["id"])
+                            .first()
+                        )
+                        if existing:
+                            existing.vector = vector
+                            existing.text = item["text"]
+                            existing.vmetadata = process_metadata(item["metadata"])
+                            existing.collection_name = (
+                                collection_name  # Update collection_name if necessary
+                            )
+                        else:
+                            new_chunk = DocumentChunk(
+                                id=item["id"],
+                                vector=vector,
+                                collection_name=collection_name,
+                                text=item["text"],
+                                vmetadata=process_metadata(item["metadata"]),
+                            )
+                            session.add(new_chunk)
+                    session.commit()
+                    log.info(
+                        f"Upserted {len(items)} items into collection '{collection_name}'."
+                    )
+            except Exception as e:
+                session.rollback()
+                log.exception(f"Error during upsert: {e}")
+                raise
 
     def search(
         self,
@@ -355,210 +417,237 @@ class PgvectorClient(VectorDBBase):
             if not vectors:
                 return None
 
-            # Adjust query vectors to VECTOR_LENGTH
-            vectors = [self.adjust_vector_length(vector) for vector in vectors]
-            num_queries = len(vectors)
-
-            def vector_expr(vector):
-                return cast(array(vector), Vector(VECTOR_LENGTH))
+            return self.search_collections([collection_name], vectors, limit)[
+                collection_name
+            ]
+        except Exception as e:
+            log.exception(f"Error during search: {e}")
+            return None
 
-            # Create the values for query vectors
-            qid_col = column("qid", Integer)
-            q_vector_col = column("q_vector", Vector(VECTOR_LENGTH))
-            query_vectors = (
-                values(qid_col, q_vector_col)
-                .data(
-                    [(idx, vector_expr(vector)) for idx, vector in enumerate(vectors)]
+    def search_collections(
+        self,
+        collection_names: List[str],
+        vectors: List[List[float]],
+        limit: Optional[int] = None,
+    ) -> Dict[str, Optional[SearchResult]]:
+        """
+        Search every collection for every query vector in one round trip.
+        Each (query vector, collection) pair gets its own `limit` best
+        matches from a lateral subquery, like separate searches would.
+        """
+        if not vectors or not collection_names:
+            return {collection_name: None for collection_name in collection_names}
+
+        # Adjust query vectors to VECTOR_LENGTH
+        vectors = [self.adjust_vector_length(vector) for vector in vectors]
+        num_queries = len(vectors)
+
+        def vector_expr(vector):
+            return cast(array(vector), Vector(VECTOR_LENGTH))
+
+        # Create the values for query vectors
+        qid_col = column("qid", Integer)
+        q_vector_col = column("q_vector", Vector(VECTOR_LENGTH))
+        query_vectors = (
+            values(qid_col, q_vector_col)
+            .data([(idx, vector_expr(vector)) for idx, vector in enumerate(vectors)])
+            .alias("query_vectors")
+        )
+
+        # And for the searched collections
+        query_collections = (
+            values(column("collection_name", Text))
+            .data([(collection_name,) for collection_name in collection_names])
+            .alias("query_collections")
+        )
+
+        result_fields = [
+            DocumentChunk.id,
+        ]
+        if PGVECTOR_PGCRYPTO:
+            result_fields.append(
+                pgcrypto_decrypt(DocumentChunk.text, PGVECTOR_PGCRYPTO_KEY, Text).label(
+                    "text"
                 )
-                .alias("query_vectors")
             )
-
-            result_fields = [
-                DocumentChunk.id,
-            ]
-            if PGVECTOR_PGCRYPTO:
-                result_fields.append(
-                    pgcrypto_decrypt(
-                        DocumentChunk.text, PGVECTOR_PGCRYPTO_KEY, Text
-                    ).label("text")
-                )
-                result_fields.append(
-                    pgcrypto_decrypt(
-                        DocumentChunk.vmetadata, PGVECTOR_PGCRYPTO_KEY, JSONB
-                    ).label("vmetadata")
-                )
-            else:
-                result_fields.append(DocumentChunk.text)
-                result_fields.append(DocumentChunk.vmetadata)
             result_fields.append(
-                (DocumentChunk.vector.cosine_distance(query_vectors.c.q_vector)).label(
-                    "distance"
-                )
+                pgcrypto_decrypt(
+                    DocumentChunk.vmetadata, PGVECTOR_PGCRYPTO_KEY, JSONB
+                ).label("vmetadata")
             )
-
-            # Build the lateral subquery for each query vector
-            subq = (
-                select(*result_fields)
-                .where(DocumentChunk.collection_name == collection_name)
-                .order_by(
-                    (DocumentChunk.vector.cosine_distance(query_vectors.c.q_vector))
-                )
+        else:
+            result_fields.append(DocumentChunk.text)
+            result_fields.append(DocumentChunk.vmetadata)
+        result_fields.append(
+            (DocumentChunk.vector.cosine_distance(query_vectors.c.q_vector)).label(
+                "distance"
             )
-            if limit is not None:
-                subq = subq.limit(limit)
-            subq = subq.lateral("result")
-
-            # Build the main query by joining query_vectors and the lateral subquery
-            stmt = (
-                select(
-                    query_vectors.c.qid,
-                    subq.c.id,
-                    subq.c.text,
-                    subq.c.vmetadata,
-                    subq.c.distance,
-                )
-                .select_from(query_vectors)
-                .join(subq, true())
-                .order_by(query_vectors.c.qid, subq.c.distance)
+        )
+
+        # Build the lateral subquery for each query vector and collection
+        subq = (
+            select(*result_fields)
+            .where(DocumentChunk.collection_name == query_collections.c.collection_name)
+            .order_by((DocumentChunk.vector.cosine_distance(query_vectors.c.q_vector)))
+        )
+        if limit is not None:
+            subq = subq.limit(limit)
+        subq = subq.lateral("result")
+
+        # Join the query vectors, the collections and the lateral subquery
+        stmt = (
+            select(
+                query_vectors.c.qid,
+                query_collections.c.collection_name,
+                subq.c.id,
+                subq.c.text,
+                subq.c.vmetadata,
+                subq.c.distance,
+            )
+            .select_from(query_vectors)
+            .join(query_collections, true())
+            .join(subq, true())
+            .order_by(query_vectors.c.qid, subq.c.distance)
+        )
+
+        with self.get_session() as session:
+            try:
+                if PGVECTOR_INDEX_METHOD == "hnsw" and PGVECTOR_HNSW_EF_SEARCH:
+                    session.execute(
+                        text(f"SET LOCAL hnsw.ef_search = {PGVECTOR_HNSW_EF_SEARCH}")
+                    )
+                results = session.execute(stmt).all()
+                session.rollback()  # read-only transaction
+            except Exception:
+                session.rollback()
+                raise
+
+        search_results = {}
+        for collection_name in collection_names:
+            search_results[collection_name] = SearchResult(
+                ids=[[] for _ in range(num_queries)],
+                distances=[[] for _ in range(num_queries)],
+                documents=[[] for _ in range(num_queries)],
+                metadatas=[[] for _ in range(num_queries)],
             )
 
-            result_proxy = self.session.execute(stmt)
-            results = result_proxy.all()
-
-            ids = [[] for _ in range(num_queries)]
-            distances = [[] for _ in range(num_queries)]
-            documents = [[] for _ in range(num_queries)]
-            metadatas = [[] for _ in range(num_queries)]
-
-            if not results:
-                return SearchResult(
-                    ids=ids,
-                    distances=distances,
-                    documents=documents,
-                    metadatas=metadatas,
-                )
+        for row in results:
+            qid = int(row.qid)
+            result = search_results[row.collection_name]
+            result.ids[qid].append(row.id)
+            # normalize and re-orders pgvec distance from [2, 0] to [0, 1] score range
+            # https://github.com/pgvector/pgvector?tab=readme-ov-file#querying
+            result.distances[qid].append((2.0 - row.distance) / 2.0)
+            result.documents[qid].append(row.text)
+            result.metadatas[qid].append(row.vmetadata)
 
-            for row in results:
-                qid = int(row.qid)
-                ids[qid].append(row.id)
-                # normalize and re-orders pgvec distance from [2, 0] to [0, 1] score range
-                # https://github.com/pgvector/pgvector?tab=readme-ov-file#querying
-                distances[qid].append((2.0 - row.distance) / 2.0)
-                documents[qid].append(row.text)
-                metadatas[qid].append(row.vmetadata)
-
-            self.session.rollback()  # read-only transaction
-            return SearchResult(
-                ids=ids, distances=distances, documents=documents, metadatas=metadatas
-            )
-        except Exception as e:
-            self.session.rollback()
-            log.exception(f"Error during search: {e}")
-            return None
+        return search_results
 
     def query(
         self, collection_name: str, filter: Dict[str, Any], limit: Optional[int] = None
     ) -> Optional[GetResult]:
-        try:
-            if PGVECTOR_PGCRYPTO:
-                # Build where clause for vmetadata filter
-                where_clauses = [DocumentChunk.collection_name == collection_name]
-                for key, value in filter.items():
-                    # decrypt then check key: JSON filter after decryption
-                    where_clauses.append(
+        with self.get_session() as session:
+            try:
+                if PGVECTOR_PGCRYPTO:
+                    # Build where clause for vmetadata filter
+                    where_clauses = [DocumentChunk.collection_name == collection_name]
+                    for key, value in filter.items():
+                        # decrypt then check key: JSON filter after decryption
+                        where_clauses.append(
+                            pgcrypto_decrypt(
+                                DocumentChunk.vmetadata, PGVECTOR_PGCRYPTO_KEY, JSONB
+                            )[key].astext
+                            == str(value)
+                        )
+                    stmt = select(
+                        DocumentChunk.id,
+                        pgcrypto_decrypt(
+                            DocumentChunk.text, PGVECTOR_PGCRYPTO_KEY, Text
+                        ).label("text"),
                         pgcrypto_decrypt(
                             DocumentChunk.vmetadata, PGVECTOR_PGCRYPTO_KEY, JSONB
-                        )[key].astext
-                        == str(value)
+                        ).label("vmetadata"),
+                    ).where(*where_clauses)
+                    if limit is not None:
+                        stmt = stmt.limit(limit)
+                    results = session.execute(stmt).all()
+                else:
+                    query = session.query(DocumentChunk).filter(
+                        DocumentChunk.collection_name == collection_name
                     )
-                stmt = select(
-                    DocumentChunk.id,
-                    pgcrypto_decrypt(
-                        DocumentChunk.text, PGVECTOR_PGCRYPTO_KEY, Text
-                    ).label("text"),
-                    pgcrypto_decrypt(
-                        DocumentChunk.vmetadata, PGVECTOR_PGCRYPTO_KEY, JSONB
-                    ).label("vmetadata"),
-                ).where(*where_clauses)
-                if limit is not None:
-                    stmt = stmt.limit(limit)
-                results = self.session.execute(stmt).all()
-            else:
-                query = self.session.query(DocumentChunk).filter(
-                    DocumentChunk.collection_name == collection_name
-                )
 
-                for key, value in filter.items():
-                    query = query.filter(
-                        DocumentChunk.vmetadata[key].astext == str(value)
-                    )
+                    for key, value in filter.items():
+                        query = query.filter(
+                            DocumentChunk.vmetadata[key].astext == str(value)
+                        )
 
-                if limit is not None:
-                    query = query.limit(limit)
+                    if limit is not None:
+                        query = query.limit(limit)
 
-                results = query.all()
+                    results = query.all()
 
-            if not results:
-                return None
+                if not results:
+                    return None
 
-            ids = [[result.id for result in results]]
-            documents = [[result.text for result in results]]
-            metadatas = [[result.vmetadata for result in results]]
+                ids = [[result.id for result in results]]
+                documents = [[result.text for result in results]]
+                metadatas = [[result.vmetadata for result in results]]
 
-            self.session.rollback()  # read-only transaction
-            return GetResult(
-                ids=ids,
-                documents=documents,
-                metadatas=metadatas,
-            )
-        except Exception as e:
-            self.session.rollback()
-            log.exception(f"Error during query: {e}")
-            return None
+                session.rollback()  # read-only transaction
+                return GetResult(
+                    ids=ids,
+                    documents=documents,
+                    metadatas=metadatas,
+                )
+            except Exception as e:
+                session.rollback()
+                log.exception(f"Error during query: {e}")
+                return None
 
     def get(
         self, collection_name: str, limit: Optional[int] = None
     ) -> Optional[GetResult]:
-        try:
-            if PGVECTOR_PGCRYPTO:
-                stmt = select(
-                    DocumentChunk.id,
-                    pgcrypto_decrypt(
-                        DocumentChunk.text, PGVECTOR_PGCRYPTO_KEY, Text
-                    ).label("text"),
-                    pgcrypto_decrypt(
-                        DocumentChunk.vmetadata, PGVECTOR_PGCRYPTO_KEY, JSONB
-                    ).label("vmetadata"),
-                ).where(DocumentChunk.collection_name == collection_name)
-                if limit is not None:
-                    stmt = stmt.limit(limit)
-                results = self.session.execute(stmt).all()
-                ids = [[row.id for row in results]]
-                documents = [[row.text for row in results]]
-                metadatas = [[row.vmetadata for row in results]]
-            else:
+        with self.get_session() as session:
+            try:
+                if PGVECTOR_PGCRYPTO:
+                    stmt = select(
+                        DocumentChunk.id,
+                        pgcrypto_decrypt(
+                            DocumentChunk.text, PGVECTOR_PGCRYPTO_KEY, Text
+                        ).label("text"),
+                        pgcrypto_decrypt(
+                            DocumentChunk.vmetadata, PGVECTOR_PGCRYPTO_KEY, JSONB
+                        ).label("vmetadata"),
+                    ).where(DocumentChunk.collection_name == collection_name)
+                    if limit is not None:
+                        stmt = stmt.limit(limit)
+                    results = session.execute(stmt).all()
+                    ids = [[row.id for row in results]]
+                    documents = [[row.text for row in results]]
+                    metadatas = [[row.vmetadata for row in results]]
+                else:
 
-                query = self.session.query(DocumentChunk).filter(
-                    DocumentChunk.collection_name == collection_name
-                )
-                if limit is not None:
-                    query = query.limit(limit)
+                    query = session.query(DocumentChunk).filter(
+                        DocumentChunk.collection_name == collection_name
+                    )
+                    if limit is not None:
+                        query = query.limit(limit)
 
-                results = query.all()
+                    results = query.all()
 
-                if not results:
-                    return None
+                    if not results:
+                        return None
 
-                ids = [[result.id for result in results]]
-                documents = [[result.text for result in results]]
-                metadatas = [[result.vmetadata for result in results]]
+                    ids = [[result.id for result in results]]
+                    documents = [[result.text for result in results]]
+                    metadatas = [[result.vmetadata for result in results]]
 
-            self.session.rollback()  # read-only transaction
-            return GetResult(ids=ids, documents=documents, metadatas=metadatas)
-        except Exception as e:
-            self.session.rollback()
-            log.exception(f"Error during get: {e}")
-            return None
+                session.rollback()  # read-only transaction
+                return GetResult(ids=ids, documents=documents, metadatas=metadatas)
+            except Exception as e:
+                session.rollback()
+                log.exception(f"Error during get: {e}")
+                return None
 
     def delete(
         self,
@@ -566,70 +655,77 @@ class PgvectorClient(VectorDBBase):
         ids: Optional[List[str]] = None,
         filter: Optional[Dict[str, Any]] = None,
     ) -> None:
-        try:
-            if PGVECTOR_PGCRYPTO:
-                wheres = [DocumentChunk.collection_name == collection_name]
-                if ids:
-                    wheres.append(DocumentChunk.id.in_(ids))
-                if filter:
-                    for key, value in filter.items():
-                        wheres.append(
-                            pgcrypto_decrypt(
-                                DocumentChunk.vmetadata, PGVECTOR_PGCRYPTO_KEY, JSONB
-                            )[key].astext
-                            == str(value)
-                        )
-                stmt = DocumentChunk.__table__.delete().where(*wheres)
-                result = self.session.execute(stmt)
-                deleted = result.rowcount
-            else:
-                query = self.session.query(DocumentChunk).filter(
-                    DocumentChunk.collection_name == collection_name
+        with self.get_session() as session:
+            try:
+                if PGVECTOR_PGCRYPTO:
+                    wheres = [DocumentChunk.collection_name == collection_name]
+                    if ids:
+                        wheres.append(DocumentChunk.id.in_(ids))
+                    if filter:
+                        for key, value in filter.items():
+                            wheres.append(
+                                pgcrypto_decrypt(
+                                    DocumentChunk.vmetadata,
+                                    PGVECTOR_PGCRYPTO_KEY,
+                                    JSONB,
+                                )[key].astext
+                                == str(value)
+                            )
+                    stmt = DocumentChunk.__table__.delete().where(*wheres)
+                    result = session.execute(stmt)
+                    deleted = result.rowcount
+                else:
+                    query = session.query(DocumentChunk).filter(
+                        DocumentChunk.collection_name == collection_name
+                    )
+                    if ids:
+                        query = query.filter(DocumentChunk.id.in_(ids))
+                    if filter:
+                        for key, value in filter.items():
+                            query = query.filter(
+                                DocumentChunk.vmetadata[key].astext == str(value)
+                            )
+                    deleted = query.delete(synchronize_session=False)
+                session.commit()
+                log.info(
+                    f"Deleted {deleted} items from collection '{collection_name}'."
                 )
-                if ids:
-                    query = query.filter(DocumentChunk.id.in_(ids))
-                if filter:
-                    for key, value in filter.items():
-                        query = query.filter(
-                            DocumentChunk.vmetadata[key].astext == str(value)
-                        )
-                deleted = query.delete(synchronize_session=False)
-            self.session.commit()
-            log.info(f"Deleted {deleted} items from collection '{collection_name}'.")
-        except Exception as e:
-            self.session.rollback()
-            log.exception(f"Error during delete: {e}")
-            raise
+            except Exception as e:
+                session.rollback()
+                log.exception(f"Error during delete: {e}")
+                raise
 
     def reset(self) -> None:
-        try:
-            deleted = self.session.query(DocumentChunk).delete()
-            self.session.commit()
-            log.info(
-                f"Reset complete. Deleted {deleted} items from 'document_chunk' table."
-            )
-        except Exception as e:
-            self.session.rollback()
-            log.exception(f"Error during reset: {e}")
-            raise
+        with self.get_session() as session:
+            try:
+                deleted = session.query(DocumentChunk).delete()
+                session.commit()
+                log.info(
+                    f"Reset complete. Deleted {deleted} items from 'document_chunk' table."
+                )
+            except Exception as e:
+                session.rollback()
+                log.exception(f"Error during reset: {e}")
+                raise
 
     def close(self) -> None:
         pass
 
     def has_collection(self, collection_name: str) -> bool:
-        try:
-            exists = (
-                self.session.query(DocumentChunk)
-                .filter(DocumentChunk.collection_name == collection_name)
-                .first()
-                is not None
-            )
-            self.session.rollback()  # read-only transaction
-            return exists
-        except Exception as e:
-            self.session.rollback()
-            log.exception(f"Error checking collection existence: {e}")
-            return False
+        with self.get_session() as session:
+            try:
+                exists = (
+                    session.query(DocumentChunk)
+                    .filter(DocumentChunk.collection_name == collection_name)
+                    .first()
+                    is not None
+                )
+                session.rollback()  # read-only transaction
+                return exists
+            except Exception as e:
+                session.rollback()
+                log.exception(f"Error checking collection existence: {e}")
+                return False
 
     def delete_collection(self, collection_name: str) -> None:
         self.delete(collection_name)
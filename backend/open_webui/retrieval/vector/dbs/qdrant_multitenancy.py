@@ -46,6 +46,8 @@ def _metadata_filter(key: str, value: Any) -> models.FieldCondition:
 
 
 class QdrantClient(VectorDBBase):
+    normalized_cosine_scores = True
+
     def __init__(self):
         self.collection_prefix = QDRANT_COLLECTION_PREFIX
         self.QDRANT_URI = QDRANT_URI
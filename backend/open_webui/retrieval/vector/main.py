@@ -31,6 +31,13 @@ class VectorDBBase(ABC):
     implement all abstract methods.
     """
 
+    # Set when search distances are cosine similarities mapped from [-1, 1]
+    # to [0, 1], which lets hybrid search reuse them instead of re-embedding
+    normalized_cosine_scores: bool = False
+
+    # Set when the backend implements search_collections with a single query
+    supports_multi_collection_search: bool = False
+
     @abstractmethod
     def has_collection(self, collection_name: str) -> bool:
         """Check if the collection exists in the vector DB."""
@@ -58,6 +65,18 @@ class VectorDBBase(ABC):
         """Search for similar vectors in a collection."""
         pass
 
+    def search_collections(
+        self,
+        collection_names: List[str],
+        vectors: List[List[Union[float, int]]],
+        limit: int,
+    ) -> Dict[str, Optional[SearchResult]]:
+        """Search for similar vectors in each of several collections."""
+        return {
+            collection_name: self.search(collection_name, vectors, limit)
+            for collection_name in collection_names
+        }
+
     @abstractmethod
     def query(
         self, collection_name: str, filter: Dict, limit: Optional[int] = None
@@ -1,12 +1,7 @@
-# TODO: Implement a more intelligent load balancing mechanism for distributing requests among multiple backend instances.
-# Current implementation uses a simple round-robin approach (random.choice). Consider incorporating algorithms like weighted round-robin,
-# least connections, or least response time for better resource utilization and performance optimization.
-
 import asyncio
 import json
 import logging
 import os
-import random
 import re
 import time
 from datetime import datetime
@@ -66,6 +61,8 @@ from open_webui.env import (
     BYPASS_MODEL_ACCESS_CONTROL,
 )
 from open_webui.constants import ERROR_MESSAGES
+from open_webui.utils.balancer import BACKEND_BALANCER
+from open_webui.utils.http_session import HTTP_SESSION_MANAGER
 
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["OLLAMA"])
@@ -81,26 +78,27 @@ log.setLevel(SRC_LOG_LEVELS["OLLAMA"])
 async def send_get_request(url, key=None, user: UserModel = None):
     timeout = aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT_MODEL_LIST)
     try:
-        async with aiohttp.ClientSession(timeout=timeout, trust_env=True) as session:
-            async with session.get(
-                url,
-                headers={
-                    "Content-Type": "application/json",
-                    **({"Authorization": f"Bearer {key}"} if key else {}),
-                    **(
-                        {
-                            "X-OpenWebUI-User-Name": quote(user.name, safe=" "),
-                            "X-OpenWebUI-User-Id": user.id,
-                            "X-OpenWebUI-User-Email": user.email,
-                            "X-OpenWebUI-User-Role": user.role,
-                        }
-                        if ENABLE_FORWARD_USER_INFO_HEADERS and user
-                        else {}
-                    ),
-                },
-                ssl=AIOHTTP_CLIENT_SESSION_SSL,
-            ) as response:
-                return await response.json()
+        session = HTTP_SESSION_MANAGER.get_session()
+        async with session.get(
+            url,
+            timeout=timeout,
+            headers={
+                "Content-Type": "application/json",
+                **({"Authorization": f"Bearer {key}"} if key else {}),
+                **(
+                    {
+                        "X-OpenWebUI-User-Name": quote(user.name, safe=" "),
+                        "X-OpenWebUI-User-Id": user.id,
+                        "X-OpenWebUI-User-Email": user.email,
+                        "X-OpenWebUI-User-Role": user.role,
+                    }
+                    if ENABLE_FORWARD_USER_INFO_HEADERS and user
+                    else {}
+                ),
+            },
+            ssl=AIOHTTP_CLIENT_SESSION_SSL,
+        ) as response:
+            return await response.json()
     except Exception as e:
         # Handle connection error here
         log.error(f"Connection error: {e}")
@@ -109,12 +107,14 @@ async def send_get_request(url, key=None, user: UserModel = None):
 
 async def cleanup_response(
     response: Optional[aiohttp.ClientResponse],
-    session: Optional[aiohttp.ClientSession],
+    backend_request=None,
 ):
     if response:
-        response.close()
-    if session:
-        await session.close()
+        # Returns the connection to the pool, it is closed instead if the
+        # response was not read to the end
+        response.release()
+    if backend_request:
+        backend_request.finish()
 
 
 async def send_post_request(
@@ -125,17 +125,22 @@ async def send_post_request(
     content_type: Optional[str] = None,
     user: UserModel = None,
     metadata: Optional[dict] = None,
+    url_idx: Optional[int] = None,
 ):
 
     r = None
-    try:
-        session = aiohttp.ClientSession(
-            trust_env=True, timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT)
-        )
+    streaming = False
 
+    # Tracked by the balancer when the connection was picked by it
+    backend_request = (
+        BACKEND_BALANCER.start("ollama", url_idx) if url_idx is not None else None
+    )
+    try:
+        session = HTTP_SESSION_MANAGER.get_session()
         r = await session.post(
             url,
             data=payload,
+            timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT),
             headers={
                 "Content-Type": "application/json",
                 **({"Authorization": f"Bearer {key}"} if key else {}),
@@ -157,11 +162,13 @@ async def send_post_request(
             },
             ssl=AIOHTTP_CLIENT_SESSION_SSL,
         )
+        if backend_request:
+            backend_request.record(r.status < 500)
 
         if r.ok is False:
             try:
                 res = await r.json()
-                await cleanup_response(r, session)
+                await cleanup_response(r, backend_request)
                 if "error" in res:
                     raise HTTPException(status_code=r.status, detail=res["error"])
             except HTTPException as e:
@@ -180,12 +187,13 @@ async def send_post_request(
             if content_type:
                 response_headers["Content-Type"] = content_type
 
+            streaming = True
             return StreamingResponse(
                 r.content,
                 status_code=r.status,
                 headers=response_headers,
                 background=BackgroundTask(
-                    cleanup_response, response=r, session=session
+                    cleanup_response, response=r, backend_request=backend_request
                 ),
             )
         else:
@@ -202,8 +210,70 @@ async def send_post_request(
             detail=detail if e else "Open WebUI: Server Connection Error",
         )
     finally:
-        if not stream:
-            await cleanup_response(r, session)
+        if not streaming:
+            await cleanup_response(r, backend_request)
+
+
+async def get_loaded_models_by_url_idx(request: Request) -> dict[int, set[str]]:
+    """
+    Returns the models loaded on each Ollama connection, as reported by
+    /api/ps, with the prefix ids of the connections applied.
+    """
+    url_idxs = []
+    request_tasks = []
+    for idx, url in enumerate(request.app.state.config.OLLAMA_BASE_URLS):
+        api_config = request.app.state.config.OLLAMA_API_CONFIGS.get(
+            str(idx),
+            request.app.state.config.OLLAMA_API_CONFIGS.get(url, {}),  # Legacy support
+        )
+        if not api_config.get("enable", True) or not BACKEND_BALANCER.is_available(
+            "ollama", idx
+        ):
+            continue
+
+        url_idxs.append(idx)
+        request_tasks.append(
+            send_get_request(f"{url}/api/ps", api_config.get("key", None))
+        )
+
+    loaded_models = {}
+    for idx, response in zip(url_idxs, await asyncio.gather(*request_tasks)):
+        if response is None:
+            continue
+
+        url = request.app.state.config.OLLAMA_BASE_URLS[idx]
+        prefix_id = request.app.state.config.OLLAMA_API_CONFIGS.get(
+            str(idx),
+            request.app.state.config.OLLAMA_API_CONFIGS.get(url, {}),  # Legacy support
+        ).get("prefix_id", None)
+
+        loaded_models[idx] = {
+            f"{prefix_id}.{model['model']}" if prefix_id else model["model"]
+            for model in response.get("models", [])
+        }
+    return loaded_models
+
+
+def get_ollama_url_idx(request: Request, model: str) -> int:
+    """
+    Picks the connection to send a request for `model` to, see
+    BackendBalancer for the strategies.
+    """
+    url_idxs = request.app.state.OLLAMA_MODELS[model].get("urls", [])
+
+    BACKEND_BALANCER.schedule_loaded_models_refresh(
+        "ollama", lambda: get_loaded_models_by_url_idx(request)
+    )
+
+    weights = {}
+    for idx in url_idxs:
+        url = request.app.state.config.OLLAMA_BASE_URLS[idx]
+        weights[idx] = request.app.state.config.OLLAMA_API_CONFIGS.get(
+            str(idx),
+            request.app.state.config.OLLAMA_API_CONFIGS.get(url, {}),  # Legacy support
+        ).get("weight", 1)
+
+    return BACKEND_BALANCER.select("ollama", url_idxs, weights=weights, model=model)
 
 
 def get_api_key(idx, url, configs):
@@ -443,15 +513,14 @@ async def get_all_models(request: Request, user: UserModel = None):
 
 async def get_filtered_models(models, user):
     # Filter models based on user access control
-    filtered_models = []
-    for model in models.get("models", []):
-        model_info = Models.get_model_by_id(model["model"])
-        if model_info:
-            if user.id == model_info.user_id or has_access(
-                user.id, type="read", access_control=model_info.access_control
-            ):
-                filtered_models.append(model)
-    return filtered_models
+    accessible_model_ids = Models.get_accessible_model_ids(
+        user.id, [model["model"] for model in models.get("models", [])]
+    )
+    return [
+        model
+        for model in models.get("models", [])
+        if model["model"] in accessible_model_ids
+    ]
 
 
 @router.get("/api/tags")
@@ -967,7 +1036,7 @@ async def show_model_info(
             detail=ERROR_MESSAGES.MODEL_NOT_FOUND(model),
         )
 
-    url_idx = random.choice(models[model]["urls"])
+    url_idx = get_ollama_url_idx(request, model)
 
     url = request.app.state.config.OLLAMA_BASE_URLS[url_idx]
     key = get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS)
@@ -1045,7 +1114,7 @@ async def embed(
             model = f"{model}:latest"
 
         if model in models:
-            url_idx = random.choice(models[model]["urls"])
+            url_idx = get_ollama_url_idx(request, model)
         else:
             raise HTTPException(
                 status_code=400,
@@ -1132,7 +1201,7 @@ async def embeddings(
             model = f"{model}:latest"
 
         if model in models:
-            url_idx = random.choice(models[model]["urls"])
+            url_idx = get_ollama_url_idx(request, model)
         else:
             raise HTTPException(
                 status_code=400,
@@ -1225,7 +1294,7 @@ async def generate_completion(
             model = f"{model}:latest"
 
         if model in models:
-            url_idx = random.choice(models[model]["urls"])
+            url_idx = get_ollama_url_idx(request, model)
         else:
             raise HTTPException(
                 status_code=400,
@@ -1247,6 +1316,7 @@ async def generate_completion(
         payload=form_data.model_dump_json(exclude_none=True).encode(),
         key=get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS),
         user=user,
+        url_idx=url_idx,
     )
 
 
@@ -1292,7 +1362,7 @@ async def get_ollama_url(request: Request, model: str, url_idx: Optional[int] =
                 status_code=400,
                 detail=ERROR_MESSAGES.MODEL_NOT_FOUND(model),
             )
-        url_idx = random.choice(models[model].get("urls", []))
+        url_idx = get_ollama_url_idx(request, model)
     url = request.app.state.config.OLLAMA_BASE_URLS[url_idx]
     return url, url_idx
 
@@ -1380,6 +1450,7 @@ async def generate_chat_completion(
         content_type="application/x-ndjson",
         user=user,
         metadata=metadata,
+        url_idx=url_idx,
     )
 
 
@@ -1486,6 +1557,7 @@ async def generate_openai_completion(
         key=get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS),
         user=user,
         metadata=metadata,
+        url_idx=url_idx,
     )
 
 
@@ -1568,6 +1640,7 @@ async def generate_openai_chat_completion(
         key=get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS),
         user=user,
         metadata=metadata,
+        url_idx=url_idx,
     )
 
 
@@ -49,6 +49,8 @@ from open_webui.utils.misc import (
 
 from open_webui.utils.auth import get_admin_user, get_verified_user
 from open_webui.utils.access_control import has_access
+from open_webui.utils.balancer import BACKEND_BALANCER
+from open_webui.utils.http_session import HTTP_SESSION_MANAGER
 
 
 log = logging.getLogger(__name__)
@@ -65,25 +67,26 @@ log.setLevel(SRC_LOG_LEVELS["OPENAI"])
 async def send_get_request(url, key=None, user: UserModel = None):
     timeout = aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT_MODEL_LIST)
     try:
-        async with aiohttp.ClientSession(timeout=timeout, trust_env=True) as session:
-            async with session.get(
-                url,
-                headers={
-                    **({"Authorization": f"Bearer {key}"} if key else {}),
-                    **(
-                        {
-                            "X-OpenWebUI-User-Name": quote(user.name, safe=" "),
-                            "X-OpenWebUI-User-Id": user.id,
-                            "X-OpenWebUI-User-Email": user.email,
-                            "X-OpenWebUI-User-Role": user.role,
-                        }
-                        if ENABLE_FORWARD_USER_INFO_HEADERS and user
-                        else {}
-                    ),
-                },
-                ssl=AIOHTTP_CLIENT_SESSION_SSL,
-            ) as response:
-                return await response.json()
+        session = HTTP_SESSION_MANAGER.get_session()
+        async with session.get(
+            url,
+            timeout=timeout,
+            headers={
+                **({"Authorization": f"Bearer {key}"} if key else {}),
+                **(
+                    {
+                        "X-OpenWebUI-User-Name": quote(user.name, safe=" "),
+                        "X-OpenWebUI-User-Id": user.id,
+                        "X-OpenWebUI-User-Email": user.email,
+                        "X-OpenWebUI-User-Role": user.role,
+                    }
+                    if ENABLE_FORWARD_USER_INFO_HEADERS and user
+                    else {}
+                ),
+            },
+            ssl=AIOHTTP_CLIENT_SESSION_SSL,
+        ) as response:
+            return await response.json()
     except Exception as e:
         # Handle connection error here
         log.error(f"Connection error: {e}")
@@ -92,12 +95,32 @@ async def send_get_request(url, key=None, user: UserModel = None):
 
 async def cleanup_response(
     response: Optional[aiohttp.ClientResponse],
-    session: Optional[aiohttp.ClientSession],
+    backend_request=None,
 ):
     if response:
-        response.close()
-    if session:
-        await session.close()
+        # Returns the connection to the pool, it is closed instead if the
+        # response was not read to the end
+        response.release()
+    if backend_request:
+        backend_request.finish()
+
+
+def get_openai_url_idx(request: Request, model: dict) -> int:
+    """
+    Picks the connection to send a request for `model` to when several
+    connections serve it, see BackendBalancer for the strategies.
+    """
+    url_idxs = model.get("urlIdxs", [model["urlIdx"]])
+
+    weights = {}
+    for idx in url_idxs:
+        url = request.app.state.config.OPENAI_API_BASE_URLS[idx]
+        weights[idx] = request.app.state.config.OPENAI_API_CONFIGS.get(
+            str(idx),
+            request.app.state.config.OPENAI_API_CONFIGS.get(url, {}),  # Legacy support
+        ).get("weight", 1)
+
+    return BACKEND_BALANCER.select("openai", url_idxs, weights=weights)
 
 
 def openai_reasoning_model_handler(payload):
@@ -471,15 +494,12 @@ async def get_all_models_responses(request: Request, user: UserModel) -> list:
 
 async def get_filtered_models(models, user):
     # Filter models based on user access control
-    filtered_models = []
-    for model in models.get("data", []):
-        model_info = Models.get_model_by_id(model["id"])
-        if model_info:
-            if user.id == model_info.user_id or has_access(
-                user.id, type="read", access_control=model_info.access_control
-            ):
-                filtered_models.append(model)
-    return filtered_models
+    accessible_model_ids = Models.get_accessible_model_ids(
+        user.id, [model["id"] for model in models.get("data", [])]
+    )
+    return [
+        model for model in models.get("data", []) if model["id"] in accessible_model_ids
+    ]
 
 
 @cached(
@@ -541,7 +561,11 @@ async def get_all_models(request: Request, user: UserModel) -> dict[str, list]:
                             "openai": model,
                             "connection_type": model.get("connection_type", "external"),
                             "urlIdx": idx,
+                            "urlIdxs": [idx],
                         }
+                    elif model_id:
+                        # Served by several connections, balanced between them
+                        models[model_id]["urlIdxs"].append(idx)
 
         return models
 
@@ -860,7 +884,7 @@ async def generate_chat_completion(
     await get_all_models(request, user=user)
     model = request.app.state.OPENAI_MODELS.get(model_id)
     if model:
-        idx = model["urlIdx"]
+        idx = get_openai_url_idx(request, model)
     else:
         raise HTTPException(
             status_code=404,
@@ -930,23 +954,22 @@ async def generate_chat_completion(
     payload = json.dumps(payload)
 
     r = None
-    session = None
     streaming = False
     response = None
 
+    backend_request = BACKEND_BALANCER.start("openai", idx)
     try:
-        session = aiohttp.ClientSession(
-            trust_env=True, timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT)
-        )
-
+        session = HTTP_SESSION_MANAGER.get_session()
         r = await session.request(
             method="POST",
             url=request_url,
             data=payload,
+            timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT),
             headers=headers,
             cookies=cookies,
             ssl=AIOHTTP_CLIENT_SESSION_SSL,
         )
+        backend_request.record(r.status < 500)
 
         # Check if response is SSE
         if "text/event-stream" in r.headers.get("Content-Type", ""):
@@ -956,7 +979,7 @@ async def generate_chat_completion(
                 status_code=r.status,
                 headers=dict(r.headers),
                 background=BackgroundTask(
-                    cleanup_response, response=r, session=session
+                    cleanup_response, response=r, backend_request=backend_request
                 ),
             )
         else:
@@ -982,7 +1005,7 @@ async def generate_chat_completion(
         )
     finally:
         if not streaming:
-            await cleanup_response(r, session)
+            await cleanup_response(r, backend_request)
 
 
 async def embeddings(request: Request, form_data: dict, user):
@@ -1005,7 +1028,7 @@ async def embeddings(request: Request, form_data: dict, user):
     model_id = form_data.get("model")
     models = request.app.state.OPENAI_MODELS
     if model_id in models:
-        idx = models[model_id]["urlIdx"]
+        idx = get_openai_url_idx(request, models[model_id])
 
     url = request.app.state.config.OPENAI_API_BASE_URLS[idx]
     key = request.app.state.config.OPENAI_API_KEYS[idx]
@@ -1015,14 +1038,15 @@ async def embeddings(request: Request, form_data: dict, user):
     )
 
     r = None
-    session = None
     streaming = False
 
     headers, cookies = await get_headers_and_cookies(
         request, url, key, api_config, user=user
     )
+
+    backend_request = BACKEND_BALANCER.start("openai", idx)
     try:
-        session = aiohttp.ClientSession(trust_env=True)
+        session = HTTP_SESSION_MANAGER.get_session()
         r = await session.request(
             method="POST",
             url=f"{url}/embeddings",
@@ -1030,6 +1054,7 @@ async def embeddings(request: Request, form_data: dict, user):
             headers=headers,
             cookies=cookies,
         )
+        backend_request.record(r.status < 500)
 
         if "text/event-stream" in r.headers.get("Content-Type", ""):
             streaming = True
@@ -1038,7 +1063,7 @@ async def embeddings(request: Request, form_data: dict, user):
                 status_code=r.status,
                 headers=dict(r.headers),
                 background=BackgroundTask(
-                    cleanup_response, response=r, session=session
+                    cleanup_response, response=r, backend_request=backend_request
                 ),
             )
         else:
@@ -1064,7 +1089,7 @@ async def embeddings(request: Request, form_data: dict, user):
         )
     finally:
         if not streaming:
-            await cleanup_response(r, session)
+            await cleanup_response(r, backend_request)
 
 
 @router.api_route("/{path:path}", methods=["GET", "POST", "PUT", "DELETE"])
@@ -1086,7 +1111,6 @@ async def proxy(path: str, request: Request, user=Depends(get_verified_user)):
     )
 
     r = None
-    session = None
     streaming = False
 
     try:
@@ -1112,7 +1136,7 @@ async def proxy(path: str, request: Request, user=Depends(get_verified_user)):
         else:
             request_url = f"{url}/{path}"
 
-        session = aiohttp.ClientSession(trust_env=True)
+        session = HTTP_SESSION_MANAGER.get_session()
         r = await session.request(
             method=request.method,
             url=request_url,
@@ -1129,9 +1153,7 @@ async def proxy(path: str, request: Request, user=Depends(get_verified_user)):
                 r.content,
                 status_code=r.status,
                 headers=dict(r.headers),
-                background=BackgroundTask(
-                    cleanup_response, response=r, session=session
-                ),
+                background=BackgroundTask(cleanup_response, response=r),
             )
         else:
             try:
@@ -1157,4 +1179,4 @@ async def proxy(path: str, request: Request, user=Depends(get_verified_user)):
         )
     finally:
         if not streaming:
-            await cleanup_response(r, session)
+            await cleanup_response(r)
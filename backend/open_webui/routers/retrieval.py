@@ -8,8 +8,9 @@ import asyncio
 import re
 import uuid
 from datetime import datetime
+from itertools import chain
 from pathlib import Path
-from typing import Iterator, List, Optional, Sequence, Union
+from typing import Callable, Iterator, List, Optional, Sequence, Union
 
 from fastapi import (
     Depends,
@@ -38,10 +39,17 @@ from open_webui.storage.provider import Storage
 
 
 from open_webui.retrieval.vector.factory import VECTOR_DB_CLIENT
+from open_webui.retrieval.bm25 import BM25_INDEX
+from open_webui.retrieval.embedding_cache import EMBEDDING_CACHE
+from open_webui.retrieval.extraction_cache import (
+    EXTRACTION_CACHE,
+    get_extraction_cache_key,
+)
 
 # Document loaders
 from open_webui.retrieval.loaders.main import Loader
 from open_webui.retrieval.loaders.youtube import YoutubeLoader
+from open_webui.retrieval.pipeline import run_pipeline
 
 # Web search engines
 from open_webui.retrieval.web.main import SearchResult
@@ -82,6 +90,7 @@ from open_webui.retrieval.utils import (
 )
 from open_webui.retrieval.vector.utils import filter_metadata
 from open_webui.utils.misc import (
+    calculate_sha256,
     calculate_sha256_string,
 )
 from open_webui.utils.auth import get_admin_user, get_verified_user
@@ -96,6 +105,8 @@ from open_webui.config import (
     DEFAULT_LOCALE,
     RAG_EMBEDDING_CONTENT_PREFIX,
     RAG_EMBEDDING_QUERY_PREFIX,
+    RAG_INGEST_BATCH_SIZE,
+    RAG_INGEST_QUEUE_SIZE,
 )
 from open_webui.env import (
     SRC_LOG_LEVELS,
@@ -273,6 +284,40 @@ async def get_embedding_config(request: Request, user=Depends(get_admin_user)):
     }
 
 
+@router.get("/embedding/cache")
+async def get_embedding_cache_stats(user=Depends(get_admin_user)):
+    if EMBEDDING_CACHE is None:
+        return {"status": False}
+
+    return {"status": True, **EMBEDDING_CACHE.get_stats()}
+
+
+@router.post("/embedding/cache/reset")
+async def reset_embedding_cache(user=Depends(get_admin_user)):
+    if EMBEDDING_CACHE is None:
+        return {"status": False}
+
+    EMBEDDING_CACHE.clear()
+    return {"status": True}
+
+
+@router.get("/extraction/cache")
+async def get_extraction_cache_stats(user=Depends(get_admin_user)):
+    if EXTRACTION_CACHE is None:
+        return {"status": False}
+
+    return {"status": True, **EXTRACTION_CACHE.get_stats()}
+
+
+@router.post("/extraction/cache/reset")
+async def reset_extraction_cache(user=Depends(get_admin_user)):
+    if EXTRACTION_CACHE is None:
+        return {"status": False}
+
+    EXTRACTION_CACHE.clear()
+    return {"status": True}
+
+
 class OpenAIConfigForm(BaseModel):
     url: str
     key: str
@@ -1280,6 +1325,107 @@ async def update_rag_config(
 ####################################
 
 
+def get_document_splitter(request: Request) -> Callable[[Document], list[Document]]:
+    """
+    Returns a function splitting a document into chunks with the configured
+    text splitter.
+    """
+    if request.app.state.config.TEXT_SPLITTER in ["", "character"]:
+        text_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=request.app.state.config.CHUNK_SIZE,
+            chunk_overlap=request.app.state.config.CHUNK_OVERLAP,
+            add_start_index=True,
+        )
+        return lambda doc: text_splitter.split_documents([doc])
+    elif request.app.state.config.TEXT_SPLITTER == "token":
+        log.info(
+            f"Using token text splitter: {request.app.state.config.TIKTOKEN_ENCODING_NAME}"
+        )
+
+        tiktoken.get_encoding(str(request.app.state.config.TIKTOKEN_ENCODING_NAME))
+        text_splitter = TokenTextSplitter(
+            encoding_name=str(request.app.state.config.TIKTOKEN_ENCODING_NAME),
+            chunk_size=request.app.state.config.CHUNK_SIZE,
+            chunk_overlap=request.app.state.config.CHUNK_OVERLAP,
+            add_start_index=True,
+        )
+        return lambda doc: text_splitter.split_documents([doc])
+    elif request.app.state.config.TEXT_SPLITTER == "markdown_header":
+        log.info("Using markdown header text splitter")
+
+        # Define headers to split on - covering most common markdown header levels
+        headers_to_split_on = [
+            ("#", "Header 1"),
+            ("##", "Header 2"),
+            ("###", "Header 3"),
+            ("####", "Header 4"),
+            ("#####", "Header 5"),
+            ("######", "Header 6"),
+        ]
+
+        markdown_splitter = MarkdownHeaderTextSplitter(
+            headers_to_split_on=headers_to_split_on,
+            strip_headers=False,  # Keep headers in content for context
+        )
+        text_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=request.app.state.config.CHUNK_SIZE,
+            chunk_overlap=request.app.state.config.CHUNK_OVERLAP,
+            add_start_index=True,
+        )
+
+        def split_markdown(doc: Document) -> list[Document]:
+            md_split_docs = []
+
+            md_header_splits = markdown_splitter.split_text(doc.page_content)
+            md_header_splits = text_splitter.split_documents(md_header_splits)
+
+            # Convert back to Document objects, preserving original metadata
+            for split_chunk in md_header_splits:
+                headings_list = []
+                # Extract header values in order based on headers_to_split_on
+                for _, header_meta_key_name in headers_to_split_on:
+                    if header_meta_key_name in split_chunk.metadata:
+                        headings_list.append(split_chunk.metadata[header_meta_key_name])
+
+                md_split_docs.append(
+                    Document(
+                        page_content=split_chunk.page_content,
+                        metadata={**doc.metadata, "headings": headings_list},
+                    )
+                )
+
+            return md_split_docs
+
+        return split_markdown
+    else:
+        raise ValueError(ERROR_MESSAGES.DEFAULT("Invalid text splitter"))
+
+
+def get_ingest_id(
+    request: Request, collection_name: str, hash: str, split: bool
+) -> str:
+    """
+    Identifies the chunks of a document in a collection. The chunks are only
+    the same, and a failed ingest can only be resumed, with the same
+    splitter and embedding settings.
+    """
+    return calculate_sha256_string(
+        json.dumps(
+            [
+                collection_name,
+                hash,
+                split,
+                request.app.state.config.TEXT_SPLITTER,
+                request.app.state.config.CHUNK_SIZE,
+                request.app.state.config.CHUNK_OVERLAP,
+                str(request.app.state.config.TIKTOKEN_ENCODING_NAME),
+                request.app.state.config.RAG_EMBEDDING_ENGINE,
+                request.app.state.config.RAG_EMBEDDING_MODEL,
+            ]
+        )
+    )
+
+
 def save_docs_to_vector_db(
     request: Request,
     docs,
@@ -1289,7 +1435,26 @@ def save_docs_to_vector_db(
     split: bool = True,
     add: bool = False,
     user=None,
+    resumable: bool = False,
+    checkpoint: Optional[dict] = None,
+    on_progress: Optional[Callable[[dict], None]] = None,
 ) -> bool:
+    """
+    Splits, embeds and inserts the documents in batches of
+    RAG_INGEST_BATCH_SIZE chunks, the three steps running concurrently.
+
+    `docs` can be any iterable, a lazy loader is read as the batches are
+    split, without holding the whole document.
+
+    Before the first and after every inserted batch `on_progress` is called
+    with a checkpoint of the ingest. A failed ingest is rolled back, unless
+    it is `resumable` and the documents have a `hash` in `metadata`: the
+    chunks inserted so far are then kept, and passing the last checkpoint
+    back as `checkpoint` resumes the ingest after them. Only collections that
+    hold nothing but the document, and are not searched while the ingest is
+    incomplete (like the collection of a single file), should be resumable.
+    """
+
     def _get_docs_info(docs: list[Document]) -> str:
         docs_info = set()
 
@@ -1306,12 +1471,43 @@ def save_docs_to_vector_db(
 
         return ", ".join(docs_info)
 
-    log.info(
-        f"save_docs_to_vector_db: document {_get_docs_info(docs)} {collection_name}"
+    # A lazy iterable is only read once, by the splitter
+    docs_info = (
+        _get_docs_info(docs)
+        if isinstance(docs, list)
+        else (metadata or {}).get("name", "")
     )
+    log.info(f"save_docs_to_vector_db: document {docs_info} {collection_name}")
+
+    split_doc = get_document_splitter(request) if split else lambda doc: [doc]
+
+    has_collection = VECTOR_DB_CLIENT.has_collection(collection_name=collection_name)
+
+    ingest_id = None
+    resuming = False
+    resume_from = 0
+    if resumable and metadata and "hash" in metadata:
+        ingest_id = get_ingest_id(request, collection_name, metadata["hash"], split)
+
+        if checkpoint:
+            if checkpoint.get("id") == ingest_id and has_collection:
+                # The checkpoint is written before the first insert, the
+                # batch after it may be partly inserted even at 0 chunks
+                resuming = True
+                resume_from = checkpoint.get("done") or 0
+                log.info(
+                    f"resuming ingest of {metadata['hash']} in {collection_name} after {resume_from} chunks"
+                )
+            elif has_collection:
+                # The collection only holds the ingest that can not be
+                # resumed, it is ingested again from scratch
+                log.info(f"removing the failed ingest into {collection_name}")
+                VECTOR_DB_CLIENT.delete_collection(collection_name=collection_name)
+                BM25_INDEX.delete_collection(collection_name)
+                has_collection = False
 
     # Check if entries with the same hash (metadata.hash) already exist
-    if metadata and "hash" in metadata:
+    if metadata and "hash" in metadata and not resuming:
         result = VECTOR_DB_CLIENT.query(
             collection_name=collection_name,
             filter={"hash": metadata["hash"]},
@@ -1323,98 +1519,62 @@ def save_docs_to_vector_db(
                 log.info(f"Document with hash {metadata['hash']} already exists")
                 raise ValueError(ERROR_MESSAGES.DUPLICATE_CONTENT)
 
-    if split:
-        if request.app.state.config.TEXT_SPLITTER in ["", "character"]:
-            text_splitter = RecursiveCharacterTextSplitter(
-                chunk_size=request.app.state.config.CHUNK_SIZE,
-                chunk_overlap=request.app.state.config.CHUNK_OVERLAP,
-                add_start_index=True,
-            )
-            docs = text_splitter.split_documents(docs)
-        elif request.app.state.config.TEXT_SPLITTER == "token":
-            log.info(
-                f"Using token text splitter: {request.app.state.config.TIKTOKEN_ENCODING_NAME}"
-            )
-
-            tiktoken.get_encoding(str(request.app.state.config.TIKTOKEN_ENCODING_NAME))
-            text_splitter = TokenTextSplitter(
-                encoding_name=str(request.app.state.config.TIKTOKEN_ENCODING_NAME),
-                chunk_size=request.app.state.config.CHUNK_SIZE,
-                chunk_overlap=request.app.state.config.CHUNK_OVERLAP,
-                add_start_index=True,
-            )
-            docs = text_splitter.split_documents(docs)
-        elif request.app.state.config.TEXT_SPLITTER == "markdown_header":
-            log.info("Using markdown header text splitter")
-
-            # Define headers to split on - covering most common markdown header levels
-            headers_to_split_on = [
-                ("#", "Header 1"),
-                ("##", "Header 2"),
-                ("###", "Header 3"),
-                ("####", "Header 4"),
-                ("#####", "Header 5"),
-                ("######", "Header 6"),
-            ]
-
-            markdown_splitter = MarkdownHeaderTextSplitter(
-                headers_to_split_on=headers_to_split_on,
-                strip_headers=False,  # Keep headers in content for context
-            )
-
-            md_split_docs = []
-            for doc in docs:
-                md_header_splits = markdown_splitter.split_text(doc.page_content)
-                text_splitter = RecursiveCharacterTextSplitter(
-                    chunk_size=request.app.state.config.CHUNK_SIZE,
-                    chunk_overlap=request.app.state.config.CHUNK_OVERLAP,
-                    add_start_index=True,
-                )
-                md_header_splits = text_splitter.split_documents(md_header_splits)
-
-                # Convert back to Document objects, preserving original metadata
-                for split_chunk in md_header_splits:
-                    headings_list = []
-                    # Extract header values in order based on headers_to_split_on
-                    for _, header_meta_key_name in headers_to_split_on:
-                        if header_meta_key_name in split_chunk.metadata:
-                            headings_list.append(
-                                split_chunk.metadata[header_meta_key_name]
-                            )
-
-                    md_split_docs.append(
-                        Document(
-                            page_content=split_chunk.page_content,
-                            metadata={**doc.metadata, "headings": headings_list},
-                        )
-                    )
-
-            docs = md_split_docs
-        else:
-            raise ValueError(ERROR_MESSAGES.DEFAULT("Invalid text splitter"))
+    state = {"total": None}
 
-    if len(docs) == 0:
+    def get_batches() -> Iterator[list[tuple[int, Document]]]:
+        idx = 0
+        batch = []
+        for doc in docs:
+            for chunk in split_doc(doc):
+                if idx >= resume_from:
+                    batch.append((idx, chunk))
+                    if len(batch) >= RAG_INGEST_BATCH_SIZE:
+                        yield batch
+                        batch = []
+                idx += 1
+
+        state["total"] = idx
+        if batch:
+            yield batch
+
+    # Split up to the first batch before touching the collection
+    batches = get_batches()
+    first_batch = next(batches, None)
+
+    if first_batch is None and not state["total"]:
         raise ValueError(ERROR_MESSAGES.EMPTY_CONTENT)
 
-    texts = [doc.page_content for doc in docs]
-    metadatas = [
-        {
-            **doc.metadata,
-            **(metadata if metadata else {}),
-            "embedding_config": {
-                "engine": request.app.state.config.RAG_EMBEDDING_ENGINE,
-                "model": request.app.state.config.RAG_EMBEDDING_MODEL,
-            },
-        }
-        for doc in docs
-    ]
+    embedding_config = {
+        "engine": request.app.state.config.RAG_EMBEDDING_ENGINE,
+        "model": request.app.state.config.RAG_EMBEDDING_MODEL,
+    }
 
+    def get_chunk_id(idx: int) -> str:
+        if ingest_id:
+            return str(uuid.uuid5(uuid.NAMESPACE_URL, f"{ingest_id}:{idx}"))
+        return str(uuid.uuid4())
+
+    def report_progress(done: int):
+        if on_progress:
+            on_progress(
+                {
+                    "id": ingest_id,
+                    "collection_name": collection_name,
+                    "hash": metadata.get("hash") if metadata else None,
+                    "done": done,
+                    "total": state["total"],
+                }
+            )
+
+    inserted_ids = []
     try:
-        if VECTOR_DB_CLIENT.has_collection(collection_name=collection_name):
+        if has_collection and not resuming:
             log.info(f"collection {collection_name} already exists")
 
             if overwrite:
                 VECTOR_DB_CLIENT.delete_collection(collection_name=collection_name)
+                BM25_INDEX.delete_collection(collection_name)
+                has_collection = False
                 log.info(f"deleting existing collection {collection_name}")
             elif add is False:
                 log.info(
@@ -1422,6 +1582,9 @@ def save_docs_to_vector_db(
                 )
                 return True
 
+        if not has_collection:
+            BM25_INDEX.create(collection_name)
+
         log.info(f"generating embeddings for {collection_name}")
         embedding_function = get_embedding_function(
             request.app.state.config.RAG_EMBEDDING_ENGINE,
@@ -1453,33 +1616,74 @@ def save_docs_to_vector_db(
             ),
         )
 
-        embeddings = embedding_function(
-            list(map(lambda x: x.replace("\n", " "), texts)),
-            prefix=RAG_EMBEDDING_CONTENT_PREFIX,
-            user=user,
-        )
-        log.info(f"embeddings generated {len(embeddings)} for {len(texts)} items")
-
-        items = [
-            {
-                "id": str(uuid.uuid4()),
-                "text": text,
-                "vector": embeddings[idx],
-                "metadata": metadatas[idx],
-            }
-            for idx, text in enumerate(texts)
-        ]
+        def embed(batch: list[tuple[int, Document]]) -> list[dict]:
+            embeddings = embedding_function(
+                [chunk.page_content.replace("\n", " ") for _, chunk in batch],
+                prefix=RAG_EMBEDDING_CONTENT_PREFIX,
+                user=user,
+            )
 
-        log.info(f"adding to collection {collection_name}")
-        VECTOR_DB_CLIENT.insert(
-            collection_name=collection_name,
-            items=items,
-        )
+            return [
+                {
+                    "id": get_chunk_id(idx),
+                    "text": chunk.page_content,
+                    "vector": embeddings[batch_idx],
+                    "metadata": {
+                        **chunk.metadata,
+                        **(metadata if metadata else {}),
+                        "embedding_config": embedding_config,
+                    },
+                }
+                for batch_idx, (idx, chunk) in enumerate(batch)
+            ]
+
+        rf = getattr(request.app.state, "rf", None)
+
+        done = resume_from
+        report_progress(done)
+        for items in run_pipeline(
+            chain([first_batch] if first_batch else [], batches),
+            [embed],
+            queue_size=RAG_INGEST_QUEUE_SIZE,
+        ):
+            ids = [item["id"] for item in items]
+
+            if done == resume_from and resuming:
+                # The failed ingest may have inserted part of this batch
+                VECTOR_DB_CLIENT.upsert(collection_name=collection_name, items=items)
+                BM25_INDEX.delete(collection_name, ids=ids)
+            else:
+                VECTOR_DB_CLIENT.insert(collection_name=collection_name, items=items)
+            if not ingest_id:
+                inserted_ids.extend(ids)
+
+            BM25_INDEX.insert(collection_name, items)
 
-        log.info(f"added {len(items)} items to collection {collection_name}")
+            # Compute the ColBERT token embeddings of the chunks now, so
+            # reranking only has to encode the query
+            if hasattr(rf, "cache_documents"):
+                try:
+                    rf.cache_documents([item["text"] for item in items])
+                except Exception as e:
+                    log.warning(f"Failed to cache the ColBERT document embeddings: {e}")
+
+            done += len(items)
+            report_progress(done)
+
+        log.info(f"added {done - resume_from} items to collection {collection_name}")
         return True
     except Exception as e:
         log.exception(e)
+        if inserted_ids:
+            try:
+                VECTOR_DB_CLIENT.delete(
+                    collection_name=collection_name, ids=inserted_ids
+                )
+                BM25_INDEX.delete(collection_name, ids=inserted_ids)
+            except Exception as rollback_error:
+                log.warning(
+                    f"Failed to roll back the ingest into {collection_name}: {rollback_error}"
+                )
         raise e
 
 
@@ -1508,6 +1712,11 @@ def process_file(
             if collection_name is None:
                 collection_name = f"file-{file.id}"
 
+            # Set by the branches that hold the whole text, the others stream
+            # the documents and collect the text as they are ingested
+            text_content = None
+            text_parts = []
+
             if form_data.content:
                 # Update the content in the file
                 # Usage: /files/{file_id}/data/content/update, /files/ (audio file upload pipeline)
@@ -1517,6 +1726,7 @@ def process_file(
                     VECTOR_DB_CLIENT.delete_collection(
                         collection_name=f"file-{file.id}"
                     )
+                    BM25_INDEX.delete_collection(f"file-{file.id}")
                 except:
                     # Audio file upload pipeline
                     pass
@@ -1539,6 +1749,10 @@ def process_file(
                 # Check if the file has already been processed and save the content
                 # Usage: /knowledge/{id}/file/add, /knowledge/{id}/file/update
 
+                if (file.data or {}).get("ingest"):
+                    # The file's own collection only holds part of it
+                    raise ValueError(ERROR_MESSAGES.FILE_NOT_PROCESSED)
+
                 result = VECTOR_DB_CLIENT.query(
                     collection_name=f"file-{file.id}", filter={"file_id": file.id}
                 )
@@ -1614,23 +1828,74 @@ def process_file(
                         MINERU_API_KEY=request.app.state.config.MINERU_API_KEY,
                         MINERU_PARAMS=request.app.state.config.MINERU_PARAMS,
                     )
-                    docs = loader.load(
-                        file.filename, file.meta.get("content_type"), file_path
-                    )
 
-                    docs = [
-                        Document(
-                            page_content=doc.page_content,
-                            metadata={
-                                **filter_metadata(doc.metadata),
-                                "name": file.filename,
-                                "created_by": file.user_id,
-                                "file_id": file.id,
-                                "source": file.filename,
+                    def on_progress(done: int, total: int):
+                        Files.update_file_data_by_id(
+                            file.id,
+                            {
+                                "progress": {
+                                    "stage": "extraction",
+                                    "done": done,
+                                    "total": total,
+                                }
                             },
                         )
-                        for doc in docs
-                    ]
+
+                    # The text, and its hash, are only known once the file
+                    # is extracted. Until then the key of the extraction
+                    # identifies the documents, to resume a failed ingest.
+                    ingest_hash = get_extraction_cache_key(
+                        calculate_sha256(file_path, 1024 * 1024),
+                        file.filename,
+                        file.meta.get("content_type"),
+                        loader.engine,
+                        loader.kwargs,
+                    )
+
+                    cached_docs = None
+                    if EXTRACTION_CACHE is not None:
+                        cached_docs = EXTRACTION_CACHE.get(ingest_hash)
+                        if cached_docs is not None:
+                            log.info(f"Using cached extraction of {file.filename}")
+
+                    def get_docs() -> Iterator[Document]:
+                        # The pages are split and embedded as they are
+                        # extracted, only the extraction cache needs them all
+                        loaded = None
+                        if cached_docs is not None:
+                            extracted = cached_docs
+                        else:
+                            extracted = loader.lazy_load(
+                                file.filename,
+                                file.meta.get("content_type"),
+                                file_path,
+                                on_progress=on_progress,
+                            )
+                            if EXTRACTION_CACHE is not None:
+                                loaded = []
+
+                        for doc in extracted:
+                            if loaded is not None:
+                                loaded.append(doc)
+                            text_parts.append(doc.page_content)
+
+                            yield Document(
+                                page_content=doc.page_content,
+                                metadata={
+                                    **filter_metadata(doc.metadata),
+                                    "name": file.filename,
+                                    "created_by": file.user_id,
+                                    "file_id": file.id,
+                                    "source": file.filename,
+                                },
+                            )
+
+                        # Empty results are not cached, they are usually an
+                        # engine failing to read the file
+                        if loaded and any(doc.page_content.strip() for doc in loaded):
+                            EXTRACTION_CACHE.set(ingest_hash, loaded)
+
+                    docs = get_docs()
                 else:
                     docs = [
                         Document(
@@ -1644,17 +1909,26 @@ def process_file(
                             },
                         )
                     ]
-                text_content = " ".join([doc.page_content for doc in docs])
+                    text_content = " ".join([doc.page_content for doc in docs])
 
-            log.debug(f"text_content: {text_content}")
-            Files.update_file_data_by_id(
-                file.id,
-                {"content": text_content},
-            )
-            hash = calculate_sha256_string(text_content)
-            Files.update_file_hash_by_id(file.id, hash)
+            def save_text_content(text_content: str) -> str:
+                log.debug(f"text_content: {text_content}")
+                Files.update_file_data_by_id(
+                    file.id,
+                    {"content": text_content},
+                )
+                hash = calculate_sha256_string(text_content)
+                Files.update_file_hash_by_id(file.id, hash)
+                return hash
+
+            if text_content is not None:
+                ingest_hash = save_text_content(text_content)
 
             if request.app.state.config.BYPASS_EMBEDDING_AND_RETRIEVAL:
+                if text_content is None:
+                    text_content = " ".join([doc.page_content for doc in docs])
+                    save_text_content(text_content)
+
                 Files.update_file_data_by_id(file.id, {"status": "completed"})
                 return {
                     "status": True,
@@ -1664,6 +1938,25 @@ def process_file(
                 }
             else:
                 try:
+
+                    # Only the file's own collection keeps a partial ingest
+                    # for a retry, a failed ingest into a knowledge base is
+                    # rolled back
+                    resumable = form_data.collection_name is None
+
+                    def on_ingest_progress(checkpoint: dict):
+                        Files.update_file_data_by_id(
+                            file.id,
+                            {
+                                **({"ingest": checkpoint} if resumable else {}),
+                                "progress": {
+                                    "stage": "embedding",
+                                    "done": checkpoint["done"],
+                                    "total": checkpoint["total"],
+                                },
+                            },
+                        )
+
                     result = save_docs_to_vector_db(
                         request,
                         docs=docs,
@@ -1671,14 +1964,22 @@ def process_file(
                         metadata={
                             "file_id": file.id,
                             "name": file.filename,
-                            "hash": hash,
+                            "hash": ingest_hash,
                         },
                         add=(True if form_data.collection_name else False),
                         user=user,
+                        resumable=resumable,
+                        checkpoint=(
+                            (file.data or {}).get("ingest") if resumable else None
+                        ),
+                        on_progress=on_ingest_progress,
                     )
-                    log.info(f"added {len(docs)} items to collection {collection_name}")
 
                     if result:
+                        if text_content is None:
+                            text_content = " ".join(text_parts)
+                            save_text_content(text_content)
+
                         Files.update_file_metadata_by_id(
                             file.id,
                             {
@@ -1688,7 +1989,7 @@ def process_file(
 
                         Files.update_file_data_by_id(
                             file.id,
-                            {"status": "completed"},
+                            {"status": "completed", "ingest": None},
                         )
 
                         return {
@@ -2374,6 +2675,7 @@ def delete_entries_from_collection(form_data: DeleteForm, user=Depends(get_admin
                 collection_name=form_data.collection_name,
                 metadata={"hash": hash},
             )
+            BM25_INDEX.delete(form_data.collection_name, filter={"hash": hash})
             return {"status": True}
         else:
             return {"status": False}
@@ -2385,6 +2687,7 @@ def delete_entries_from_collection(form_data: DeleteForm, user=Depends(get_admin
 @router.post("/reset/db")
 def reset_vector_db(user=Depends(get_admin_user)):
     VECTOR_DB_CLIENT.reset()
+    BM25_INDEX.reset()
     Knowledges.delete_all_knowledge()
 
 
@@ -1,7 +1,11 @@
 import json
 import uuid
 from open_webui.utils.redis import get_redis_connection
-from open_webui.env import REDIS_KEY_PREFIX
+from open_webui.env import (
+    REDIS_KEY_PREFIX,
+    YDOC_COMPACTION_MAX_UPDATES,
+    YDOC_COMPACTION_MAX_BYTES,
+)
 from typing import Optional, List, Tuple
 import pycrdt as Y
 
@@ -109,44 +113,149 @@ class RedisDict:
 
 
 class YdocManager:
+    """
+    Keeps the Yjs updates of the collaborative documents, in Redis when it
+    is configured. Updates are stored as raw bytes in an update log. Once the
+    log passes `compaction_max_updates` updates or `compaction_max_bytes`
+    bytes it is merged into the document snapshot, so loading a document
+    costs the same no matter how long it has been edited.
+    """
+
     def __init__(
         self,
         redis=None,
         redis_key_prefix: str = f"{REDIS_KEY_PREFIX}:ydoc:documents",
+        redis_binary=None,
+        compaction_max_updates: int = YDOC_COMPACTION_MAX_UPDATES,
+        compaction_max_bytes: int = YDOC_COMPACTION_MAX_BYTES,
     ):
+        self._snapshots = {}
         self._updates = {}
+        self._update_sizes = {}
         self._users = {}
         self._redis = redis
+        # Connection without decode_responses for the binary updates
+        self._redis_binary = redis_binary
         self._redis_key_prefix = redis_key_prefix
+        self._compaction_max_updates = compaction_max_updates
+        self._compaction_max_bytes = compaction_max_bytes
+
+    def _get_update_keys(self, document_id: str) -> Tuple[str, str, str]:
+        """
+        Returns the snapshot, update log and update log size keys.
+        """
+        redis_key = f"{self._redis_key_prefix}:{document_id}"
+        return (
+            f"{redis_key}:snapshot",
+            f"{redis_key}:update_log",
+            f"{redis_key}:update_log_size",
+        )
 
     async def append_to_updates(self, document_id: str, update: bytes):
         document_id = document_id.replace(":", "_")
+        update = bytes(update)
+
         if self._redis:
-            redis_key = f"{self._redis_key_prefix}:{document_id}:updates"
-            await self._redis.rpush(redis_key, json.dumps(list(update)))
+            _, update_log_key, update_log_size_key = self._get_update_keys(document_id)
+            pipe = self._redis_binary.pipeline()
+            pipe.rpush(update_log_key, update)
+            pipe.incrby(update_log_size_key, len(update))
+            count, size = await pipe.execute()
         else:
             if document_id not in self._updates:
                 self._updates[document_id] = []
             self._updates[document_id].append(update)
+            self._update_sizes[document_id] = self._update_sizes.get(
+                document_id, 0
+            ) + len(update)
+
+            count = len(self._updates[document_id])
+            size = self._update_sizes[document_id]
+
+        if count >= self._compaction_max_updates or size >= self._compaction_max_bytes:
+            await self.compact_updates(document_id)
+
+    async def compact_updates(self, document_id: str):
+        """
+        Merge the update log of a document into its snapshot.
+        """
+        document_id = document_id.replace(":", "_")
+
+        if self._redis:
+            snapshot_key, update_log_key, update_log_size_key = self._get_update_keys(
+                document_id
+            )
+            lock_key = f"{update_log_key}:compaction_lock"
+            if not await self._redis.set(lock_key, "1", nx=True, ex=60):
+                # Another worker is compacting this document
+                return
+
+            try:
+                pipe = self._redis_binary.pipeline()
+                pipe.get(snapshot_key)
+                pipe.lrange(update_log_key, 0, -1)
+                snapshot, updates = await pipe.execute()
+                if not updates:
+                    return
+
+                merged = Y.merge_updates(*([snapshot] if snapshot else []), *updates)
+
+                # Updates appended meanwhile stay in the log. If this stops
+                # halfway the merged updates are applied twice, which Yjs
+                # ignores.
+                pipe = self._redis_binary.pipeline(transaction=False)
+                pipe.set(snapshot_key, merged)
+                pipe.ltrim(update_log_key, len(updates), -1)
+                pipe.decrby(update_log_size_key, sum(len(u) for u in updates))
+                await pipe.execute()
+            finally:
+                await self._redis.delete(lock_key)
+        else:
+            updates = self._updates.get(document_id, [])
+            if not updates:
+                return
+
+            snapshot = self._snapshots.get(document_id)
+            self._snapshots[document_id] = Y.merge_updates(
+                *([snapshot] if snapshot else []), *updates
+            )
+            self._updates[document_id] = []
+            self._update_sizes[document_id] = 0
 
     async def get_updates(self, document_id: str) -> List[bytes]:
         document_id = document_id.replace(":", "_")
 
         if self._redis:
-            redis_key = f"{self._redis_key_prefix}:{document_id}:updates"
-            updates = await self._redis.lrange(redis_key, 0, -1)
-            return [bytes(json.loads(update)) for update in updates]
+            snapshot_key, update_log_key, _ = self._get_update_keys(document_id)
+            pipe = self._redis_binary.pipeline()
+            pipe.get(snapshot_key)
+            pipe.lrange(update_log_key, 0, -1)
+            snapshot, updates = await pipe.execute()
         else:
-            return self._updates.get(document_id, [])
+            snapshot = self._snapshots.get(document_id)
+            updates = self._updates.get(document_id, [])
+
+        return ([snapshot] if snapshot else []) + list(updates)
+
+    async def get_state(self, document_id: str) -> bytes:
+        """
+        The whole document as a single update.
+        """
+        updates = await self.get_updates(document_id)
+        if not updates:
+            return Y.Doc().get_update()
+        if len(updates) == 1:
+            return updates[0]
+        return Y.merge_updates(*updates)
 
     async def document_exists(self, document_id: str) -> bool:
         document_id = document_id.replace(":", "_")
 
         if self._redis:
-            redis_key = f"{self._redis_key_prefix}:{document_id}:updates"
-            return await self._redis.exists(redis_key) > 0
+            snapshot_key, update_log_key, _ = self._get_update_keys(document_id)
+            return await self._redis.exists(snapshot_key, update_log_key) > 0
         else:
-            return document_id in self._updates
+            return document_id in self._updates or document_id in self._snapshots
 
     async def get_users(self, document_id: str) -> List[str]:
         document_id = document_id.replace(":", "_")
@@ -203,12 +312,15 @@ class YdocManager:
         document_id = document_id.replace(":", "_")
 
         if self._redis:
-            redis_key = f"{self._redis_key_prefix}:{document_id}:updates"
-            await self._redis.delete(redis_key)
+            await self._redis.delete(*self._get_update_keys(document_id))
             redis_users_key = f"{self._redis_key_prefix}:{document_id}:users"
             await self._redis.delete(redis_users_key)
         else:
+            if document_id in self._snapshots:
+                del self._snapshots[document_id]
             if document_id in self._updates:
                 del self._updates[document_id]
+            if document_id in self._update_sizes:
+                del self._update_sizes[document_id]
             if document_id in self._users:
                 del self._users[document_id]
@@ -0,0 +1,147 @@
+"""
+Streams synthetic answers through the content block serializer the same way
+`process_chat_response` does and compares the full rebuild with the
+incremental `ContentBlockSerializer`.
+
+    python -m open_webui.test.benchmarks.content_blocks
+    python -m open_webui.test.benchmarks.content_blocks --tokens 10000 50000 200000
+"""
+
+import argparse
+import random
+import time
+
+from open_webui.utils.content_blocks import (
+    ContentBlockSerializer,
+    serialize_content_blocks,
+)
+
+WORDS = [
+    "the",
+    "model",
+    "answer",
+    "<tag>",
+    "token",
+    "stream",
+    '"quoted"',
+    "value",
+    "&",
+    "context",
+]
+
+
+def generate_deltas(num_tokens, seed=0):
+    rng = random.Random(seed)
+    for idx in range(num_tokens):
+        token = f" {rng.choice(WORDS)}"
+        if rng.random() < 0.05:
+            token += "\n"
+        yield idx, token
+
+
+def stream_answer(num_tokens, serialize, check=None):
+    """
+    Replays an answer made of a reasoning block (first 30% of the tokens), a
+    tool call with its result and a text block, calling `serialize` after
+    every delta like the streaming loop does.
+    """
+    reasoning_tokens = int(num_tokens * 0.3)
+    tool_call_at = int(num_tokens * 0.6)
+
+    content_blocks = [{"type": "text", "content": ""}]
+    reasoning_block = None
+
+    for idx, token in generate_deltas(num_tokens):
+        if idx < reasoning_tokens:
+            if reasoning_block is None:
+                reasoning_block = {
+                    "type": "reasoning",
+                    "start_tag": "<think>",
+                    "end_tag": "</think>",
+                    "attributes": {"type": "reasoning_content"},
+                    "content": "",
+                    "started_at": 0,
+                }
+                content_blocks.append(reasoning_block)
+            reasoning_block["content"] += token
+        else:
+            if content_blocks[-1]["type"] == "reasoning":
+                reasoning_block["ended_at"] = 12
+                reasoning_block["duration"] = 12
+                content_blocks.append({"type": "text", "content": ""})
+
+            if idx == tool_call_at:
+                content_blocks.append(
+                    {
+                        "type": "tool_calls",
+                        "content": [
+                            {
+                                "id": "call_0",
+                                "function": {
+                                    "name": "search",
+                                    "arguments": '{"query": "<b>x</b>"}',
+                                },
+                            }
+                        ],
+                        "results": [
+                            {"tool_call_id": "call_0", "content": "result & more"}
+                        ],
+                    }
+                )
+                content_blocks.append({"type": "text", "content": ""})
+
+            content_blocks[-1]["content"] = content_blocks[-1]["content"] + token
+
+        content = serialize(content_blocks)
+        if check:
+            check(content_blocks, content)
+
+    return content
+
+
+def run(num_tokens, baseline_limit):
+    serializer = ContentBlockSerializer()
+
+    start = time.perf_counter()
+    incremental = stream_answer(num_tokens, serializer.serialize)
+    incremental_time = time.perf_counter() - start
+
+    baseline_time = None
+    if num_tokens <= baseline_limit:
+        start = time.perf_counter()
+        baseline = stream_answer(num_tokens, serialize_content_blocks)
+        baseline_time = time.perf_counter() - start
+
+        if baseline != incremental:
+            raise AssertionError(f"Output mismatch for {num_tokens} tokens")
+
+    return incremental_time, baseline_time
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--tokens", type=int, nargs="+", default=[10_000, 50_000, 200_000]
+    )
+    parser.add_argument(
+        "--baseline-limit",
+        type=int,
+        default=50_000,
+        help="Skip the full rebuild above this many tokens (it is quadratic)",
+    )
+    args = parser.parse_args()
+
+    print(f"{'tokens':>10} {'incremental':>14} {'full rebuild':>14} {'speedup':>9}")
+    for num_tokens in args.tokens:
+        incremental_time, baseline_time = run(num_tokens, args.baseline_limit)
+        if baseline_time is None:
+            print(f"{num_tokens:>10} {incremental_time:>13.2f}s {'skipped':>14}")
+        else:
+            print(
+                f"{num_tokens:>10} {incremental_time:>13.2f}s {baseline_time:>13.2f}s"
+                f" {baseline_time / incremental_time:>8.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
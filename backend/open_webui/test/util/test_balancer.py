@@ -0,0 +1,62 @@
+import time
+
+from open_webui.utils.balancer import BackendBalancer
+
+
+def test_least_outstanding():
+    balancer = BackendBalancer(strategy="least_outstanding")
+
+    first = balancer.start("ollama", 0)
+    assert balancer.select("ollama", [0, 1]) == 1
+
+    balancer.start("ollama", 1)
+    balancer.start("ollama", 1)
+    assert balancer.select("ollama", [0, 1]) == 0
+
+    # Weights scale the load a connection takes
+    assert balancer.select("ollama", [0, 1], weights={0: 1, 1: 4}) == 1
+
+    first.record(True)
+    first.finish()
+    first.finish()
+    assert balancer.get_stats("ollama", 0).outstanding == 0
+    assert balancer.get_stats("ollama", 0).errors == 0
+
+
+def test_loaded_model_affinity():
+    balancer = BackendBalancer(strategy="least_outstanding")
+    balancer.set_loaded_models("ollama", {0: {"llama3:8b"}, 1: {"qwen3:4b"}})
+
+    assert balancer.select("ollama", [0, 1], model="qwen3:4b") == 1
+
+    # Until the connection with the model is busy enough
+    for _ in range(3):
+        balancer.start("ollama", 1)
+    assert balancer.select("ollama", [0, 1], model="qwen3:4b") == 0
+
+
+def test_circuit_breaker():
+    balancer = BackendBalancer(
+        strategy="least_outstanding", failure_threshold=2, cooldown=60
+    )
+
+    for _ in range(2):
+        balancer.start("openai", 0).finish()
+    assert not balancer.is_available("openai", 0)
+    assert all(balancer.select("openai", [0, 1]) == 1 for _ in range(10))
+
+    # Every connection skipped, one is picked anyway
+    for _ in range(2):
+        balancer.start("openai", 1).finish()
+    assert balancer.select("openai", [0, 1]) in [0, 1]
+
+    # After the cooldown, a single request probes the connection
+    balancer.get_stats("openai", 0).open_until = time.monotonic() - 1
+    assert balancer.is_available("openai", 0)
+    probe = balancer.start("openai", 0)
+    assert not balancer.is_available("openai", 0)
+
+    probe.record(True)
+    probe.finish()
+    assert balancer.is_available("openai", 0)
+    assert balancer.get_stats("openai", 0).failures == 0
@@ -0,0 +1,91 @@
+import gc
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from open_webui.retrieval import utils
+from open_webui.retrieval.batching import InferenceBatcher, get_model_batcher
+
+
+def test_concurrent_calls_are_batched():
+    batches = []
+    started = threading.Event()
+    release = threading.Event()
+
+    def encode(texts, prompt=None):
+        started.set()
+        release.wait(5)
+        batches.append(list(texts))
+        return [f"{prompt or ''}{text}" for text in texts]
+
+    batcher = InferenceBatcher("test", encode, max_batch_size=64, max_wait_ms=0)
+
+    def submit(i):
+        return executor.submit(
+            batcher.submit, [f"a{i}", f"b{i}"], prompt="query: " if i % 2 else None
+        )
+
+    with ThreadPoolExecutor(8) as executor:
+        futures = [submit(0)]
+        assert started.wait(5)
+        futures += [submit(i) for i in range(1, 8)]
+
+        # Let the calls queue up behind the first batch
+        deadline = time.monotonic() + 5
+        while batcher.get_queue_depth() < 14:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        release.set()
+
+        for i, future in enumerate(futures):
+            prefix = "query: " if i % 2 else ""
+            assert future.result() == [f"{prefix}a{i}", f"{prefix}b{i}"]
+
+    # The first call, then one batch per prompt
+    assert len(batches) == 3
+    assert batcher.get_queue_depth() == 0
+
+
+def test_errors_are_raised_to_every_call():
+    def encode(texts):
+        raise ValueError("model failed")
+
+    batcher = InferenceBatcher("test", encode)
+
+    with pytest.raises(ValueError):
+        batcher.submit(["a"])
+    assert batcher.submit([]) == []
+
+
+class Model:
+    def predict(self, inputs):
+        return [len(value) for value in inputs]
+
+
+def test_one_batcher_per_model():
+    model = Model()
+    batcher = get_model_batcher("test", model, lambda m, inputs: m.predict(inputs))
+
+    assert get_model_batcher("test", model, lambda m, inputs: []) is batcher
+    assert get_model_batcher("test", Model(), lambda m, inputs: []) is not batcher
+    assert batcher.submit(["a", "bc"]) == [1, 2]
+
+
+def test_functions_keep_the_model_loaded(monkeypatch):
+    monkeypatch.setattr(utils, "ENABLE_RAG_LOCAL_INFERENCE_BATCHING", True)
+
+    # The model is replaced while the function is in use
+    predict = utils.get_reranking_function("", "model", Model())
+    gc.collect()
+
+    assert predict(["a", "bc"]) == [1, 2]
+
+
+def test_unloaded_model_is_an_error():
+    batcher = get_model_batcher("test", Model(), lambda m, inputs: m.predict(inputs))
+    gc.collect()
+
+    with pytest.raises(RuntimeError):
+        batcher.submit(["a"])
@@ -0,0 +1,114 @@
+import asyncio
+
+import pytest
+
+from open_webui.internal.db import get_db
+from open_webui.models import chats
+from open_webui.models.chats import Chat, ChatForm, ChatMessage, Chats
+from open_webui.utils.message_events import MESSAGE_EVENT_QUEUE, upsert_message
+
+
+def get_chat_document(chat_id: str) -> dict:
+    with get_db() as db:
+        return db.get(Chat, chat_id).chat
+
+
+def get_row_contents(chat_id: str) -> dict:
+    with get_db() as db:
+        return {
+            row.message_id: row.content
+            for row in db.query(ChatMessage).filter_by(chat_id=chat_id)
+        }
+
+
+@pytest.fixture
+def chat(monkeypatch):
+    monkeypatch.setattr(chats, "ENABLE_CHAT_MESSAGE_TABLE", True)
+
+    chat = Chats.insert_new_chat(
+        "test-chat-messages",
+        ChatForm(
+            chat={
+                "title": "Chat",
+                "history": {
+                    "currentId": "2",
+                    "messages": {
+                        "1": {"id": "1", "role": "user", "content": "hello"},
+                        "2": {
+                            "id": "2",
+                            "parentId": "1",
+                            "role": "assistant",
+                            "content": "",
+                            "model": "model",
+                        },
+                    },
+                },
+            }
+        ),
+    )
+    yield chat
+    Chats.delete_chat_by_id(chat.id)
+
+
+def test_full_writes_sync_the_rows(chat):
+    assert get_row_contents(chat.id) == {"1": "hello", "2": ""}
+
+    document = Chats.get_chat_by_id(chat.id).chat
+    del document["history"]["messages"]["2"]
+    document["history"]["messages"]["1"]["content"] = "edited"
+    Chats.update_chat_by_id(chat.id, document)
+
+    assert get_row_contents(chat.id) == {"1": "edited"}
+
+
+def test_row_writes_are_seen_by_every_getter(chat):
+    Chats.upsert_chat_message(chat.id, "2", {"content": "streamed"})
+
+    # Only the row was written
+    assert get_chat_document(chat.id)["history"]["messages"]["2"]["content"] == ""
+
+    Chats.toggle_chat_pinned_by_id(chat.id)
+    results = [
+        Chats.get_chat_by_id(chat.id),
+        Chats.get_pinned_chats_by_user_id(chat.user_id)[0],
+        Chats.get_chat_list_by_user_id(chat.user_id)[0],
+        Chats.get_chat_list_by_chat_ids([chat.id])[0],
+        Chats.update_chat_title_by_id(chat.id, "Renamed"),
+    ]
+    for result in results:
+        message = result.chat["history"]["messages"]["2"]
+        assert message["content"] == "streamed"
+        assert message["model"] == "model"
+
+
+def test_disabling_the_table_keeps_row_only_messages(chat, monkeypatch):
+    Chats.upsert_chat_message(
+        chat.id, "3", {"parentId": "2", "role": "user", "content": "new"}
+    )
+    Chats.upsert_chat_message(chat.id, "2", {"content": "streamed"})
+
+    monkeypatch.setattr(chats, "ENABLE_CHAT_MESSAGE_TABLE", False)
+    Chats.update_chat_title_by_id(chat.id, "Renamed")
+
+    assert get_row_contents(chat.id) == {}
+    messages = get_chat_document(chat.id)["history"]["messages"]
+    assert messages["2"]["content"] == "streamed"
+    assert messages["3"]["content"] == "new"
+    assert get_chat_document(chat.id)["history"]["currentId"] == "2"
+
+
+@pytest.mark.parametrize("enable_chat_message_table", [True, False])
+def test_message_writes_follow_the_queued_events(
+    chat, monkeypatch, enable_chat_message_table
+):
+    monkeypatch.setattr(chats, "ENABLE_CHAT_MESSAGE_TABLE", enable_chat_message_table)
+
+    async def write():
+        MESSAGE_EVENT_QUEUE.put(
+            chat.id, "2", {"type": "replace", "data": {"content": "streamed"}}
+        )
+        await upsert_message(chat.id, "2", {"content": "final"})
+
+    asyncio.run(write())
+
+    assert Chats.get_message_by_id_and_message_id(chat.id, "2")["content"] == "final"
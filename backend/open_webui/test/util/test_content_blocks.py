@@ -0,0 +1,103 @@
+import random
+
+from open_webui.utils.content_blocks import (
+    ContentBlockSerializer,
+    serialize_content_blocks,
+)
+
+FRAGMENTS = [
+    "word ",
+    "\n",
+    "\r",
+    "\r\n",
+    "> quoted",
+    "<b>&amp;</b>",
+    "```",
+    "```python\n",
+    "  ",
+    " ",
+    "é",
+]
+
+
+def random_block(rng):
+    block_type = rng.choice(["text", "reasoning", "code_interpreter", "tool_calls"])
+    if block_type == "reasoning":
+        return {
+            "type": "reasoning",
+            "start_tag": "<think>",
+            "end_tag": "</think>",
+            "attributes": {"type": "reasoning_content"},
+            "content": "",
+            "started_at": 0,
+        }
+    if block_type == "code_interpreter":
+        return {
+            "type": "code_interpreter",
+            "start_tag": "<code_interpreter>",
+            "end_tag": "</code_interpreter>",
+            "attributes": {"type": "code", "lang": "python"},
+            "content": "",
+        }
+    if block_type == "tool_calls":
+        return {
+            "type": "tool_calls",
+            "content": [
+                {
+                    "id": "call_1",
+                    "function": {"name": "search", "arguments": '{"q": "<x>"}'},
+                }
+            ],
+        }
+    return {"type": "text", "content": ""}
+
+
+def mutate(rng, content_blocks):
+    block = content_blocks[-1]
+    action = rng.random()
+
+    if action < 0.08:
+        content_blocks.append(random_block(rng))
+    elif action < 0.1 and len(content_blocks) > 1:
+        content_blocks.pop()
+    elif block["type"] == "tool_calls":
+        block["results"] = [{"tool_call_id": "call_1", "content": "ok & done"}]
+    elif action < 0.15 and block["type"] == "reasoning":
+        block["duration"] = rng.randint(0, 5)
+    elif action < 0.18 and block["type"] == "code_interpreter":
+        block["output"] = {"stdout": "<1>"}
+    elif action < 0.22:
+        # Tag handling truncates the last block in place
+        block["content"] = block["content"][: len(block["content"]) // 2]
+    else:
+        block["content"] = block["content"] + rng.choice(FRAGMENTS)
+
+
+def test_incremental_serializer_matches_full_serialization():
+    for seed in range(25):
+        rng = random.Random(seed)
+        serializer = ContentBlockSerializer()
+        content_blocks = [{"type": "text", "content": ""}]
+
+        for _ in range(400):
+            mutate(rng, content_blocks)
+            assert serializer.serialize(content_blocks) == serialize_content_blocks(
+                content_blocks
+            )
+
+
+def test_incremental_serializer_detects_earlier_block_changes():
+    serializer = ContentBlockSerializer()
+    content_blocks = [
+        {"type": "reasoning", "content": "first\nsecond"},
+        {"type": "text", "content": "answer"},
+    ]
+    assert serializer.serialize(content_blocks) == serialize_content_blocks(
+        content_blocks
+    )
+
+    content_blocks[0]["duration"] = 3
+    content_blocks[0]["content"] += "\nthird"
+    assert serializer.serialize(content_blocks) == serialize_content_blocks(
+        content_blocks
+    )
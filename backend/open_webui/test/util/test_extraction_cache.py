@@ -0,0 +1,54 @@
+from langchain_core.documents import Document
+
+from open_webui.retrieval.extraction_cache import (
+    decode_documents,
+    encode_documents,
+    get_extraction_cache_key,
+)
+
+
+def test_key_only_depends_on_engine_settings():
+    settings = {"TIKA_SERVER_URL": "http://tika:9998", "DOCLING_SERVER_URL": "a"}
+    key = get_extraction_cache_key("hash", "a.pdf", None, "tika", settings)
+
+    assert key == get_extraction_cache_key(
+        "hash", "a.pdf", None, "tika", {**settings, "DOCLING_SERVER_URL": "b"}
+    )
+    assert key != get_extraction_cache_key(
+        "hash",
+        "a.pdf",
+        None,
+        "tika",
+        {**settings, "TIKA_SERVER_URL": "http://other:9998"},
+    )
+    assert key != get_extraction_cache_key("other", "a.pdf", None, "tika", settings)
+    assert key != get_extraction_cache_key("hash", "a.pdf", None, "docling", settings)
+
+
+def test_key_depends_on_file_type():
+    def key(filename, content_type=None):
+        return get_extraction_cache_key("hash", filename, content_type, "", {})
+
+    assert key("data.csv") != key("data.txt")
+    assert key("notes.md") != key("notes.txt")
+    assert key("notes.txt") == key("other.TXT")
+    assert key("file", "text/csv") != key("file", "text/plain")
+
+
+def test_key_ignores_credential_values():
+    def key(api_key):
+        return get_extraction_cache_key(
+            "hash", "a.pdf", None, "mistral_ocr", {"MISTRAL_OCR_API_KEY": api_key}
+        )
+
+    assert key("a") == key("b")
+    assert key("a") != key("")
+
+
+def test_documents_round_trip():
+    docs = [
+        Document(page_content="first page", metadata={"page": 0}),
+        Document(page_content="zweite Seite", metadata={"page": 1, "title": None}),
+    ]
+
+    assert decode_documents(encode_documents(docs)) == docs
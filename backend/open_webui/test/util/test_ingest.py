@@ -0,0 +1,147 @@
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.documents import Document
+
+from open_webui.routers import retrieval
+
+
+class VectorDB:
+    def __init__(self):
+        self.collections = {}
+
+    def has_collection(self, collection_name):
+        return collection_name in self.collections
+
+    def delete_collection(self, collection_name):
+        self.collections.pop(collection_name, None)
+
+    def query(self, collection_name, filter):
+        items = self.collections.get(collection_name, {}).values()
+        ids = [
+            item["id"]
+            for item in items
+            if all(item["metadata"].get(key) == value for key, value in filter.items())
+        ]
+        return SimpleNamespace(ids=[ids])
+
+    def insert(self, collection_name, items):
+        collection = self.collections.setdefault(collection_name, {})
+        for item in items:
+            assert item["id"] not in collection
+            collection[item["id"]] = item
+
+    def upsert(self, collection_name, items):
+        collection = self.collections.setdefault(collection_name, {})
+        for item in items:
+            collection[item["id"]] = item
+
+    def delete(self, collection_name, ids=None, filter=None):
+        for id in ids:
+            self.collections[collection_name].pop(id, None)
+
+
+class BM25Index:
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+@pytest.fixture
+def vector_db(monkeypatch):
+    vector_db = VectorDB()
+    monkeypatch.setattr(retrieval, "VECTOR_DB_CLIENT", vector_db)
+    monkeypatch.setattr(retrieval, "BM25_INDEX", BM25Index())
+    monkeypatch.setattr(retrieval, "RAG_INGEST_BATCH_SIZE", 2)
+    monkeypatch.setattr(
+        retrieval,
+        "get_embedding_function",
+        lambda *args, **kwargs: lambda texts, prefix, user: [[0.0] for _ in texts],
+    )
+    return vector_db
+
+
+def get_request():
+    config = SimpleNamespace(
+        TEXT_SPLITTER="",
+        CHUNK_SIZE=1000,
+        CHUNK_OVERLAP=100,
+        TIKTOKEN_ENCODING_NAME="cl100k_base",
+        RAG_EMBEDDING_ENGINE="",
+        RAG_EMBEDDING_MODEL="model",
+        RAG_EMBEDDING_BATCH_SIZE=1,
+        RAG_AZURE_OPENAI_BASE_URL="",
+        RAG_AZURE_OPENAI_API_KEY="",
+    )
+    return SimpleNamespace(
+        app=SimpleNamespace(state=SimpleNamespace(config=config, ef=None))
+    )
+
+
+def get_docs(count, fail_at=None):
+    for idx in range(count):
+        if idx == fail_at:
+            raise RuntimeError("extraction failed")
+        yield Document(page_content=f"page {idx}")
+
+
+def ingest(docs, checkpoints, checkpoint=None, hash="hash"):
+    return retrieval.save_docs_to_vector_db(
+        get_request(),
+        docs,
+        "file-1",
+        metadata={"hash": hash},
+        split=False,
+        resumable=True,
+        checkpoint=checkpoint,
+        on_progress=checkpoints.append,
+    )
+
+
+def get_contents(vector_db):
+    return sorted(item["text"] for item in vector_db.collections["file-1"].values())
+
+
+def test_failed_ingest_is_resumed(vector_db):
+    checkpoints = []
+    with pytest.raises(RuntimeError):
+        ingest(get_docs(5, fail_at=3), checkpoints)
+
+    # The chunks are kept, the checkpoint is written before the first insert
+    assert [checkpoint["done"] for checkpoint in checkpoints] == [0, 2]
+    assert get_contents(vector_db) == ["page 0", "page 1"]
+
+    assert ingest(get_docs(5), checkpoints, checkpoints[-1])
+    assert get_contents(vector_db) == [f"page {idx}" for idx in range(5)]
+
+
+def test_batch_without_a_checkpoint_is_not_a_duplicate(vector_db):
+    checkpoints = []
+
+    def on_progress(checkpoint):
+        if checkpoint["done"]:
+            raise RuntimeError("database unavailable")
+        checkpoints.append(checkpoint)
+
+    with pytest.raises(RuntimeError):
+        retrieval.save_docs_to_vector_db(
+            get_request(),
+            get_docs(3),
+            "file-1",
+            metadata={"hash": "hash"},
+            split=False,
+            resumable=True,
+            on_progress=on_progress,
+        )
+    assert get_contents(vector_db) == ["page 0", "page 1"]
+
+    assert ingest(get_docs(3), checkpoints, checkpoints[-1])
+    assert get_contents(vector_db) == ["page 0", "page 1", "page 2"]
+
+
+def test_stale_checkpoint_is_ingested_again(vector_db):
+    checkpoints = []
+    with pytest.raises(RuntimeError):
+        ingest(get_docs(5, fail_at=3), checkpoints, hash="old")
+
+    assert ingest(get_docs(1), [], checkpoints[-1])
+    assert get_contents(vector_db) == ["page 0"]
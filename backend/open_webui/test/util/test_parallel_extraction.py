@@ -0,0 +1,121 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fpdf import FPDF
+from langchain_community.document_loaders import PyPDFLoader
+from openpyxl import Workbook
+from pptx import Presentation
+from pptx.util import Inches
+
+from open_webui.retrieval.loaders import parallel, shards
+
+
+@pytest.fixture
+def thread_pool(monkeypatch):
+    executor = ThreadPoolExecutor(4)
+    monkeypatch.setattr(parallel, "get_executor", lambda: executor)
+    yield
+    executor.shutdown()
+
+
+@pytest.fixture
+def small_shards(monkeypatch):
+    monkeypatch.setattr(parallel, "PARALLEL_EXTRACTION_MIN_PAGES", 1)
+    monkeypatch.setattr(parallel, "PARALLEL_EXTRACTION_PAGES_PER_SHARD", 2)
+    monkeypatch.setattr(parallel, "MIN_SPREADSHEET_ROWS", 1)
+
+
+def extract_slowly(file_path, start, end):
+    # Earlier shards finish last
+    time.sleep((10 - start) * 0.01)
+    return [(f"page {idx}", {"page": idx}) for idx in range(start, end)]
+
+
+def test_pages_are_in_order(thread_pool):
+    loader = parallel.ParallelLoader(
+        "file", extract_slowly, [(start, start + 2) for start in range(0, 10, 2)], 10
+    )
+    progress = []
+
+    docs = list(loader.lazy_load(lambda done, total: progress.append((done, total))))
+
+    assert [doc.page_content for doc in docs] == [f"page {idx}" for idx in range(10)]
+    assert [doc.metadata["page"] for doc in docs] == list(range(10))
+    assert all(doc.metadata["source"] == "file" for doc in docs)
+    assert progress == [(done, 10) for done in range(2, 11, 2)]
+
+
+def test_pdf_matches_pypdf_loader(tmp_path, small_shards):
+    pdf = FPDF()
+    pdf.set_title("Title")
+    pdf.set_font("helvetica")
+    for idx in range(5):
+        pdf.add_page()
+        pdf.multi_cell(0, text=f"Page {idx}\n\ncafé")
+    pdf.output(tmp_path / "file.pdf")
+    file_path = str(tmp_path / "file.pdf")
+
+    try:
+        # On the process pool the app uses
+        docs = parallel.get_parallel_loader("pdf", None, file_path).load()
+    finally:
+        parallel.reset_executor()
+
+    assert docs == PyPDFLoader(file_path).load()
+
+
+def test_slides_are_one_document_each(tmp_path, thread_pool, small_shards):
+    presentation = Presentation()
+    for idx in range(3):
+        slide = presentation.slides.add_slide(presentation.slide_layouts[1])
+        slide.shapes.title.text = f"Slide {idx}"
+        slide.placeholders[1].text = "body"
+    table = slide.shapes.add_table(1, 2, 0, 0, Inches(2), Inches(1)).table
+    table.cell(0, 0).text = "a"
+    table.cell(0, 1).text = "b"
+    presentation.save(tmp_path / "file.pptx")
+    file_path = str(tmp_path / "file.pptx")
+
+    docs = parallel.get_parallel_loader("pptx", None, file_path).load()
+
+    assert [doc.page_content for doc in docs] == [
+        "Slide 0\n\nbody",
+        "Slide 1\n\nbody",
+        "Slide 2\n\nbody\n\na\tb",
+    ]
+    assert [doc.metadata for doc in docs] == [
+        {"source": file_path, "page_number": idx} for idx in range(1, 4)
+    ]
+
+
+def test_sheets_are_one_document_each(tmp_path, thread_pool, small_shards):
+    workbook = Workbook()
+    workbook.active.title = "first"
+    workbook.active.append(["a", 1])
+    workbook.active.append([None, None])
+    workbook.active.append(["b", None, 2])
+    workbook.create_sheet("second").append(["c"])
+    workbook.save(tmp_path / "file.xlsx")
+    file_path = str(tmp_path / "file.xlsx")
+
+    docs = parallel.get_parallel_loader("xlsx", None, file_path).load()
+
+    assert [doc.page_content for doc in docs] == ["a\t1\nb\t\t2", "c"]
+    assert [doc.metadata for doc in docs] == [
+        {"source": file_path, "page_name": "first"},
+        {"source": file_path, "page_name": "second"},
+    ]
+
+
+def test_small_documents_are_not_split(tmp_path):
+    workbook = Workbook()
+    workbook.create_sheet("second")
+    workbook.save(tmp_path / "file.xlsx")
+
+    assert (
+        parallel.get_parallel_loader("xlsx", None, str(tmp_path / "file.xlsx")) is None
+    )
+    assert shards.extract_xlsx_sheets(str(tmp_path / "file.xlsx"), ["second"]) == [
+        ("", {"page_name": "second"})
+    ]
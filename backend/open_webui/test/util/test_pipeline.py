@@ -0,0 +1,50 @@
+import threading
+
+import pytest
+
+from open_webui.retrieval.pipeline import run_pipeline
+
+
+def test_results_are_in_order():
+    results = run_pipeline(range(20), [lambda x: x * 2, lambda x: x + 1])
+
+    assert list(results) == [x * 2 + 1 for x in range(20)]
+
+
+def test_source_is_bounded_by_the_queues():
+    produced = []
+    release = threading.Event()
+
+    def source():
+        for x in range(100):
+            produced.append(x)
+            yield x
+
+    def stage(x):
+        release.wait(5)
+        return x
+
+    results = run_pipeline(source(), [stage], queue_size=2)
+    thread = threading.Thread(target=lambda: next(results))
+    thread.start()
+    thread.join(0.5)
+
+    # One item in the stage and the two queues full, one waiting to be queued
+    assert len(produced) <= 4
+
+    release.set()
+    thread.join()
+    assert list(results) == list(range(1, 100))
+
+
+def test_errors_are_raised_to_the_caller():
+    def stage(x):
+        if x == 3:
+            raise ValueError("failed")
+        return x
+
+    results = run_pipeline(range(10), [stage])
+
+    assert [next(results) for _ in range(3)] == [0, 1, 2]
+    with pytest.raises(ValueError):
+        next(results)
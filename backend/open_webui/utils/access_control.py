@@ -119,8 +119,7 @@ def has_access(
             return True
 
     if user_group_ids is None:
-        user_groups = Groups.get_groups_by_member_id(user_id)
-        user_group_ids = {group.id for group in user_groups}
+        user_group_ids = Groups.get_group_ids_by_member_id(user_id)
 
     permission_access = access_control.get(type, {})
     permitted_group_ids = permission_access.get("group_ids", [])
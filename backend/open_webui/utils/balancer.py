@@ -0,0 +1,223 @@
+import asyncio
+import logging
+import random
+import time
+from typing import Awaitable, Callable, Optional
+
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    BACKEND_LOAD_BALANCING_STRATEGY,
+    BACKEND_CIRCUIT_BREAKER_THRESHOLD,
+    BACKEND_CIRCUIT_BREAKER_COOLDOWN,
+)
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+
+# A backend that has to load the model first is scored as if it had this many
+# more requests in flight
+MODEL_LOAD_PENALTY = 2
+
+# Smoothing of the latency average, the weight of the newest sample
+LATENCY_ALPHA = 0.2
+
+# Seconds the loaded models reported by a backend are trusted
+LOADED_MODELS_TTL = 30
+
+
+class BackendStats:
+    def __init__(self, kind: str, idx: int):
+        self.kind = kind
+        self.idx = idx
+
+        self.outstanding = 0
+        self.requests = 0
+        self.errors = 0
+        self.latency = None
+
+        self.failures = 0
+        self.open_until = 0.0
+        self.probing = False
+
+        self.loaded_models = None
+        self.loaded_models_at = 0.0
+
+
+class BackendRequest:
+    """
+    A request in flight to a backend. `record` is called once the response
+    status is known (or the request failed), `finish` once the response has
+    been read, which for streamed responses is when the stream ends.
+    """
+
+    def __init__(self, balancer: "BackendBalancer", stats: BackendStats):
+        self.balancer = balancer
+        self.stats = stats
+        self.started_at = time.monotonic()
+
+        self._recorded = False
+        self._finished = False
+
+    def record(self, success: bool):
+        if not self._recorded:
+            self._recorded = True
+            self.balancer.record(
+                self.stats, success, time.monotonic() - self.started_at
+            )
+
+    def finish(self):
+        if not self._finished:
+            self._finished = True
+            # Requests that ended without a status count as failed
+            self.record(False)
+            self.stats.outstanding -= 1
+
+
+class BackendBalancer:
+    """
+    Picks one of the connections (by index in OLLAMA_BASE_URLS or
+    OPENAI_API_BASE_URLS) that serve a model.
+
+    - least_outstanding: the connection with the fewest requests in flight
+      relative to its weight. For Ollama, connections that do not have the
+      model loaded (per /api/ps) are penalized. Ties go to the connection
+      with the lowest latency.
+    - weighted: random, proportionally to the weights.
+    - random: random.
+
+    Connections that failed `failure_threshold` times in a row (connection
+    errors and 5xx responses) are skipped for `cooldown` seconds, after which
+    a single request is let through to probe them. When every connection is
+    skipped, the request is sent to one of them anyway.
+    """
+
+    def __init__(
+        self,
+        strategy: str = BACKEND_LOAD_BALANCING_STRATEGY,
+        failure_threshold: int = BACKEND_CIRCUIT_BREAKER_THRESHOLD,
+        cooldown: int = BACKEND_CIRCUIT_BREAKER_COOLDOWN,
+    ):
+        self.strategy = strategy
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+
+        self._stats: dict[tuple[str, int], BackendStats] = {}
+        self._refresh_tasks: dict[str, asyncio.Task] = {}
+        self._refreshed_at: dict[str, float] = {}
+
+    def get_stats(self, kind: str, idx: int) -> BackendStats:
+        key = (kind, idx)
+        if key not in self._stats:
+            self._stats[key] = BackendStats(kind, idx)
+        return self._stats[key]
+
+    def is_available(self, kind: str, idx: int) -> bool:
+        stats = self.get_stats(kind, idx)
+        if not self.failure_threshold or stats.failures < self.failure_threshold:
+            return True
+        # Half-open, let a single request through
+        return time.monotonic() >= stats.open_until and not stats.probing
+
+    def is_model_loaded(self, kind: str, idx: int, model: str) -> Optional[bool]:
+        stats = self.get_stats(kind, idx)
+        if (
+            stats.loaded_models is None
+            or time.monotonic() - stats.loaded_models_at > LOADED_MODELS_TTL
+        ):
+            return None
+        return model in stats.loaded_models
+
+    def select(
+        self,
+        kind: str,
+        idxs: list[int],
+        weights: Optional[dict[int, float]] = None,
+        model: Optional[str] = None,
+    ) -> int:
+        if len(idxs) == 1:
+            return idxs[0]
+
+        candidates = [idx for idx in idxs if self.is_available(kind, idx)] or idxs
+        weights = {
+            idx: max(float((weights or {}).get(idx, 1) or 0), 0.01)
+            for idx in candidates
+        }
+
+        if self.strategy == "random":
+            return random.choice(candidates)
+        if self.strategy == "weighted":
+            return random.choices(candidates, [weights[idx] for idx in candidates])[0]
+
+        def get_score(idx: int) -> tuple[float, float]:
+            stats = self.get_stats(kind, idx)
+            load = stats.outstanding
+            if model and self.is_model_loaded(kind, idx, model) is False:
+                load += MODEL_LOAD_PENALTY
+            return (load / weights[idx], stats.latency or 0.0)
+
+        scores = {idx: get_score(idx) for idx in candidates}
+        best = min(scores.values())
+        return random.choice([idx for idx in candidates if scores[idx] == best])
+
+    def start(self, kind: str, idx: int) -> BackendRequest:
+        stats = self.get_stats(kind, idx)
+        if self.failure_threshold and stats.failures >= self.failure_threshold:
+            stats.probing = True
+
+        stats.outstanding += 1
+        stats.requests += 1
+        return BackendRequest(self, stats)
+
+    def record(self, stats: BackendStats, success: bool, latency: float):
+        if success:
+            stats.latency = (
+                latency
+                if stats.latency is None
+                else LATENCY_ALPHA * latency + (1 - LATENCY_ALPHA) * stats.latency
+            )
+            stats.failures = 0
+        else:
+            stats.errors += 1
+            stats.failures += 1
+            if self.failure_threshold and stats.failures >= self.failure_threshold:
+                if not stats.probing:
+                    log.warning(
+                        f"{stats.kind} connection {stats.idx} failed {stats.failures} "
+                        f"times in a row, skipping it for {self.cooldown}s"
+                    )
+                stats.open_until = time.monotonic() + self.cooldown
+        stats.probing = False
+
+    def set_loaded_models(self, kind: str, loaded_models: dict[int, set[str]]):
+        now = time.monotonic()
+        for idx, models in loaded_models.items():
+            stats = self.get_stats(kind, idx)
+            stats.loaded_models = models
+            stats.loaded_models_at = now
+
+    def schedule_loaded_models_refresh(
+        self,
+        kind: str,
+        get_loaded_models: Callable[[], Awaitable[dict[int, set[str]]]],
+        interval: int = 10,
+    ):
+        """
+        Refreshes the loaded models in the background when they are older
+        than `interval` seconds, so requests never wait for it.
+        """
+        now = time.monotonic()
+        if now - self._refreshed_at.get(kind, 0.0) < interval:
+            return
+        self._refreshed_at[kind] = now
+
+        async def refresh():
+            try:
+                self.set_loaded_models(kind, await get_loaded_models())
+            except Exception as e:
+                log.debug(f"Failed to refresh the loaded {kind} models: {e}")
+
+        self._refresh_tasks[kind] = asyncio.create_task(refresh())
+
+
+BACKEND_BALANCER = BackendBalancer()
@@ -0,0 +1,248 @@
+import html
+import json
+
+
+def split_content_and_whitespace(content):
+    content_stripped = content.rstrip()
+    original_whitespace = (
+        content[len(content_stripped) :] if len(content) > len(content_stripped) else ""
+    )
+    return content_stripped, original_whitespace
+
+
+def is_opening_code_block(content):
+    backtick_segments = content.split("```")
+    # Even number of segments means the last backticks are opening a new block
+    return len(backtick_segments) > 1 and len(backtick_segments) % 2 == 0
+
+
+def get_reasoning_display_content(reasoning_content):
+    return html.escape(
+        "\n".join(
+            (f"> {line}" if not line.startswith(">") else line)
+            for line in reasoning_content.splitlines()
+        )
+    )
+
+
+def _join_display_lines(head, tail):
+    # Every rendered reasoning line is non-empty ("> ..." or ">..."), so an
+    # empty string always means "no lines" and the join is unambiguous.
+    if head and tail:
+        return f"{head}\n{tail}"
+    return head or tail
+
+
+def serialize_content_block(content, block, raw=False, reasoning_display=None):
+    """
+    Append a single content block to the already serialized `content` and
+    return the result. `serialize_content_blocks` is a left fold over this
+    function, which is what allows the output to be built incrementally.
+    """
+    if block["type"] == "text":
+        block_content = block["content"].strip()
+        if block_content:
+            content = f"{content}{block_content}\n"
+    elif block["type"] == "tool_calls":
+        attributes = block.get("attributes", {})
+
+        tool_calls = block.get("content", [])
+        results = block.get("results", [])
+
+        if content and not content.endswith("\n"):
+            content += "\n"
+
+        if results:
+
+            tool_calls_display_content = ""
+            for tool_call in tool_calls:
+
+                tool_call_id = tool_call.get("id", "")
+                tool_name = tool_call.get("function", {}).get("name", "")
+                tool_arguments = tool_call.get("function", {}).get("arguments", "")
+
+                tool_result = None
+                tool_result_files = None
+                for result in results:
+                    if tool_call_id == result.get("tool_call_id", ""):
+                        tool_result = result.get("content", None)
+                        tool_result_files = result.get("files", None)
+                        break
+
+                if tool_result is not None:
+                    tool_result_embeds = result.get("embeds", "")
+                    tool_calls_display_content = f'{tool_calls_display_content}<details type="tool_calls" done="true" id="{tool_call_id}" name="{tool_name}" arguments="{html.escape(json.dumps(tool_arguments))}" result="{html.escape(json.dumps(tool_result, ensure_ascii=False))}" files="{html.escape(json.dumps(tool_result_files)) if tool_result_files else ""}" embeds="{html.escape(json.dumps(tool_result_embeds))}">\n<summary>Tool Executed</summary>\n</details>\n'
+                else:
+                    tool_calls_display_content = f'{tool_calls_display_content}<details type="tool_calls" done="false" id="{tool_call_id}" name="{tool_name}" arguments="{html.escape(json.dumps(tool_arguments))}">\n<summary>Executing...</summary>\n</details>\n'
+
+            if not raw:
+                content = f"{content}{tool_calls_display_content}"
+        else:
+            tool_calls_display_content = ""
+
+            for tool_call in tool_calls:
+                tool_call_id = tool_call.get("id", "")
+                tool_name = tool_call.get("function", {}).get("name", "")
+                tool_arguments = tool_call.get("function", {}).get("arguments", "")
+
+                tool_calls_display_content = f'{tool_calls_display_content}\n<details type="tool_calls" done="false" id="{tool_call_id}" name="{tool_name}" arguments="{html.escape(json.dumps(tool_arguments))}">\n<summary>Executing...</summary>\n</details>\n'
+
+            if not raw:
+                content = f"{content}{tool_calls_display_content}"
+
+    elif block["type"] == "reasoning":
+        if raw:
+            reasoning_display_content = None
+        elif reasoning_display:
+            reasoning_display_content = reasoning_display(block)
+        else:
+            reasoning_display_content = get_reasoning_display_content(block["content"])
+
+        reasoning_duration = block.get("duration", None)
+
+        start_tag = block.get("start_tag", "")
+        end_tag = block.get("end_tag", "")
+
+        if content and not content.endswith("\n"):
+            content += "\n"
+
+        if reasoning_duration is not None:
+            if raw:
+                content = f'{content}{start_tag}{block["content"]}{end_tag}\n'
+            else:
+                content = f'{content}<details type="reasoning" done="true" duration="{reasoning_duration}">\n<summary>Thought for {reasoning_duration} seconds</summary>\n{reasoning_display_content}\n</details>\n'
+        else:
+            if raw:
+                content = f'{content}{start_tag}{block["content"]}{end_tag}\n'
+            else:
+                content = f'{content}<details type="reasoning" done="false">\n<summary>Thinking…</summary>\n{reasoning_display_content}\n</details>\n'
+
+    elif block["type"] == "code_interpreter":
+        attributes = block.get("attributes", {})
+        output = block.get("output", None)
+        lang = attributes.get("lang", "")
+
+        content_stripped, original_whitespace = split_content_and_whitespace(content)
+        if is_opening_code_block(content_stripped):
+            # Remove trailing backticks that would open a new block
+            content = content_stripped.rstrip("`").rstrip() + original_whitespace
+        else:
+            # Keep content as is - either closing backticks or no backticks
+            content = content_stripped + original_whitespace
+
+        if content and not content.endswith("\n"):
+            content += "\n"
+
+        if output:
+            output = html.escape(json.dumps(output))
+
+            if raw:
+                content = f'{content}<code_interpreter type="code" lang="{lang}">\n{block["content"]}\n</code_interpreter>\n```output\n{output}\n```\n'
+            else:
+                content = f'{content}<details type="code_interpreter" done="true" output="{output}">\n<summary>Analyzed</summary>\n```{lang}\n{block["content"]}\n```\n</details>\n'
+        else:
+            if raw:
+                content = f'{content}<code_interpreter type="code" lang="{lang}">\n{block["content"]}\n</code_interpreter>\n'
+            else:
+                content = f'{content}<details type="code_interpreter" done="false">\n<summary>Analyzing...</summary>\n```{lang}\n{block["content"]}\n```\n</details>\n'
+
+    else:
+        block_content = str(block["content"]).strip()
+        if block_content:
+            content = f"{content}{block['type']}: {block_content}\n"
+
+    return content
+
+
+def serialize_content_blocks(content_blocks, raw=False):
+    content = ""
+
+    for block in content_blocks:
+        content = serialize_content_block(content, block, raw)
+
+    return content.strip()
+
+
+def get_content_block_signature(block):
+    # Strings are kept by reference, so comparing an unchanged block costs an
+    # identity check. Containers are snapshotted because tool call lists and
+    # attributes can be mutated in place while streaming.
+    return {
+        key: (
+            json.dumps(value, sort_keys=True, default=str)
+            if isinstance(value, (list, dict))
+            else value
+        )
+        for key, value in block.items()
+    }
+
+
+class ContentBlockSerializer:
+    """
+    Incremental version of `serialize_content_blocks` for the streaming loop.
+
+    The serialized output after every block is cached together with a
+    signature of that block. On the next call only the blocks from the first
+    changed one onwards are rendered again, and reasoning blocks that only
+    grew at the end re-escape just their trailing, unfinished line. The
+    output is identical to `serialize_content_blocks(content_blocks)`.
+    """
+
+    def __init__(self):
+        self._steps = []
+        self._reasoning = {}
+
+    def _get_reasoning_display(self, block):
+        text = block["content"]
+
+        cached = self._reasoning.get(id(block))
+        if cached and cached[0] is block and text.startswith(cached[1]):
+            _, _, stable_length, stable_display = cached
+        else:
+            stable_length, stable_display = 0, ""
+
+        # Lines terminated by "\n" are final: "\n" always ends a line break,
+        # so nothing appended later can merge with them.
+        boundary = text.rfind("\n", stable_length) + 1
+        if boundary:
+            stable_display = _join_display_lines(
+                stable_display,
+                get_reasoning_display_content(text[stable_length:boundary]),
+            )
+            stable_length = boundary
+
+        self._reasoning[id(block)] = (block, text, stable_length, stable_display)
+
+        return _join_display_lines(
+            stable_display, get_reasoning_display_content(text[stable_length:])
+        )
+
+    def serialize(self, content_blocks):
+        content = ""
+        steps = []
+        reuse = True
+
+        for idx, block in enumerate(content_blocks):
+            signature = get_content_block_signature(block)
+
+            if reuse and idx < len(self._steps) and self._steps[idx][0] == signature:
+                content = self._steps[idx][1]
+            else:
+                reuse = False
+                content = serialize_content_block(
+                    content, block, reasoning_display=self._get_reasoning_display
+                )
+
+            steps.append((signature, content))
+
+        self._steps = steps
+
+        block_ids = {id(block) for block in content_blocks}
+        for block_id in [key for key in self._reasoning if key not in block_ids]:
+            del self._reasoning[block_id]
+
+        return content.strip()
+
+    def reset(self):
+        self._steps = []
+        self._reasoning = {}
@@ -57,80 +57,151 @@ def get_sorted_filter_ids(request, model: dict, enabled_filter_ids: list = None)
     return filter_ids
 
 
+class CompiledFilter:
+    """
+    A filter handler with everything it needs resolved up front: the
+    module, the handler parameters and the (user) valves.
+    """
+
+    def __init__(self, filter_id, function_module, handler, valves, user_valves):
+        self.id = filter_id
+        self.module = function_module
+        self.handler = handler
+        self.parameters = inspect.signature(handler).parameters
+        self.is_coroutine = inspect.iscoroutinefunction(handler)
+        self.valves = valves
+        self.user_valves = user_valves
+
+
+class FilterChain:
+    """
+    The filter functions of one hook of a request, compiled on the first
+    call. Stream filters run for every chunk, so they only pay for the
+    handler calls. The chain is compiled again when valves are changed.
+    """
+
+    def __init__(self, request, filter_functions, filter_type):
+        self.request = request
+        self.filter_functions = filter_functions
+        self.filter_type = filter_type
+
+        self._filters = None
+        self._user_id = None
+        self._valves_version = None
+
+    def compile(self, user_id=None) -> list[CompiledFilter]:
+        filters = []
+        for function in self.filter_functions:
+            if not function:
+                continue
+
+            filter_id = function.id
+            function_module = get_function_module(
+                self.request, filter_id, load_from_db=(self.filter_type != "stream")
+            )
+            # Prepare handler function
+            handler = getattr(function_module, self.filter_type, None)
+            if not handler:
+                continue
+
+            valves = None
+            if hasattr(function_module, "valves") and hasattr(
+                function_module, "Valves"
+            ):
+                valves = Functions.get_function_valves_by_id(filter_id)
+                valves = function_module.Valves(**(valves if valves else {}))
+
+            filter = CompiledFilter(filter_id, function_module, handler, valves, None)
+
+            if (
+                user_id
+                and "__user__" in filter.parameters
+                and hasattr(function_module, "UserValves")
+            ):
+                try:
+                    filter.user_valves = function_module.UserValves(
+                        **Functions.get_user_valves_by_id_and_user_id(
+                            filter_id, user_id
+                        )
+                    )
+                except Exception as e:
+                    log.exception(f"Failed to get user values: {e}")
+
+            filters.append(filter)
+        return filters
+
+    def get_filters(self, user_id=None) -> list[CompiledFilter]:
+        if (
+            self._filters is None
+            or self._user_id != user_id
+            or self._valves_version != Functions.valves_version
+        ):
+            self._valves_version = Functions.valves_version
+            self._filters = self.compile(user_id)
+            self._user_id = user_id
+        return self._filters
+
+    async def process(self, form_data, extra_params):
+        skip_files = None
+
+        user = extra_params.get("__user__")
+        user_id = user.get("id") if isinstance(user, dict) else None
+
+        for filter in self.get_filters(user_id):
+            # Check if the function has a file_handler variable
+            if self.filter_type == "inlet" and hasattr(filter.module, "file_handler"):
+                skip_files = filter.module.file_handler
+
+            # Apply valves to the function
+            if filter.valves is not None:
+                filter.module.valves = filter.valves
+
+            try:
+                # Prepare parameters
+                params = {"body": form_data}
+                if self.filter_type == "stream":
+                    params = {"event": form_data}
+
+                params = params | {
+                    k: v
+                    for k, v in {
+                        **extra_params,
+                        "__id__": filter.id,
+                    }.items()
+                    if k in filter.parameters
+                }
+
+                # Handle user parameters
+                if "__user__" in params and filter.user_valves is not None:
+                    params["__user__"]["valves"] = filter.user_valves
+
+                # Execute handler
+                if filter.is_coroutine:
+                    form_data = await filter.handler(**params)
+                else:
+                    form_data = filter.handler(**params)
+
+            except Exception as e:
+                log.debug(f"Error in {self.filter_type} handler {filter.id}: {e}")
+                raise e
+
+        # Handle file cleanup for inlet
+        if skip_files:
+            if "files" in form_data.get("metadata", {}):
+                del form_data["metadata"]["files"]
+            if "files" in form_data:
+                del form_data["files"]
+
+        return form_data, {}
+
+
 async def process_filter_functions(
     request, filter_functions, filter_type, form_data, extra_params
 ):
-    skip_files = None
-
-    for function in filter_functions:
-        filter = function
-        filter_id = function.id
-        if not filter:
-            continue
-
-        function_module = get_function_module(
-            request, filter_id, load_from_db=(filter_type != "stream")
-        )
-        # Prepare handler function
-        handler = getattr(function_module, filter_type, None)
-        if not handler:
-            continue
-
-        # Check if the function has a file_handler variable
-        if filter_type == "inlet" and hasattr(function_module, "file_handler"):
-            skip_files = function_module.file_handler
-
-        # Apply valves to the function
-        if hasattr(function_module, "valves") and hasattr(function_module, "Valves"):
-            valves = Functions.get_function_valves_by_id(filter_id)
-            function_module.valves = function_module.Valves(
-                **(valves if valves else {})
-            )
-
-        try:
-            # Prepare parameters
-            sig = inspect.signature(handler)
-
-            params = {"body": form_data}
-            if filter_type == "stream":
-                params = {"event": form_data}
-
-            params = params | {
-                k: v
-                for k, v in {
-                    **extra_params,
-                    "__id__": filter_id,
-                }.items()
-                if k in sig.parameters
-            }
-
-            # Handle user parameters
-            if "__user__" in sig.parameters:
-                if hasattr(function_module, "UserValves"):
-                    try:
-                        params["__user__"]["valves"] = function_module.UserValves(
-                            **Functions.get_user_valves_by_id_and_user_id(
-                                filter_id, params["__user__"]["id"]
-                            )
-                        )
-                    except Exception as e:
-                        log.exception(f"Failed to get user values: {e}")
-
-            # Execute handler
-            if inspect.iscoroutinefunction(handler):
-                form_data = await handler(**params)
-            else:
-                form_data = handler(**params)
-
-        except Exception as e:
-            log.debug(f"Error in {filter_type} handler {filter_id}: {e}")
-            raise e
-
-    # Handle file cleanup for inlet
-    if skip_files:
-        if "files" in form_data.get("metadata", {}):
-            del form_data["metadata"]["files"]
-        if "files" in form_data:
-            del form_data["files"]
-
-    return form_data, {}
+    """
+    Run the filter functions once. Callers that run the same filters
+    repeatedly (stream filters) should keep a FilterChain instead.
+    """
+    return await FilterChain(request, filter_functions, filter_type).process(
+        form_data, extra_params
+    )
@@ -0,0 +1,134 @@
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from typing import Callable, Optional
+
+import aiohttp
+
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    AIOHTTP_CLIENT_POOL_LIMIT,
+    AIOHTTP_CLIENT_POOL_LIMIT_PER_HOST,
+    AIOHTTP_CLIENT_DNS_CACHE_TTL,
+    AIOHTTP_CLIENT_KEEPALIVE_TIMEOUT,
+)
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+
+class HTTPSessionManager:
+    """
+    App-lifetime aiohttp session for the requests to the Ollama and OpenAI
+    connections, so they reuse kept-alive connections (and resolved
+    addresses) instead of opening a new one per request.
+
+    Responses borrow a connection from the pool until they are released,
+    streamed responses hold theirs until the stream ends. Requests that find
+    the pool of a host full wait for a connection. `get_stats` reports the
+    connections in use and the waiting requests per host, and the response
+    listeners get the time to the first byte (the response headers) and the
+    time spent waiting for a connection of every request.
+    """
+
+    def __init__(
+        self,
+        limit: int = AIOHTTP_CLIENT_POOL_LIMIT,
+        limit_per_host: int = AIOHTTP_CLIENT_POOL_LIMIT_PER_HOST,
+        dns_cache_ttl: int = AIOHTTP_CLIENT_DNS_CACHE_TTL,
+        keepalive_timeout: float = AIOHTTP_CLIENT_KEEPALIVE_TIMEOUT,
+    ):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
+
+        # Called with (host, status, ttfb_ms, queued_ms)
+        self.response_listeners: list[Callable[[str, int, float, float], None]] = []
+
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop = None
+        self._waiting: dict[str, int] = defaultdict(int)
+
+    def get_session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            # Sessions are bound to their event loop, a new loop (e.g. in
+            # scripts and tests) gets its own
+            self._session = self._create_session()
+            self._loop = loop
+        return self._session
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(self._on_request_start)
+        trace_config.on_connection_queued_start.append(self._on_queued_start)
+        trace_config.on_connection_queued_end.append(self._on_queued_end)
+        trace_config.on_request_end.append(self._on_request_end)
+
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            use_dns_cache=True,
+            ttl_dns_cache=self.dns_cache_ttl,
+            keepalive_timeout=self.keepalive_timeout,
+        )
+        # The session is shared by every user, so cookies set by an upstream
+        # must not be kept. Cookies passed with a request are still sent.
+        return aiohttp.ClientSession(
+            connector=connector,
+            cookie_jar=aiohttp.DummyCookieJar(),
+            trust_env=True,
+            trace_configs=[trace_config],
+        )
+
+    async def start(self):
+        self.get_session()
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._loop = None
+
+    async def _on_request_start(self, session, ctx, params):
+        ctx.host = params.url.host
+        ctx.started_at = time.monotonic()
+        ctx.queued_for = 0.0
+
+    async def _on_queued_start(self, session, ctx, params):
+        ctx.queued_at = time.monotonic()
+        self._waiting[ctx.host] += 1
+
+    async def _on_queued_end(self, session, ctx, params):
+        ctx.queued_for = time.monotonic() - ctx.queued_at
+        self._waiting[ctx.host] -= 1
+        if self._waiting[ctx.host] <= 0:
+            del self._waiting[ctx.host]
+
+    async def _on_request_end(self, session, ctx, params):
+        ttfb = (time.monotonic() - ctx.started_at) * 1000
+        for listener in self.response_listeners:
+            try:
+                listener(ctx.host, params.response.status, ttfb, ctx.queued_for * 1000)
+            except Exception as e:
+                log.debug(f"HTTP session response listener failed: {e}")
+
+    def get_stats(self) -> dict:
+        in_use = defaultdict(int)
+        if self._session is not None and not self._session.closed:
+            # Not exposed publicly by aiohttp
+            acquired = getattr(self._session.connector, "_acquired_per_host", {})
+            for key, connections in acquired.items():
+                in_use[key.host] += len(connections)
+
+        return {
+            "limit": self.limit,
+            "limit_per_host": self.limit_per_host,
+            "in_use": dict(in_use),
+            "waiting": dict(self._waiting),
+        }
+
+
+HTTP_SESSION_MANAGER = HTTPSessionManager()
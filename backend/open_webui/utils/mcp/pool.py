@@ -0,0 +1,279 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from typing import Optional
+
+import anyio
+
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    MCP_SESSION_IDLE_TIMEOUT,
+    MCP_SESSION_HEALTH_CHECK_INTERVAL,
+    MCP_TOOL_SPECS_CACHE_TTL,
+)
+from open_webui.utils.mcp.client import MCPClient
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+
+# Seconds a health check ping may take before the session is replaced
+PING_TIMEOUT = 5
+
+
+def get_session_key(server_id: str, url: str, headers: Optional[dict]) -> tuple:
+    """
+    Sessions are shared by the requests that connect to the same server with
+    the same credentials, the headers are only kept as a hash.
+    """
+    auth_identity = hashlib.sha256(
+        json.dumps(headers or {}, sort_keys=True).encode()
+    ).hexdigest()
+    return (server_id, url, auth_identity)
+
+
+class PooledMCPSession:
+    """
+    An MCP client connection owned by a dedicated task.
+
+    The transport of the MCP client runs in task groups that must be exited
+    by the task that entered them, so the connection is opened and closed by
+    `_run`, while the requests that use the session call it from their own
+    tasks.
+    """
+
+    def __init__(self, url: str, headers: Optional[dict] = None):
+        self.url = url
+        self.headers = headers
+        self.client = MCPClient()
+
+        self.active = 0
+        self.last_used = time.monotonic()
+        self.last_checked = time.monotonic()
+
+        self._ready = asyncio.Event()
+        self._closing = asyncio.Event()
+        self._error = None
+        self._task = None
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+        self._task.add_done_callback(self._on_done)
+        await self._ready.wait()
+
+        if self._error:
+            raise self._error
+        if not self.is_alive():
+            raise ConnectionError(f"MCP session to {self.url} closed")
+
+    async def _run(self):
+        try:
+            await self.client.connect(self.url, headers=self.headers)
+        except Exception as e:
+            self._error = e
+            return
+        finally:
+            self._ready.set()
+
+        try:
+            await self._closing.wait()
+        finally:
+            await self.client.disconnect()
+
+    def _on_done(self, task: asyncio.Task):
+        if not task.cancelled() and task.exception():
+            log.debug(f"MCP session to {self.url} closed: {task.exception()}")
+
+    def is_alive(self) -> bool:
+        return (
+            self._task is not None
+            and not self._task.done()
+            and not self._closing.is_set()
+            and self._error is None
+        )
+
+    async def run(self, coro):
+        """
+        Awaits a request on the session. The request fails if the connection
+        closes first, as its response would never arrive.
+        """
+        request = asyncio.ensure_future(coro)
+        try:
+            await asyncio.wait(
+                {request, self._task}, return_when=asyncio.FIRST_COMPLETED
+            )
+        finally:
+            if not request.done():
+                request.cancel()
+                await asyncio.gather(request, return_exceptions=True)
+
+        if request.cancelled():
+            raise ConnectionError(f"MCP session to {self.url} closed")
+        return request.result()
+
+    async def ping(self) -> bool:
+        if not self.is_alive():
+            return False
+        try:
+            with anyio.fail_after(PING_TIMEOUT):
+                await self.run(self.client.session.send_ping())
+            self.last_checked = time.monotonic()
+            return True
+        except Exception as e:
+            log.debug(f"MCP session to {self.url} failed the health check: {e}")
+            return False
+
+    async def close(self):
+        self._closing.set()
+        if self._task:
+            await asyncio.gather(self._task, return_exceptions=True)
+
+
+class MCPSessionPool:
+    """
+    Process-wide pool of MCP client sessions, keyed by server and
+    credentials (see `get_session_key`).
+
+    Sessions are opened on first use and reused by later requests. A session
+    that was not used for `health_check_interval` seconds is pinged before it
+    is handed out, and replaced if it does not answer. Sessions unused for
+    `idle_timeout` seconds are closed. The tool specs of a server are cached
+    for `tool_specs_ttl` seconds, so requests that do not call a tool do not
+    need a connection at all.
+    """
+
+    def __init__(
+        self,
+        idle_timeout: int = MCP_SESSION_IDLE_TIMEOUT,
+        health_check_interval: int = MCP_SESSION_HEALTH_CHECK_INTERVAL,
+        tool_specs_ttl: int = MCP_TOOL_SPECS_CACHE_TTL,
+    ):
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+        self.tool_specs_ttl = tool_specs_ttl
+
+        self._sessions: dict[tuple, PooledMCPSession] = {}
+        self._locks: dict[tuple, asyncio.Lock] = {}
+        self._tool_specs: dict[tuple, dict] = {}
+        self._reaper = None
+
+    async def get_session(
+        self, key: tuple, url: str, headers: Optional[dict] = None
+    ) -> PooledMCPSession:
+        if self._reaper is None or self._reaper.done():
+            self._reaper = asyncio.create_task(self._reap())
+
+        async with self._locks.setdefault(key, asyncio.Lock()):
+            session = self._sessions.get(key)
+            if session:
+                healthy = session.is_alive() and (
+                    time.monotonic() - session.last_checked < self.health_check_interval
+                    or await session.ping()
+                )
+                if healthy:
+                    session.last_used = time.monotonic()
+                    return session
+
+                log.info(f"Reconnecting MCP session to {url}")
+                await self.discard(key, session)
+
+            session = PooledMCPSession(url, headers)
+            self._sessions[key] = session
+            try:
+                await session.start()
+            except BaseException:
+                await self.discard(key, session)
+                raise
+            return session
+
+    async def discard(self, key: tuple, session: PooledMCPSession):
+        if self._sessions.get(key) is session:
+            del self._sessions[key]
+        await session.close()
+
+    async def get_tool_specs(
+        self, key: tuple, url: str, headers: Optional[dict] = None
+    ) -> list[dict]:
+        cached = self._tool_specs.get(key)
+        if cached and cached["expires_at"] > time.monotonic():
+            return cached["specs"]
+
+        session = await self.get_session(key, url, headers)
+        specs = await session.run(session.client.list_tool_specs())
+
+        if self.tool_specs_ttl:
+            self._tool_specs[key] = {
+                "expires_at": time.monotonic() + self.tool_specs_ttl,
+                "specs": specs,
+            }
+        return specs
+
+    async def _call_tool(
+        self, session: PooledMCPSession, function_name: str, function_args: dict
+    ) -> Optional[dict]:
+        session.active += 1
+        try:
+            return await session.run(
+                session.client.call_tool(function_name, function_args)
+            )
+        finally:
+            session.active -= 1
+            session.last_used = time.monotonic()
+
+    async def call_tool(
+        self,
+        key: tuple,
+        url: str,
+        headers: Optional[dict],
+        function_name: str,
+        function_args: dict,
+    ) -> Optional[dict]:
+        session = await self.get_session(key, url, headers)
+        try:
+            return await self._call_tool(session, function_name, function_args)
+        except (anyio.ClosedResourceError, anyio.BrokenResourceError):
+            # The request could not be written to the closed connection, so
+            # the tool did not run and is called again on a new session. Once
+            # the request is out, a lost connection is raised instead, as
+            # calling the tool again could repeat its side effects.
+            log.info(f"MCP session to {url} was closed, retrying {function_name}")
+            await self.discard(key, session)
+
+        session = await self.get_session(key, url, headers)
+        return await self._call_tool(session, function_name, function_args)
+
+    async def _reap(self):
+        while True:
+            await asyncio.sleep(max(min(self.idle_timeout / 2, 60), 1))
+
+            now = time.monotonic()
+            for key, session in list(self._sessions.items()):
+                if session.active == 0 and now - session.last_used > self.idle_timeout:
+                    log.debug(f"Closing idle MCP session to {session.url}")
+                    await self.discard(key, session)
+
+            for key in list(self._locks):
+                if key not in self._sessions and not self._locks[key].locked():
+                    del self._locks[key]
+
+            self._tool_specs = {
+                key: value
+                for key, value in self._tool_specs.items()
+                if value["expires_at"] > now
+            }
+
+    async def close_all(self):
+        if self._reaper:
+            self._reaper.cancel()
+            self._reaper = None
+
+        sessions = list(self._sessions.items())
+        self._sessions = {}
+        await asyncio.gather(
+            *[session.close() for _, session in sessions], return_exceptions=True
+        )
+
+
+MCP_SESSION_POOL = MCPSessionPool()
@@ -0,0 +1,178 @@
+import asyncio
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Optional
+
+from open_webui.models.chats import Chats
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+
+# Event types that change the stored message
+PERSISTED_EVENT_TYPES = {
+    "status",
+    "message",
+    "replace",
+    "embeds",
+    "files",
+    "source",
+    "citation",
+}
+
+
+_chat_write_locks: dict[str, list] = {}
+_chat_write_locks_guard = threading.Lock()
+
+
+@contextmanager
+def chat_write_lock(chat_id: str):
+    """
+    Serializes the background writes to a chat. Without the chat_message
+    table a message write reads, modifies and rewrites the whole chat, so
+    concurrent writes from the event queue and the message journal would
+    overwrite each other.
+    """
+    with _chat_write_locks_guard:
+        entry = _chat_write_locks.setdefault(chat_id, [threading.Lock(), 0])
+        entry[1] += 1
+
+    try:
+        with entry[0]:
+            yield
+    finally:
+        with _chat_write_locks_guard:
+            entry[1] -= 1
+            if entry[1] == 0:
+                _chat_write_locks.pop(chat_id, None)
+
+
+def is_persisted_event(event_data: dict) -> bool:
+    if event_data.get("type") not in PERSISTED_EVENT_TYPES:
+        return False
+    if event_data["type"] in ["source", "citation"]:
+        return event_data.get("data", {}).get("type") is None
+    return True
+
+
+def apply_message_event(message: dict, event_data: dict) -> dict:
+    """
+    Returns the message fields changed by an event emitter event, given the
+    current state of the message.
+    """
+    event_type = event_data.get("type")
+    data = event_data.get("data", {})
+
+    if event_type == "status":
+        # Status updates of messages that do not exist yet are dropped
+        if message:
+            return {"statusHistory": [*message.get("statusHistory", []), data]}
+
+    elif event_type == "message":
+        if message:
+            return {"content": message.get("content", "") + data.get("content", "")}
+
+    elif event_type == "replace":
+        return {"content": data.get("content", "")}
+
+    elif event_type == "embeds":
+        return {"embeds": [*data.get("embeds", []), *message.get("embeds", [])]}
+
+    elif event_type == "files":
+        return {"files": [*data.get("files", []), *message.get("files", [])]}
+
+    elif event_type in ["source", "citation"]:
+        return {"sources": [*message.get("sources", []), data]}
+
+    return {}
+
+
+class MessageEventQueue:
+    """
+    Persists event emitter events off the event loop.
+
+    Events are queued per (chat_id, message_id) and applied in the order
+    they were emitted. A single task per message drains its queue: all the
+    events queued by then are folded into one update, which is written with
+    one read and one write of the message in a worker thread.
+
+    `flush` waits until the events queued so far for a message are written.
+    """
+
+    def __init__(self):
+        self._events: dict[tuple[str, str], deque] = {}
+        self._tasks: dict[tuple[str, str], asyncio.Task] = {}
+
+    def put(self, chat_id: str, message_id: str, event_data: dict):
+        key = (chat_id, message_id)
+        self._events.setdefault(key, deque()).append(event_data)
+
+        if key not in self._tasks:
+            self._tasks[key] = asyncio.create_task(self._drain(key))
+
+    def _write(self, chat_id: str, message_id: str, events: list[dict]):
+        with chat_write_lock(chat_id):
+            message = Chats.get_message_by_id_and_message_id(chat_id, message_id)
+            if message is None:
+                # The chat does not exist (anymore)
+                return
+
+            changes = {}
+            for event_data in events:
+                changes.update(apply_message_event({**message, **changes}, event_data))
+
+            if changes:
+                Chats.upsert_chat_message(chat_id, message_id, changes)
+
+    async def _drain(self, key: tuple[str, str]):
+        try:
+            while self._events.get(key):
+                queue = self._events[key]
+                events = [queue.popleft() for _ in range(len(queue))]
+
+                try:
+                    await asyncio.to_thread(self._write, *key, events)
+                except Exception as e:
+                    log.exception(f"Failed to persist events of message {key[1]}: {e}")
+        finally:
+            self._events.pop(key, None)
+            self._tasks.pop(key, None)
+
+    async def flush(self, chat_id: str, message_id: str):
+        task = self._tasks.get((chat_id, message_id))
+        if task:
+            # Shielded, so cancelling the caller does not drop queued events
+            await asyncio.shield(task)
+
+    async def flush_all(self):
+        tasks = list(self._tasks.values())
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+MESSAGE_EVENT_QUEUE = MessageEventQueue()
+
+
+async def flush_message_events(chat_id: Optional[str], message_id: Optional[str]):
+    if chat_id and message_id:
+        await MESSAGE_EVENT_QUEUE.flush(chat_id, message_id)
+
+
+async def upsert_message(chat_id: str, message_id: str, message: dict):
+    """
+    Writes message fields from the event loop. The events queued for the
+    message are written first, and the write holds the chat's write lock, so
+    neither overwrites the other.
+    """
+    await flush_message_events(chat_id, message_id)
+
+    def write():
+        with chat_write_lock(chat_id):
+            return Chats.upsert_message_to_chat_by_id_and_message_id(
+                chat_id, message_id, message
+            )
+
+    return await asyncio.to_thread(write)
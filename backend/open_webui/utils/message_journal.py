@@ -0,0 +1,206 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Optional
+
+from open_webui.models.chats import Chats
+from open_webui.utils.message_events import chat_write_lock
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    REDIS_KEY_PREFIX,
+    CHAT_REALTIME_SAVE_INTERVAL,
+    CHAT_REALTIME_SAVE_BYTES,
+    CHAT_REALTIME_SAVE_RECOVERY_TIMEOUT,
+)
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+
+REDIS_MESSAGE_JOURNAL_KEY = f"{REDIS_KEY_PREFIX}:chat:journal"
+
+
+def get_message_size(message: dict) -> int:
+    return sum(len(value) for value in message.values() if isinstance(value, str))
+
+
+class MessageJournal:
+    """
+    Write-behind buffer for messages that are still being generated.
+
+    Partial updates are merged in memory and only written to the database
+    once `flush_interval` seconds have passed or `flush_bytes` new characters
+    have accumulated since the last write, plus once when the message is
+    completed.
+
+    With Redis, each write is journaled there first, so a write that fails
+    survives a worker crash: entries that have not been touched for
+    `recovery_timeout` seconds are written to the database by `recover`.
+    """
+
+    def __init__(
+        self,
+        redis=None,
+        flush_interval: float = CHAT_REALTIME_SAVE_INTERVAL,
+        flush_bytes: int = CHAT_REALTIME_SAVE_BYTES,
+        recovery_timeout: int = CHAT_REALTIME_SAVE_RECOVERY_TIMEOUT,
+    ):
+        self._redis = redis
+        self.flush_interval = flush_interval
+        self.flush_bytes = flush_bytes
+        self.recovery_timeout = recovery_timeout
+
+        self._entries: dict[tuple[str, str], dict] = {}
+        self._locks: dict[tuple[str, str], asyncio.Lock] = {}
+
+    def _get_entry(self, chat_id: str, message_id: str) -> dict:
+        key = (chat_id, message_id)
+        if key not in self._entries:
+            self._entries[key] = {
+                "message": {},
+                "pending": False,
+                "flushed_at": time.time(),
+                "flushed_size": 0,
+            }
+            self._locks[key] = asyncio.Lock()
+        return self._entries[key]
+
+    async def _write_redis(self, chat_id: str, message_id: str, message: dict):
+        if not self._redis:
+            return
+
+        try:
+            await self._redis.hset(
+                REDIS_MESSAGE_JOURNAL_KEY,
+                f"{chat_id}:{message_id}",
+                json.dumps(
+                    {
+                        "chat_id": chat_id,
+                        "message_id": message_id,
+                        "message": message,
+                        "updated_at": int(time.time()),
+                    }
+                ),
+            )
+        except Exception as e:
+            log.warning(f"Failed to journal message {message_id} to Redis: {e}")
+
+    async def _delete_redis(self, chat_id: str, message_id: str):
+        if not self._redis:
+            return
+
+        try:
+            await self._redis.hdel(REDIS_MESSAGE_JOURNAL_KEY, f"{chat_id}:{message_id}")
+        except Exception as e:
+            log.warning(f"Failed to remove journaled message {message_id}: {e}")
+
+    async def _write_db(self, chat_id: str, message_id: str, message: dict):
+        def write():
+            with chat_write_lock(chat_id):
+                Chats.upsert_chat_message(chat_id, message_id, message)
+
+        # The upsert can rewrite the whole chat row, keep it off the event loop
+        await asyncio.to_thread(write)
+
+    async def append(self, chat_id: str, message_id: str, message: dict):
+        """
+        Merge `message` into the in-flight message and write it to the
+        database if the time or size threshold has been reached.
+        """
+        entry = self._get_entry(chat_id, message_id)
+        entry["message"].update(message)
+        entry["pending"] = True
+
+        if (
+            time.time() - entry["flushed_at"] >= self.flush_interval
+            or get_message_size(entry["message"]) - entry["flushed_size"]
+            >= self.flush_bytes
+        ):
+            await self.flush(chat_id, message_id)
+
+    async def flush(self, chat_id: str, message_id: str):
+        key = (chat_id, message_id)
+        entry = self._entries.get(key)
+        if not entry:
+            return
+
+        async with self._locks[key]:
+            if not entry["pending"]:
+                return
+
+            message = dict(entry["message"])
+            entry["pending"] = False
+
+            await self._write_redis(chat_id, message_id, message)
+            try:
+                await self._write_db(chat_id, message_id, message)
+            except Exception as e:
+                entry["pending"] = True
+                log.exception(f"Failed to flush message {message_id}: {e}")
+                return
+
+            entry["flushed_at"] = time.time()
+            entry["flushed_size"] = get_message_size(message)
+
+    async def complete(
+        self, chat_id: str, message_id: str, message: Optional[dict] = None
+    ):
+        """
+        Write the final state of the message and drop it from the journal.
+        """
+        if message:
+            entry = self._get_entry(chat_id, message_id)
+            entry["message"].update(message)
+            entry["pending"] = True
+
+        await self.flush(chat_id, message_id)
+
+        key = (chat_id, message_id)
+        entry = self._entries.get(key)
+        if entry and entry["pending"]:
+            # The final write failed, keep the Redis entry for recovery
+            return
+
+        self._entries.pop(key, None)
+        self._locks.pop(key, None)
+        await self._delete_redis(chat_id, message_id)
+
+    async def flush_all(self):
+        for chat_id, message_id in list(self._entries.keys()):
+            await self.flush(chat_id, message_id)
+
+    async def recover(self):
+        """
+        Write journaled messages left behind by crashed workers to the
+        database.
+        """
+        if not self._redis:
+            return
+
+        now = int(time.time())
+        entries = await self._redis.hgetall(REDIS_MESSAGE_JOURNAL_KEY)
+
+        for field, value in entries.items():
+            try:
+                item = json.loads(value)
+                chat_id, message_id = item["chat_id"], item["message_id"]
+
+                if (chat_id, message_id) in self._entries:
+                    continue
+                if now - item.get("updated_at", 0) < self.recovery_timeout:
+                    continue
+
+                log.info(f"Recovering journaled message {message_id} of {chat_id}")
+                await self._write_db(chat_id, message_id, item["message"])
+                await self._redis.hdel(REDIS_MESSAGE_JOURNAL_KEY, field)
+            except Exception as e:
+                log.exception(f"Failed to recover journaled message {field}: {e}")
+
+    async def periodic_recovery(self):
+        while True:
+            try:
+                await self.recover()
+            except Exception as e:
+                log.error(f"Error in message journal recovery: {e}")
+            await asyncio.sleep(self.recovery_timeout)
@@ -33,6 +33,7 @@ from open_webui.socket.main import (
     get_event_emitter,
     get_active_status_by_user_id,
 )
+from open_webui.utils.message_events import flush_message_events, upsert_message
 from open_webui.routers.tasks import (
     generate_queries,
     generate_title,
@@ -96,10 +97,15 @@ from open_webui.utils.plugin import load_function_module_by_id
 from open_webui.utils.filter import (
     get_sorted_filter_ids,
     process_filter_functions,
+    FilterChain,
 )
 from open_webui.utils.code_interpreter import execute_code_jupyter
+from open_webui.utils.content_blocks import (
+    ContentBlockSerializer,
+    serialize_content_blocks as serialize_content_blocks_raw,
+)
 from open_webui.utils.payload import apply_system_prompt_to_body
-from open_webui.utils.mcp.client import MCPClient
+from open_webui.utils.mcp.pool import MCP_SESSION_POOL, get_session_key
 
 
 from open_webui.config import (
@@ -1298,113 +1304,117 @@ async def process_chat_payload(request, form_data, user, metadata, model):
 
     tools_dict = {}
 
-    mcp_clients = {}
-    mcp_tools_dict = {}
+    async def get_mcp_tools(server_id: str) -> dict:
+        try:
+            mcp_server_connection = None
+            for server_connection in request.app.state.config.TOOL_SERVER_CONNECTIONS:
+                if (
+                    server_connection.get("type", "") == "mcp"
+                    and server_connection.get("info", {}).get("id") == server_id
+                ):
+                    mcp_server_connection = server_connection
+                    break
 
-    if tool_ids:
-        for tool_id in tool_ids:
-            if tool_id.startswith("server:mcp:"):
-                try:
-                    server_id = tool_id[len("server:mcp:") :]
-
-                    mcp_server_connection = None
-                    for (
-                        server_connection
-                    ) in request.app.state.config.TOOL_SERVER_CONNECTIONS:
-                        if (
-                            server_connection.get("type", "") == "mcp"
-                            and server_connection.get("info", {}).get("id") == server_id
-                        ):
-                            mcp_server_connection = server_connection
-                            break
+            if not mcp_server_connection:
+                log.error(f"MCP server with id {server_id} not found")
+                return {}
 
-                    if not mcp_server_connection:
-                        log.error(f"MCP server with id {server_id} not found")
-                        continue
+            auth_type = mcp_server_connection.get("auth_type", "")
 
-                    auth_type = mcp_server_connection.get("auth_type", "")
+            headers = {}
+            if auth_type == "bearer":
+                headers["Authorization"] = (
+                    f"Bearer {mcp_server_connection.get('key', '')}"
+                )
+            elif auth_type == "none":
+                # No authentication
+                pass
+            elif auth_type == "session":
+                headers["Authorization"] = f"Bearer {request.state.token.credentials}"
+            elif auth_type == "system_oauth":
+                oauth_token = extra_params.get("__oauth_token__", None)
+                if oauth_token:
+                    headers["Authorization"] = (
+                        f"Bearer {oauth_token.get('access_token', '')}"
+                    )
+            elif auth_type == "oauth_2.1":
+                try:
+                    splits = server_id.split(":")
+                    server_id = splits[-1] if len(splits) > 1 else server_id
 
-                    headers = {}
-                    if auth_type == "bearer":
-                        headers["Authorization"] = (
-                            f"Bearer {mcp_server_connection.get('key', '')}"
+                    oauth_token = (
+                        await request.app.state.oauth_client_manager.get_oauth_token(
+                            user.id, f"mcp:{server_id}"
                         )
-                    elif auth_type == "none":
-                        # No authentication
-                        pass
-                    elif auth_type == "session":
+                    )
+
+                    if oauth_token:
                         headers["Authorization"] = (
-                            f"Bearer {request.state.token.credentials}"
+                            f"Bearer {oauth_token.get('access_token', '')}"
                         )
-                    elif auth_type == "system_oauth":
-                        oauth_token = extra_params.get("__oauth_token__", None)
-                        if oauth_token:
-                            headers["Authorization"] = (
-                                f"Bearer {oauth_token.get('access_token', '')}"
-                            )
-                    elif auth_type == "oauth_2.1":
-                        try:
-                            splits = server_id.split(":")
-                            server_id = splits[-1] if len(splits) > 1 else server_id
+                except Exception as e:
+                    log.error(f"Error getting OAuth token: {e}")
+                    oauth_token = None
 
-                            oauth_token = await request.app.state.oauth_client_manager.get_oauth_token(
-                                user.id, f"mcp:{server_id}"
-                            )
+            url = mcp_server_connection.get("url", "")
+            headers = headers if headers else None
+            session_key = get_session_key(server_id, url, headers)
 
-                            if oauth_token:
-                                headers["Authorization"] = (
-                                    f"Bearer {oauth_token.get('access_token', '')}"
-                                )
-                        except Exception as e:
-                            log.error(f"Error getting OAuth token: {e}")
-                            oauth_token = None
+            tool_specs = await MCP_SESSION_POOL.get_tool_specs(
+                session_key, url, headers
+            )
 
-                    mcp_clients[server_id] = MCPClient()
-                    await mcp_clients[server_id].connect(
-                        url=mcp_server_connection.get("url", ""),
-                        headers=headers if headers else None,
+            def make_tool_function(function_name):
+                async def tool_function(**kwargs):
+                    return await MCP_SESSION_POOL.call_tool(
+                        session_key,
+                        url,
+                        headers,
+                        function_name,
+                        function_args=kwargs,
                     )
 
-                    tool_specs = await mcp_clients[server_id].list_tool_specs()
-                    for tool_spec in tool_specs:
+                return tool_function
 
-                        def make_tool_function(client, function_name):
-                            async def tool_function(**kwargs):
-                                return await client.call_tool(
-                                    function_name,
-                                    function_args=kwargs,
-                                )
-
-                            return tool_function
+            return {
+                f"{server_id}_{tool_spec['name']}": {
+                    "spec": {
+                        **tool_spec,
+                        "name": f"{server_id}_{tool_spec['name']}",
+                    },
+                    "callable": make_tool_function(tool_spec["name"]),
+                    "type": "mcp",
+                    "direct": False,
+                }
+                for tool_spec in tool_specs
+            }
+        except Exception as e:
+            log.debug(e)
+            if event_emitter:
+                await event_emitter(
+                    {
+                        "type": "chat:message:error",
+                        "data": {
+                            "error": {
+                                "content": f"Failed to connect to MCP server '{server_id}'"
+                            }
+                        },
+                    }
+                )
+            return {}
 
-                        tool_function = make_tool_function(
-                            mcp_clients[server_id], tool_spec["name"]
-                        )
+    mcp_tools_dict = {}
 
-                        mcp_tools_dict[f"{server_id}_{tool_spec['name']}"] = {
-                            "spec": {
-                                **tool_spec,
-                                "name": f"{server_id}_{tool_spec['name']}",
-                            },
-                            "callable": tool_function,
-                            "type": "mcp",
-                            "client": mcp_clients[server_id],
-                            "direct": False,
-                        }
-                except Exception as e:
-                    log.debug(e)
-                    if event_emitter:
-                        await event_emitter(
-                            {
-                                "type": "chat:message:error",
-                                "data": {
-                                    "error": {
-                                        "content": f"Failed to connect to MCP server '{server_id}'"
-                                    }
-                                },
-                            }
-                        )
-                    continue
+    if tool_ids:
+        # Connect to the MCP servers concurrently
+        for server_tools in await asyncio.gather(
+            *[
+                get_mcp_tools(tool_id[len("server:mcp:") :])
+                for tool_id in tool_ids
+                if tool_id.startswith("server:mcp:")
+            ]
+        ):
+            mcp_tools_dict.update(server_tools)
 
         tools_dict = await get_tools(
             request,
@@ -1431,9 +1441,6 @@ async def process_chat_payload(request, form_data, user, metadata, model):
                     "server": tool_server,
                 }
 
-    if mcp_clients:
-        metadata["mcp_clients"] = mcp_clients
-
     if tools_dict:
         if metadata.get("params", {}).get("function_calling") == "native":
             # If the function calling is native, then call the tools function calling handler
@@ -1626,7 +1633,7 @@ async def process_chat_response(
                             )
 
                             if not metadata.get("chat_id", "").startswith("local:"):
-                                Chats.upsert_message_to_chat_by_id_and_message_id(
+                                await upsert_message(
                                     metadata["chat_id"],
                                     metadata["message_id"],
                                     {
@@ -1796,7 +1803,7 @@ async def process_chat_response(
                         else:
                             error = str(error)
 
-                        Chats.upsert_message_to_chat_by_id_and_message_id(
+                        await upsert_message(
                             metadata["chat_id"],
                             metadata["message_id"],
                             {
@@ -1812,7 +1819,7 @@ async def process_chat_response(
                             )
 
                     if "selected_model_id" in response_data:
-                        Chats.upsert_message_to_chat_by_id_and_message_id(
+                        await upsert_message(
                             metadata["chat_id"],
                             metadata["message_id"],
                             {
@@ -1846,7 +1853,7 @@ async def process_chat_response(
                             )
 
                             # Save message in the database
-                            Chats.upsert_message_to_chat_by_id_and_message_id(
+                            await upsert_message(
                                 metadata["chat_id"],
                                 metadata["message_id"],
                                 {
@@ -1948,162 +1955,24 @@ async def process_chat_response(
             request, model, metadata.get("filter_ids", [])
         )
     ]
+    # Stream filters run for every chunk, resolve them once per response
+    stream_filter_chain = FilterChain(request, filter_functions, "stream")
 
     # Streaming response
     if event_emitter and event_caller:
         task_id = str(uuid4())  # Create a unique task ID.
         model_id = form_data.get("model", "")
 
-        def split_content_and_whitespace(content):
-            content_stripped = content.rstrip()
-            original_whitespace = (
-                content[len(content_stripped) :]
-                if len(content) > len(content_stripped)
-                else ""
-            )
-            return content_stripped, original_whitespace
-
-        def is_opening_code_block(content):
-            backtick_segments = content.split("```")
-            # Even number of segments means the last backticks are opening a new block
-            return len(backtick_segments) > 1 and len(backtick_segments) % 2 == 0
-
         # Handle as a background task
         async def response_handler(response, events):
-            def serialize_content_blocks(content_blocks, raw=False):
-                content = ""
-
-                for block in content_blocks:
-                    if block["type"] == "text":
-                        block_content = block["content"].strip()
-                        if block_content:
-                            content = f"{content}{block_content}\n"
-                    elif block["type"] == "tool_calls":
-                        attributes = block.get("attributes", {})
-
-                        tool_calls = block.get("content", [])
-                        results = block.get("results", [])
+            content_block_serializer = ContentBlockSerializer()
 
-                        if content and not content.endswith("\n"):
-                            content += "\n"
-
-                        if results:
-
-                            tool_calls_display_content = ""
-                            for tool_call in tool_calls:
-
-                                tool_call_id = tool_call.get("id", "")
-                                tool_name = tool_call.get("function", {}).get(
-                                    "name", ""
-                                )
-                                tool_arguments = tool_call.get("function", {}).get(
-                                    "arguments", ""
-                                )
-
-                                tool_result = None
-                                tool_result_files = None
-                                for result in results:
-                                    if tool_call_id == result.get("tool_call_id", ""):
-                                        tool_result = result.get("content", None)
-                                        tool_result_files = result.get("files", None)
-                                        break
-
-                                if tool_result is not None:
-                                    tool_result_embeds = result.get("embeds", "")
-                                    tool_calls_display_content = f'{tool_calls_display_content}<details type="tool_calls" done="true" id="{tool_call_id}" name="{tool_name}" arguments="{html.escape(json.dumps(tool_arguments))}" result="{html.escape(json.dumps(tool_result, ensure_ascii=False))}" files="{html.escape(json.dumps(tool_result_files)) if tool_result_files else ""}" embeds="{html.escape(json.dumps(tool_result_embeds))}">\n<summary>Tool Executed</summary>\n</details>\n'
-                                else:
-                                    tool_calls_display_content = f'{tool_calls_display_content}<details type="tool_calls" done="false" id="{tool_call_id}" name="{tool_name}" arguments="{html.escape(json.dumps(tool_arguments))}">\n<summary>Executing...</summary>\n</details>\n'
-
-                            if not raw:
-                                content = f"{content}{tool_calls_display_content}"
-                        else:
-                            tool_calls_display_content = ""
-
-                            for tool_call in tool_calls:
-                                tool_call_id = tool_call.get("id", "")
-                                tool_name = tool_call.get("function", {}).get(
-                                    "name", ""
-                                )
-                                tool_arguments = tool_call.get("function", {}).get(
-                                    "arguments", ""
-                                )
-
-                                tool_calls_display_content = f'{tool_calls_display_content}\n<details type="tool_calls" done="false" id="{tool_call_id}" name="{tool_name}" arguments="{html.escape(json.dumps(tool_arguments))}">\n<summary>Executing...</summary>\n</details>\n'
-
-                            if not raw:
-                                content = f"{content}{tool_calls_display_content}"
-
-                    elif block["type"] == "reasoning":
-                        reasoning_display_content = html.escape(
-                            "\n".join(
-                                (f"> {line}" if not line.startswith(">") else line)
-                                for line in block["content"].splitlines()
-                            )
-                        )
-
-                        reasoning_duration = block.get("duration", None)
-
-                        start_tag = block.get("start_tag", "")
-                        end_tag = block.get("end_tag", "")
-
-                        if content and not content.endswith("\n"):
-                            content += "\n"
-
-                        if reasoning_duration is not None:
-                            if raw:
-                                content = (
-                                    f'{content}{start_tag}{block["content"]}{end_tag}\n'
-                                )
-                            else:
-                                content = f'{content}<details type="reasoning" done="true" duration="{reasoning_duration}">\n<summary>Thought for {reasoning_duration} seconds</summary>\n{reasoning_display_content}\n</details>\n'
-                        else:
-                            if raw:
-                                content = (
-                                    f'{content}{start_tag}{block["content"]}{end_tag}\n'
-                                )
-                            else:
-                                content = f'{content}<details type="reasoning" done="false">\n<summary>Thinking…</summary>\n{reasoning_display_content}\n</details>\n'
-
-                    elif block["type"] == "code_interpreter":
-                        attributes = block.get("attributes", {})
-                        output = block.get("output", None)
-                        lang = attributes.get("lang", "")
-
-                        content_stripped, original_whitespace = (
-                            split_content_and_whitespace(content)
-                        )
-                        if is_opening_code_block(content_stripped):
-                            # Remove trailing backticks that would open a new block
-                            content = (
-                                content_stripped.rstrip("`").rstrip()
-                                + original_whitespace
-                            )
-                        else:
-                            # Keep content as is - either closing backticks or no backticks
-                            content = content_stripped + original_whitespace
-
-                        if content and not content.endswith("\n"):
-                            content += "\n"
-
-                        if output:
-                            output = html.escape(json.dumps(output))
-
-                            if raw:
-                                content = f'{content}<code_interpreter type="code" lang="{lang}">\n{block["content"]}\n</code_interpreter>\n```output\n{output}\n```\n'
-                            else:
-                                content = f'{content}<details type="code_interpreter" done="true" output="{output}">\n<summary>Analyzed</summary>\n```{lang}\n{block["content"]}\n```\n</details>\n'
-                        else:
-                            if raw:
-                                content = f'{content}<code_interpreter type="code" lang="{lang}">\n{block["content"]}\n</code_interpreter>\n'
-                            else:
-                                content = f'{content}<details type="code_interpreter" done="false">\n<summary>Analyzing...</summary>\n```{lang}\n{block["content"]}\n```\n</details>\n'
-
-                    else:
-                        block_content = str(block["content"]).strip()
-                        if block_content:
-                            content = f"{content}{block['type']}: {block_content}\n"
+            def serialize_content_blocks(content_blocks, raw=False):
+                if raw:
+                    return serialize_content_blocks_raw(content_blocks, raw)
 
-                return content.strip()
+                # Reuses the output rendered for unchanged blocks on previous deltas
+                return content_block_serializer.serialize(content_blocks)
 
             def convert_content_blocks_to_messages(content_blocks, raw=False):
                 messages = []
@@ -2114,7 +1983,9 @@ async def process_chat_response(
                         messages.append(
                             {
                                 "role": "assistant",
-                                "content": serialize_content_blocks(temp_blocks, raw),
+                                "content": serialize_content_blocks_raw(
+                                    temp_blocks, raw
+                                ),
                                 "tool_calls": block.get("content"),
                             }
                         )
@@ -2134,7 +2005,7 @@ async def process_chat_response(
                         temp_blocks.append(block)
 
                 if temp_blocks:
-                    content = serialize_content_blocks(temp_blocks, raw)
+                    content = serialize_content_blocks_raw(temp_blocks, raw)
                     if content:
                         messages.append(
                             {
@@ -2321,6 +2192,8 @@ async def process_chat_response(
 
                 return content, content_blocks, end_flag
 
+            # Statuses and sources emitted while processing the payload
+            await flush_message_events(metadata["chat_id"], metadata["message_id"])
             message = Chats.get_message_by_id_and_message_id(
                 metadata["chat_id"], metadata["message_id"]
             )
@@ -2377,7 +2250,7 @@ async def process_chat_response(
                     )
 
                     # Save message in the database
-                    Chats.upsert_message_to_chat_by_id_and_message_id(
+                    await upsert_message(
                         metadata["chat_id"],
                         metadata["message_id"],
                         {
@@ -2437,10 +2310,7 @@ async def process_chat_response(
                         try:
                             data = json.loads(data)
 
-                            data, _ = await process_filter_functions(
-                                request=request,
-                                filter_functions=filter_functions,
-                                filter_type="stream",
+                            data, _ = await stream_filter_chain.process(
                                 form_data=data,
                                 extra_params={"__body__": form_data, **extra_params},
                             )
@@ -2453,7 +2323,7 @@ async def process_chat_response(
 
                                 if "selected_model_id" in data:
                                     model_id = data["selected_model_id"]
-                                    Chats.upsert_message_to_chat_by_id_and_message_id(
+                                    await upsert_message(
                                         metadata["chat_id"],
                                         metadata["message_id"],
                                         {
@@ -2660,8 +2530,9 @@ async def process_chat_response(
                                                 break
 
                                         if ENABLE_REALTIME_CHAT_SAVE:
-                                            # Save message in the database
-                                            Chats.upsert_message_to_chat_by_id_and_message_id(
+                                            # Buffer the message, the journal writes it
+                                            # to the database in intervals
+                                            await request.app.state.message_journal.append(
                                                 metadata["chat_id"],
                                                 metadata["message_id"],
                                                 {
@@ -3115,9 +2986,21 @@ async def process_chat_response(
                     "title": title,
                 }
 
+                # Write the emitted events before the final content
+                await flush_message_events(metadata["chat_id"], metadata["message_id"])
+
                 if not ENABLE_REALTIME_CHAT_SAVE:
                     # Save message in the database
-                    Chats.upsert_message_to_chat_by_id_and_message_id(
+                    await upsert_message(
+                        metadata["chat_id"],
+                        metadata["message_id"],
+                        {
+                            "content": serialize_content_blocks(content_blocks),
+                        },
+                    )
+                else:
+                    # Write the final state of the journaled message
+                    await request.app.state.message_journal.complete(
                         metadata["chat_id"],
                         metadata["message_id"],
                         {
@@ -3153,9 +3036,21 @@ async def process_chat_response(
                 log.warning("Task was cancelled!")
                 await event_emitter({"type": "chat:tasks:cancel"})
 
+                # Write the emitted events before the final content
+                await flush_message_events(metadata["chat_id"], metadata["message_id"])
+
                 if not ENABLE_REALTIME_CHAT_SAVE:
                     # Save message in the database
-                    Chats.upsert_message_to_chat_by_id_and_message_id(
+                    await upsert_message(
+                        metadata["chat_id"],
+                        metadata["message_id"],
+                        {
+                            "content": serialize_content_blocks(content_blocks),
+                        },
+                    )
+                else:
+                    # Write the final state of the journaled message
+                    await request.app.state.message_journal.complete(
                         metadata["chat_id"],
                         metadata["message_id"],
                         {
@@ -3175,10 +3070,7 @@ async def process_chat_response(
                 return f"data: {item}\n\n"
 
             for event in events:
-                event, _ = await process_filter_functions(
-                    request=request,
-                    filter_functions=filter_functions,
-                    filter_type="stream",
+                event, _ = await stream_filter_chain.process(
                     form_data=event,
                     extra_params=extra_params,
                 )
@@ -3187,10 +3079,7 @@ async def process_chat_response(
                     yield wrap_item(json.dumps(event))
 
             async for data in original_generator:
-                data, _ = await process_filter_functions(
-                    request=request,
-                    filter_functions=filter_functions,
-                    filter_type="stream",
+                data, _ = await stream_filter_chain.process(
                     form_data=data,
                     extra_params=extra_params,
                 )
@@ -12,6 +12,7 @@ from open_webui.functions import get_function_models
 
 from open_webui.models.functions import Functions
 from open_webui.models.models import Models
+from open_webui.models.groups import Groups
 
 
 from open_webui.utils.plugin import (
@@ -356,31 +357,30 @@ def get_filtered_models(models, user):
         user.role == "user"
         or (user.role == "admin" and not BYPASS_ADMIN_ACCESS_CONTROL)
     ) and not BYPASS_MODEL_ACCESS_CONTROL:
+        accessible_model_ids = Models.get_accessible_model_ids(
+            user.id, [model["id"] for model in models if not model.get("arena")]
+        )
+
+        user_group_ids = None
         filtered_models = []
         for model in models:
             if model.get("arena"):
+                if user_group_ids is None:
+                    user_group_ids = Groups.get_group_ids_by_member_id(user.id)
+
                 if has_access(
                     user.id,
                     type="read",
                     access_control=model.get("info", {})
                     .get("meta", {})
                     .get("access_control", {}),
+                    user_group_ids=user_group_ids,
                 ):
                     filtered_models.append(model)
                 continue
 
-            model_info = Models.get_model_by_id(model["id"])
-            if model_info:
-                if (
-                    (user.role == "admin" and BYPASS_ADMIN_ACCESS_CONTROL)
-                    or user.id == model_info.user_id
-                    or has_access(
-                        user.id,
-                        type="read",
-                        access_control=model_info.access_control,
-                    )
-                ):
-                    filtered_models.append(model)
+            if model["id"] in accessible_model_ids:
+                filtered_models.append(model)
 
         return filtered_models
     else:
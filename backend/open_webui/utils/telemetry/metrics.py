@@ -8,8 +8,15 @@ Metrics collected:
 
 * http.server.requests (counter)
 * http.server.duration (histogram, milliseconds)
+* webui.upstream.ttfb (histogram, milliseconds)
+* webui.upstream.pool.wait (histogram, milliseconds)
+* webui.upstream.connections.in_use (gauge)
+* webui.upstream.connections.waiting (gauge)
+* webui.inference.batch.size (histogram, inputs)
+* webui.inference.queue.depth (gauge, inputs)
 
-Attributes used: http.method, http.route, http.status_code
+Attributes used: http.method, http.route, http.status_code, server.address,
+inference.model
 
 If you wish to add more attributes (e.g. user-agent) you can, but beware of
 high-cardinality label sets.
@@ -47,6 +54,8 @@ from open_webui.env import (
 )
 from open_webui.socket.main import get_active_user_ids
 from open_webui.models.users import Users
+from open_webui.utils.http_session import HTTP_SESSION_MANAGER
+from open_webui.retrieval.batching import BATCH_LISTENERS, get_queue_depths
 
 _EXPORT_INTERVAL_MILLIS = 10_000  # 10 seconds
 
@@ -99,6 +108,30 @@ def _build_meter_provider(resource: Resource) -> MeterProvider:
         View(
             instrument_name="webui.users.active",
         ),
+        View(
+            instrument_name="webui.upstream.ttfb",
+            attribute_keys=["server.address", "http.status_code"],
+        ),
+        View(
+            instrument_name="webui.upstream.pool.wait",
+            attribute_keys=["server.address"],
+        ),
+        View(
+            instrument_name="webui.upstream.connections.in_use",
+            attribute_keys=["server.address"],
+        ),
+        View(
+            instrument_name="webui.upstream.connections.waiting",
+            attribute_keys=["server.address"],
+        ),
+        View(
+            instrument_name="webui.inference.batch.size",
+            attribute_keys=["inference.model"],
+        ),
+        View(
+            instrument_name="webui.inference.queue.depth",
+            attribute_keys=["inference.model"],
+        ),
     ]
 
     provider = MeterProvider(
@@ -159,6 +192,86 @@ def setup_metrics(app: FastAPI, resource: Resource) -> None:
         callbacks=[observe_active_users],
     )
 
+    # Requests to the Ollama and OpenAI connections
+    upstream_ttfb_histogram = meter.create_histogram(
+        name="webui.upstream.ttfb",
+        description="Time to the first byte of upstream LLM responses",
+        unit="ms",
+    )
+    upstream_wait_histogram = meter.create_histogram(
+        name="webui.upstream.pool.wait",
+        description="Time upstream LLM requests waited for a pooled connection",
+        unit="ms",
+    )
+
+    def record_upstream_response(
+        host: str, status: int, ttfb_ms: float, queued_ms: float
+    ) -> None:
+        upstream_ttfb_histogram.record(
+            ttfb_ms, {"server.address": host, "http.status_code": status}
+        )
+        upstream_wait_histogram.record(queued_ms, {"server.address": host})
+
+    HTTP_SESSION_MANAGER.response_listeners.append(record_upstream_response)
+
+    def observe_upstream_connections_in_use(
+        options: metrics.CallbackOptions,
+    ) -> Sequence[metrics.Observation]:
+        return [
+            metrics.Observation(value=count, attributes={"server.address": host})
+            for host, count in HTTP_SESSION_MANAGER.get_stats()["in_use"].items()
+        ]
+
+    def observe_upstream_connections_waiting(
+        options: metrics.CallbackOptions,
+    ) -> Sequence[metrics.Observation]:
+        return [
+            metrics.Observation(value=count, attributes={"server.address": host})
+            for host, count in HTTP_SESSION_MANAGER.get_stats()["waiting"].items()
+        ]
+
+    meter.create_observable_gauge(
+        name="webui.upstream.connections.in_use",
+        description="Pooled upstream LLM connections in use, out of "
+        "AIOHTTP_CLIENT_POOL_LIMIT_PER_HOST",
+        unit="connections",
+        callbacks=[observe_upstream_connections_in_use],
+    )
+
+    meter.create_observable_gauge(
+        name="webui.upstream.connections.waiting",
+        description="Upstream LLM requests waiting for a pooled connection",
+        unit="requests",
+        callbacks=[observe_upstream_connections_waiting],
+    )
+
+    # Local embedding and reranking models
+    inference_batch_histogram = meter.create_histogram(
+        name="webui.inference.batch.size",
+        description="Inputs per batch run by the local embedding and reranking models",
+        unit="inputs",
+    )
+
+    def record_inference_batch(name: str, batch_size: int, calls: int) -> None:
+        inference_batch_histogram.record(batch_size, {"inference.model": name})
+
+    BATCH_LISTENERS.append(record_inference_batch)
+
+    def observe_inference_queue_depth(
+        options: metrics.CallbackOptions,
+    ) -> Sequence[metrics.Observation]:
+        return [
+            metrics.Observation(value=depth, attributes={"inference.model": name})
+            for name, depth in get_queue_depths().items()
+        ]
+
+    meter.create_observable_gauge(
+        name="webui.inference.queue.depth",
+        description="Inputs waiting for the local embedding and reranking models",
+        unit="inputs",
+        callbacks=[observe_inference_queue_depth],
+    )
+
     # FastAPI middleware
     @app.middleware("http")
     async def _metrics_middleware(request: Request, call_next):